@@ -0,0 +1,105 @@
+"""payment ledger per atleta (saldos_atletas)
+
+Revision ID: 2f6c8b1e9d47
+Revises: 7d1b9e4a2c68
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6c8b1e9d47'
+down_revision: Union[str, None] = '7d1b9e4a2c68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'saldos_atletas',
+        sa.Column('atleta_id', sa.Integer(), sa.ForeignKey('atletas.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('tipo', postgresql.ENUM(name='tipopagamento', create_type=False), primary_key=True),
+        sa.Column('status', postgresql.ENUM(name='statuspagamento', create_type=False), primary_key=True),
+        sa.Column('racha_id', sa.Integer(), sa.ForeignKey('rachas.id'), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('valor_total', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_saldos_atletas_racha_id', 'saldos_atletas', ['racha_id'])
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION saldos_atletas_pagamentos() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO saldos_atletas AS s (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+                SELECT p.atleta_id, p.tipo, p.status, a.racha_id, -count(*)::int, -sum(p.valor)
+                FROM pagamentos_antigos p
+                JOIN atletas a ON a.id = p.atleta_id
+                GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id
+                ON CONFLICT (atleta_id, tipo, status) DO UPDATE
+                SET quantidade = s.quantidade + excluded.quantidade,
+                    valor_total = s.valor_total + excluded.valor_total;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO saldos_atletas AS s (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+                SELECT p.atleta_id, p.tipo, p.status, a.racha_id, count(*)::int, sum(p.valor)
+                FROM pagamentos_novos p
+                JOIN atletas a ON a.id = p.atleta_id
+                GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id
+                ON CONFLICT (atleta_id, tipo, status) DO UPDATE
+                SET quantidade = s.quantidade + excluded.quantidade,
+                    valor_total = s.valor_total + excluded.valor_total;
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER pagamentos_saldos_insert
+        AFTER INSERT ON pagamentos
+        REFERENCING NEW TABLE AS pagamentos_novos
+        FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER pagamentos_saldos_update
+        AFTER UPDATE ON pagamentos
+        REFERENCING OLD TABLE AS pagamentos_antigos NEW TABLE AS pagamentos_novos
+        FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER pagamentos_saldos_delete
+        AFTER DELETE ON pagamentos
+        REFERENCING OLD TABLE AS pagamentos_antigos
+        FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO saldos_atletas (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+        SELECT p.atleta_id, p.tipo, p.status, a.racha_id, count(*), sum(p.valor)
+        FROM pagamentos p
+        JOIN atletas a ON a.id = p.atleta_id
+        GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS pagamentos_saldos_delete ON pagamentos")
+    op.execute("DROP TRIGGER IF EXISTS pagamentos_saldos_update ON pagamentos")
+    op.execute("DROP TRIGGER IF EXISTS pagamentos_saldos_insert ON pagamentos")
+    op.execute("DROP FUNCTION IF EXISTS saldos_atletas_pagamentos()")
+    op.drop_index('ix_saldos_atletas_racha_id', table_name='saldos_atletas')
+    op.drop_table('saldos_atletas')
@@ -0,0 +1,35 @@
+"""unique index on atleta_stats (racha_id, atleta_id)
+
+Revision ID: 4a8f1d3c7e25
+Revises: 9c4e2a7d5b10
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8f1d3c7e25'
+down_revision: Union[str, None] = '9c4e2a7d5b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM atleta_stats s
+        USING atleta_stats d
+        WHERE s.racha_id = d.racha_id
+          AND s.atleta_id = d.atleta_id
+          AND (COALESCE(s.gols, 0), COALESCE(s.assistencias, 0), s.id)
+            < (COALESCE(d.gols, 0), COALESCE(d.assistencias, 0), d.id)
+        """
+    )
+    op.create_index('ux_atleta_stats_racha_atleta', 'atleta_stats', ['racha_id', 'atleta_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_atleta_stats_racha_atleta', table_name='atleta_stats')
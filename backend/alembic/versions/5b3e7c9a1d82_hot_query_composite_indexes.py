@@ -0,0 +1,44 @@
+"""composite indexes for hot query filters
+
+Revision ID: 5b3e7c9a1d82
+Revises: 2f6c8b1e9d47
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b3e7c9a1d82'
+down_revision: Union[str, None] = '2f6c8b1e9d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_presencas_jogo_status', 'presencas', ['jogo_id', 'status']),
+    ('ix_presencas_atleta_id', 'presencas', ['atleta_id']),
+    ('ix_atletas_racha_ativo', 'atletas', ['racha_id', 'ativo']),
+    ('ix_atletas_user_racha', 'atletas', ['user_id', 'racha_id']),
+    ('ix_jogos_racha_cancelado_data', 'jogos', ['racha_id', 'cancelado', 'data_hora']),
+    ('ix_pagamentos_atleta_tipo_ref', 'pagamentos', ['atleta_id', 'tipo', 'referencia']),
+    ('ix_pagamentos_status_created', 'pagamentos', ['status', 'created_at']),
+    ('ix_team_members_team_ativo', 'team_members', ['team_id', 'ativo']),
+    ('ix_cartoes_atleta_tipo_created', 'cartoes', ['atleta_id', 'tipo', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não roda dentro de transação; IF NOT EXISTS porque o
+    # schema_compat pode ter criado os índices antes desta migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,34 @@
+"""unique monthly fee per atleta and referencia
+
+Revision ID: 7d1b9e4a2c68
+Revises: 4a8f1d3c7e25
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1b9e4a2c68'
+down_revision: Union[str, None] = '4a8f1d3c7e25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Falha se já houver mensalidades duplicadas: elas precisam ser conciliadas
+    # à mão, não apagadas por uma migration.
+    op.create_index(
+        'ux_pagamentos_mensalidade',
+        'pagamentos',
+        ['atleta_id', 'tipo', 'referencia'],
+        unique=True,
+        postgresql_where=sa.text("tipo = 'MENSALIDADE'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_pagamentos_mensalidade', table_name='pagamentos')
@@ -0,0 +1,116 @@
+"""add presence counters to jogos
+
+Revision ID: 9c4e2a7d5b10
+Revises: b7d2e4f8a1c3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7d5b10'
+down_revision: Union[str, None] = 'b7d2e4f8a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_CONTADORES = ('total_confirmados', 'total_pendentes', 'total_recusados')
+
+
+def upgrade() -> None:
+    for coluna in _CONTADORES:
+        op.add_column('jogos', sa.Column(coluna, sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute(
+        """
+        UPDATE jogos j
+        SET total_confirmados = c.confirmados,
+            total_pendentes = c.pendentes,
+            total_recusados = c.recusados
+        FROM (
+            SELECT jogo_id,
+                   count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                   count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                   count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+            FROM presencas
+            GROUP BY jogo_id
+        ) c
+        WHERE j.id = c.jogo_id
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION jogos_contadores_presenca() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE jogos j
+                SET total_confirmados = j.total_confirmados - d.confirmados,
+                    total_pendentes = j.total_pendentes - d.pendentes,
+                    total_recusados = j.total_recusados - d.recusados
+                FROM (
+                    SELECT jogo_id,
+                           count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                           count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                           count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+                    FROM presencas_antigas
+                    GROUP BY jogo_id
+                ) d
+                WHERE j.id = d.jogo_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE jogos j
+                SET total_confirmados = j.total_confirmados + d.confirmados,
+                    total_pendentes = j.total_pendentes + d.pendentes,
+                    total_recusados = j.total_recusados + d.recusados
+                FROM (
+                    SELECT jogo_id,
+                           count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                           count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                           count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+                    FROM presencas_novas
+                    GROUP BY jogo_id
+                ) d
+                WHERE j.id = d.jogo_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER presencas_contadores_insert
+        AFTER INSERT ON presencas
+        REFERENCING NEW TABLE AS presencas_novas
+        FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER presencas_contadores_update
+        AFTER UPDATE ON presencas
+        REFERENCING OLD TABLE AS presencas_antigas NEW TABLE AS presencas_novas
+        FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER presencas_contadores_delete
+        AFTER DELETE ON presencas
+        REFERENCING OLD TABLE AS presencas_antigas
+        FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS presencas_contadores_delete ON presencas")
+    op.execute("DROP TRIGGER IF EXISTS presencas_contadores_update ON presencas")
+    op.execute("DROP TRIGGER IF EXISTS presencas_contadores_insert ON presencas")
+    op.execute("DROP FUNCTION IF EXISTS jogos_contadores_presenca()")
+    for coluna in reversed(_CONTADORES):
+        op.drop_column('jogos', coluna)
@@ -16,11 +16,35 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "postgresql://postgres:postgres@db:5432/quemjoga"
+    # Pool de conexões (valores por processo/worker do uvicorn)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # segundos aguardando uma conexão livre
+    db_pool_recycle: int = 1800  # segundos; descarta conexões antigas derrubadas por proxies
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 = sem limite
+    # PgBouncer em pool_mode=transaction: sem parâmetros de sessão nem prepared statements
+    db_pgbouncer_transaction_mode: bool = False
+    # Instrumentação de SQL por requisição (contagem, tempo, suspeitas de N+1)
+    db_query_stats_enabled: bool = True
+    db_n_plus_one_threshold: int = 5  # repetições do mesmo formato de query numa requisição
+    # Reaplica create_all + schema_compat mesmo com o fingerprint do schema em dia
+    schema_bootstrap_force: bool = False
 
     # Security
     secret_key: str = _DEFAULT_SECRET_KEY
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7
+    # Cache do usuário autenticado (por worker). 0 desativa.
+    user_cache_ttl_seconds: int = 60
+    user_cache_max_entries: int = 10_000
+    # Cache dos papéis (admin/atleta) do usuário nos rachas (por worker). 0 desativa.
+    racha_access_cache_ttl_seconds: int = 30
+    racha_access_cache_max_entries: int = 10_000
+    # Hash de senhas (bcrypt) num pool de processos próprio, por worker
+    bcrypt_rounds: int = 12  # hashes com outro custo são refeitos no próximo login
+    password_hash_workers: int = 2  # 0 calcula no próprio thread (testes e scripts)
+    password_hash_queue_size: int = 16  # pedidos aguardando além dos em execução; acima disso, 503
 
     # Google OAuth
     google_client_id: str = ""
@@ -31,6 +55,13 @@ class Settings(BaseSettings):
     # Supabase (used to verify Supabase-issued access tokens server-side)
     supabase_url: str = ""
     supabase_anon_key: str = ""
+    # Tokens já verificados (por worker), até o "exp" do token e no máximo este TTL. 0 desativa.
+    supabase_token_cache_ttl_seconds: int = 300
+    supabase_token_cache_max_entries: int = 10_000
+    # JWKS: fresco por este tempo; depois é servido (e renovado em segundo plano) até o limite stale
+    supabase_jwks_ttl_seconds: int = 60 * 60
+    supabase_jwks_stale_seconds: int = 24 * 60 * 60
+    supabase_unknown_kid_ttl_seconds: int = 60  # kid ausente do JWKS não força nova busca nesse intervalo
 
     # Email (SMTP)
     smtp_host: str = ""
@@ -47,6 +78,15 @@ class Settings(BaseSettings):
     assinatura_valor: int = 2990  # centavos (R$ 29,90/mês)
     assinatura_trial_dias: int = 14
 
+    # Clientes HTTP das integrações (um pool keep-alive por integração e worker)
+    http_client_http2: bool = True  # só vale com o pacote ``h2`` instalado
+
+    # Métricas (/metrics). Com vários workers, aponte para um diretório comum.
+    metrics_enabled: bool = True
+    metrics_multiproc_dir: str = ""
+    metrics_flush_interval_seconds: float = 5.0
+    metrics_token: str = ""  # se definido, /metrics exige "Authorization: Bearer <token>"
+
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:5173"
 
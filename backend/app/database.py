@@ -1,11 +1,37 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.config import get_settings
+from app.db_pool import async_database_url, async_engine_options, engine_options, install_session_hooks
+from app.query_stats import install_query_hooks
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **engine_options(settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+install_session_hooks(SessionLocal, settings)
+
+# Engine assíncrono (asyncpg) para as rotas de leitura mais acessadas. Convive
+# com o engine síncrono enquanto as demais rotas não são migradas.
+async_engine = create_async_engine(async_database_url(settings.database_url), **async_engine_options(settings))
+
+if settings.db_query_stats_enabled:
+    install_query_hooks(engine)
+    install_query_hooks(async_engine.sync_engine)
+
+
+class AsyncBackedSession(Session):
+    """Session síncrona encapsulada pelo AsyncSession (alvo dos eventos de sessão)."""
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=AsyncBackedSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+install_session_hooks(AsyncBackedSession, settings)
 
 Base = declarative_base()
 
@@ -17,3 +43,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting async database sessions."""
+    async with AsyncSessionLocal() as db:
+        yield db
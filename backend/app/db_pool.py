@@ -0,0 +1,180 @@
+"""Pool de conexões do SQLAlchemy configurado pelo ``Settings``.
+
+Cada worker do uvicorn mantém o próprio pool, então o total de conexões no
+Postgres é ``workers * (db_pool_size + db_max_overflow)``. Os valores padrão
+seguem os do SQLAlchemy; em produção ajuste pelas variáveis ``DB_POOL_*``.
+
+O pool registra quanto tempo cada checkout esperou por uma conexão livre, para
+que ``/health/pool`` mostre se o gargalo está no pool ou no banco.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import Settings
+
+
+class PoolMetrics:
+    """Contadores de checkout do pool, seguros para uso entre threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / observed, 6) if observed else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mede o tempo de espera de cada checkout.
+
+    As métricas ficam num atributo de classe porque ``Pool.recreate()`` (usado
+    em ``engine.dispose()``) instancia a classe de novo sem repassar argumentos
+    extras; assim o histórico sobrevive à recriação do pool.
+    """
+
+    metrics = sync_pool_metrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Versão do pool instrumentado para o engine asyncpg."""
+
+    metrics = async_pool_metrics
+
+
+def engine_options(settings: Settings, poolclass: type[QueuePool] = InstrumentedQueuePool) -> dict:
+    """Monta os kwargs de ``create_engine`` a partir das configurações."""
+    options = {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    # Em modo transação o PgBouncer não repassa parâmetros de startup
+    # (``options``) e troca a conexão de servidor a cada transação; nesse caso o
+    # timeout é aplicado por transação em ``install_session_hooks``.
+    if settings.db_statement_timeout_ms > 0 and not settings.db_pgbouncer_transaction_mode:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def async_database_url(database_url: str) -> str:
+    """Converte a DATABASE_URL (psycopg2) para o driver asyncpg.
+
+    O asyncpg não entende ``sslmode`` na URL; o valor é repassado como ``ssl``
+    em ``async_engine_options``.
+    """
+    url = make_url(database_url)
+    if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        url = url.difference_update_query(["sslmode"])
+    return url.render_as_string(hide_password=False)
+
+
+def async_engine_options(settings: Settings) -> dict:
+    """Kwargs de ``create_async_engine``: mesmo pool do engine síncrono, adaptado ao asyncpg."""
+    options = engine_options(settings, poolclass=InstrumentedAsyncQueuePool)
+    options.pop("connect_args", None)
+    connect_args: dict = {}
+
+    sslmode = make_url(settings.database_url).query.get("sslmode")
+    if sslmode:
+        connect_args["ssl"] = sslmode
+
+    if settings.db_pgbouncer_transaction_mode:
+        # Prepared statements ficam presos à conexão de servidor, que o
+        # PgBouncer troca a cada transação.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    elif settings.db_statement_timeout_ms > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def install_session_hooks(session_target, settings: Settings) -> None:
+    """Aplica ``statement_timeout`` com ``SET LOCAL`` quando atrás do PgBouncer.
+
+    ``session_target`` é um ``sessionmaker`` ou uma subclasse de ``Session``
+    (no caso do ``AsyncSession``, a classe síncrona que ele encapsula).
+    """
+    if settings.db_statement_timeout_ms <= 0 or not settings.db_pgbouncer_transaction_mode:
+        return
+    timeout_ms = int(settings.db_statement_timeout_ms)
+
+    @event.listens_for(session_target, "after_begin")
+    def _set_local_statement_timeout(session, transaction, connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def pool_status(engine: Engine, metrics: PoolMetrics = sync_pool_metrics) -> dict:
+    """Estado atual do pool (conexões em uso, overflow) mais as métricas de espera."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    status.update(metrics.snapshot())
+    return status
@@ -4,7 +4,8 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.models import User, Atleta, RachaAdmin
+from app.models import User
+from app.services.acesso_racha import AcessoRacha, resolver_acessos
 
 
 def assinatura_ativa(user: User) -> bool:
@@ -29,35 +30,18 @@ def exigir_assinatura(user: User) -> None:
         )
 
 
-def verificar_acesso_racha(db: Session, user: User, racha_id: int):
+def verificar_acesso_racha(db: Session, user: User, racha_id: int) -> AcessoRacha:
     """Verifica se o usuário tem acesso ao racha (admin ou atleta)."""
-    admin = db.query(RachaAdmin).filter(
-        RachaAdmin.user_id == user.id,
-        RachaAdmin.racha_id == racha_id,
-        RachaAdmin.ativo.is_(True)
-    ).first()
-    if admin:
-        return {"tipo": "admin", "obj": admin}
-
-    atleta = db.query(Atleta).filter(
-        Atleta.user_id == user.id,
-        Atleta.racha_id == racha_id,
-        Atleta.ativo.is_(True)
-    ).first()
-    if atleta:
-        return {"tipo": "atleta", "obj": atleta}
-
-    raise HTTPException(status_code=403, detail="Sem acesso a este racha")
-
-
-def verificar_admin_racha(db: Session, user: User, racha_id: int):
+    acesso = resolver_acessos(db, user.id).get(racha_id)
+    if acesso is None:
+        raise HTTPException(status_code=403, detail="Sem acesso a este racha")
+    return acesso
+
+
+def verificar_admin_racha(db: Session, user: User, racha_id: int) -> AcessoRacha:
     """Verifica se o usuário é admin do racha."""
-    admin = db.query(RachaAdmin).filter(
-        RachaAdmin.user_id == user.id,
-        RachaAdmin.racha_id == racha_id,
-        RachaAdmin.ativo.is_(True)
-    ).first()
-    if not admin:
+    acesso = resolver_acessos(db, user.id).get(racha_id)
+    if acesso is None or not acesso.is_admin:
         raise HTTPException(status_code=403, detail="Apenas administradores podem realizar esta ação")
     exigir_assinatura(user)
-    return admin
+    return acesso
@@ -0,0 +1,190 @@
+"""Clientes HTTP compartilhados para as integrações externas (Asaas, Supabase, Google).
+
+Antes cada chamada abria um ``httpx.AsyncClient`` novo, pagando TCP + TLS a
+cada vez. Aqui há um cliente por integração e por worker, com pool de conexões
+keep-alive limitado por host, HTTP/2 quando o pacote ``h2`` está instalado,
+timeouts próprios e retentativas limitadas por um orçamento.
+
+As retentativas só acontecem em erro de conexão (o pedido não chegou a sair)
+ou, para métodos idempotentes, em timeout de leitura e respostas 502/503/504.
+Cada integração pode gastar em retentativas no máximo ``retry_ratio`` das
+requisições da última janela (mais ``retry_min`` fixas), para que uma
+integração fora do ar não multiplique a própria carga.
+
+Os clientes são criados sob demanda e fechados no ``lifespan`` da app
+(``await http_clients.aclose()``). Se o event loop mudar (scripts, testes), um
+cliente novo é criado para o loop atual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+from app.metrics import outbound_transport, registry
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS = frozenset({502, 503, 504})
+
+outbound_retries = registry.counter(
+    "outbound_retries_total", "Retentativas de chamadas a APIs externas.", ("service", "outcome"),
+)
+
+
+@dataclass(frozen=True)
+class Integration:
+    name: str
+    timeout: float
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    max_retries: int = 2
+    retry_ratio: float = 0.2
+    retry_min: int = 3
+    retry_window_seconds: float = 10.0
+    backoff_seconds: float = 0.1
+
+
+INTEGRATIONS = {
+    "asaas": Integration("asaas", timeout=20.0),
+    "supabase": Integration("supabase", timeout=10.0),
+    "google": Integration("google", timeout=10.0),
+}
+
+
+class RetryBudget:
+    """Permite retentar enquanto retentativas < ``ratio`` x requisições (+ ``minimum``) na janela."""
+
+    def __init__(self, ratio: float, minimum: int, window_seconds: float) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window_seconds = window_seconds
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        limite = now - self.window_seconds
+        for eventos in (self._requests, self._retries):
+            while eventos and eventos[0] < limite:
+                eventos.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_retry(self) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.minimum + self.ratio * len(self._requests):
+            return False
+        self._retries.append(now)
+        return True
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retenta falhas transitórias dentro do ``RetryBudget`` da integração."""
+
+    def __init__(self, integration: Integration, transport: httpx.AsyncBaseTransport) -> None:
+        self.integration = integration
+        self.budget = RetryBudget(integration.retry_ratio, integration.retry_min, integration.retry_window_seconds)
+        self._transport = transport
+
+    def _retryable(self, request: httpx.Request, response: Optional[httpx.Response], exc: Optional[Exception]) -> bool:
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        idempotente = request.method in IDEMPOTENT_METHODS
+        if isinstance(exc, (httpx.ReadTimeout, httpx.RemoteProtocolError)):
+            return idempotente
+        return idempotente and response is not None and response.status_code in RETRY_STATUS
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            response, error = None, None
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as exc:
+                error = exc
+            if attempt >= self.integration.max_retries or not self._retryable(request, response, error):
+                break
+            if not self.budget.try_retry():
+                outbound_retries.inc(service=self.integration.name, outcome="budget_exhausted")
+                break
+            outbound_retries.inc(service=self.integration.name, outcome="retried")
+            if response is not None:
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(self.integration.backoff_seconds * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        if error is not None:
+            raise error
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client(integration: Integration, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """Cliente da integração: pool por host, timeouts, métricas e retentativas."""
+    limits = httpx.Limits(
+        max_connections=integration.max_connections,
+        max_keepalive_connections=integration.max_keepalive_connections,
+        keepalive_expiry=integration.keepalive_expiry,
+    )
+    http2 = get_settings().http_client_http2 and _http2_available()
+    base = transport or httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(integration.timeout, connect=integration.connect_timeout),
+        transport=RetryTransport(integration, outbound_transport(integration.name, base)),
+    )
+
+
+class HttpClients:
+    """Um ``httpx.AsyncClient`` por integração, criado no primeiro uso."""
+
+    def __init__(self, integrations: dict[str, Integration]) -> None:
+        self.integrations = integrations
+        self._lock = threading.Lock()
+        self._clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            atual = self._clients.get(name)
+            if atual is not None and atual[0] is loop and not atual[1].is_closed:
+                return atual[1]
+            # Conexões de outro event loop não podem ser reaproveitadas; o
+            # cliente antigo é descartado sem await (o loop dele já pode ter acabado).
+            client = build_client(self.integrations[name])
+            self._clients[name] = (loop, client)
+            return client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clientes, self._clients = self._clients, {}
+        loop = asyncio.get_running_loop()
+        for name, (dono, client) in clientes.items():
+            if dono is loop:
+                try:
+                    await client.aclose()
+                except Exception:
+                    logger.exception("Falha ao fechar o cliente HTTP de %s", name)
+
+
+http_clients = HttpClients(INTEGRATIONS)
@@ -0,0 +1,4 @@
+"""Rotinas de manutenção executadas fora do ciclo de requisição (cron/Railway).
+
+Cada módulo roda com ``python -m app.jobs.<nome>`` a partir de ``backend/``.
+"""
@@ -0,0 +1,111 @@
+"""Verifica e repara os contadores de presença denormalizados em ``jogos``.
+
+Os contadores são mantidos por trigger em ``presencas``; este job recalcula os
+valores a partir das presenças e informa os jogos com divergência. Com
+``--corrigir`` grava os valores recalculados.
+
+Uso (a partir de ``backend/``):
+
+    python -m app.jobs.contadores_jogos                 # só verifica (sai com 1 se houver divergência)
+    python -m app.jobs.contadores_jogos --corrigir
+    python -m app.jobs.contadores_jogos --racha-id 3 --corrigir
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from typing import Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Jogo, Presenca, StatusPresenca
+
+logger = logging.getLogger(__name__)
+
+CONTADORES = ("total_confirmados", "total_pendentes", "total_recusados")
+
+
+def _contagens_reais(jogo_ids=None):
+    query = select(
+        Presenca.jogo_id,
+        func.count(Presenca.id).filter(Presenca.status == StatusPresenca.CONFIRMADO).label("total_confirmados"),
+        func.count(Presenca.id)
+        .filter(Presenca.status.in_([StatusPresenca.PENDENTE, StatusPresenca.TALVEZ]))
+        .label("total_pendentes"),
+        func.count(Presenca.id).filter(Presenca.status == StatusPresenca.RECUSADO).label("total_recusados"),
+    ).group_by(Presenca.jogo_id)
+    if jogo_ids is not None:
+        query = query.where(Presenca.jogo_id.in_(jogo_ids))
+    return query
+
+
+def verificar_contadores(db: Session, racha_id: Optional[int] = None, corrigir: bool = False) -> dict:
+    """Compara os contadores gravados com as presenças e, se pedido, corrige.
+
+    A comparação é uma única query (jogos LEFT JOIN contagem agregada). Na
+    correção, os jogos divergentes são travados com ``FOR UPDATE`` antes da
+    recontagem, para não sobrescrever uma alteração concorrente já refletida
+    pelo trigger.
+    """
+    reais = _contagens_reais().subquery()
+    recalculados = [func.coalesce(getattr(reais.c, nome), 0) for nome in CONTADORES]
+    escopo = [Jogo.racha_id == racha_id] if racha_id is not None else []
+
+    divergentes = db.execute(
+        select(Jogo.id, *(getattr(Jogo, nome) for nome in CONTADORES), *recalculados)
+        .outerjoin(reais, reais.c.jogo_id == Jogo.id)
+        .where(*escopo, or_(*(getattr(Jogo, nome) != real for nome, real in zip(CONTADORES, recalculados))))
+        .order_by(Jogo.id)
+    ).all()
+    verificados = db.scalar(select(func.count(Jogo.id)).where(*escopo))
+
+    relatorio = {
+        "verificados": verificados,
+        "divergentes": len(divergentes),
+        "corrigidos": 0,
+        "jogos": [
+            {
+                "jogo_id": row[0],
+                "gravado": dict(zip(CONTADORES, row[1:4])),
+                "real": dict(zip(CONTADORES, row[4:7])),
+            }
+            for row in divergentes
+        ],
+    }
+    if not corrigir or not divergentes:
+        return relatorio
+
+    jogo_ids = [row[0] for row in divergentes]
+    db.execute(select(Jogo.id).where(Jogo.id.in_(jogo_ids)).with_for_update())
+    contagens = {row.jogo_id: row for row in db.execute(_contagens_reais(jogo_ids))}
+    db.execute(update(Jogo), [
+        {"id": jogo_id, **{nome: getattr(contagens.get(jogo_id), nome, 0) for nome in CONTADORES}}
+        for jogo_id in jogo_ids
+    ])
+    db.commit()
+    relatorio["corrigidos"] = len(jogo_ids)
+    logger.warning("Contadores de presença corrigidos em %d jogos.", len(jogo_ids))
+    return relatorio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--racha-id", type=int)
+    parser.add_argument("--corrigir", action="store_true", help="grava os valores recalculados")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        relatorio = verificar_contadores(db, racha_id=args.racha_id, corrigir=args.corrigir)
+    print(json.dumps(relatorio, indent=2))
+    if relatorio["divergentes"] and not args.corrigir:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
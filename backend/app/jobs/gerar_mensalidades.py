@@ -0,0 +1,44 @@
+"""Gera as mensalidades de todos os rachas (ou dos escolhidos) numa só passada.
+
+Uso (a partir de ``backend/``):
+
+    python -m app.jobs.gerar_mensalidades                          # mês atual, todos os rachas
+    python -m app.jobs.gerar_mensalidades --referencia 11/2026 --referencia 12/2026
+    python -m app.jobs.gerar_mensalidades --racha-id 3 --racha-id 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from datetime import datetime
+
+from app.services.mensalidades import gerar_mensalidades
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--referencia", action="append", help="mês no formato MM/AAAA (padrão: mês atual)")
+    parser.add_argument("--racha-id", type=int, action="append", help="padrão: todos os rachas ativos")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    referencias = args.referencia or [datetime.utcnow().strftime("%m/%Y")]
+    with SessionLocal() as db:
+        por_racha = gerar_mensalidades(db, referencias, racha_ids=args.racha_id)
+        db.commit()
+    total = sum(por_racha.values())
+    logger.info("Mensalidades geradas: %d em %d rachas.", total, len(por_racha))
+    print(json.dumps({
+        "referencias": referencias,
+        "cobrancas_criadas": total,
+        "por_racha": {str(racha_id): criadas for racha_id, criadas in sorted(por_racha.items())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
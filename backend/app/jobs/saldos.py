@@ -0,0 +1,124 @@
+"""Verifica e reconstrói o livro de saldos (``saldos_atletas``) a partir de ``pagamentos``.
+
+O trigger em ``pagamentos`` mantém o livro a cada escrita; este job existe para
+auditar (``verificar``) e, se preciso, refazer tudo (``reconstruir``).
+
+Uso (a partir de ``backend/``):
+
+    python -m app.jobs.saldos verificar                # sai com 1 se houver divergência
+    python -m app.jobs.saldos verificar --racha-id 3
+    python -m app.jobs.saldos reconstruir [--racha-id 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Atleta, Pagamento, SaldoAtleta
+
+logger = logging.getLogger(__name__)
+
+
+def _totais_pagamentos(racha_id: Optional[int] = None):
+    query = (
+        select(
+            Pagamento.atleta_id,
+            Pagamento.tipo,
+            Pagamento.status,
+            Atleta.racha_id,
+            func.count(Pagamento.id),
+            func.sum(Pagamento.valor),
+        )
+        .join(Atleta, Atleta.id == Pagamento.atleta_id)
+        .group_by(Pagamento.atleta_id, Pagamento.tipo, Pagamento.status, Atleta.racha_id)
+    )
+    if racha_id is not None:
+        query = query.where(Atleta.racha_id == racha_id)
+    return query
+
+
+def verificar_saldos(db: Session, racha_id: Optional[int] = None) -> dict:
+    """Compara o livro com os totais recalculados de ``pagamentos``.
+
+    Linhas zeradas no livro equivalem a ausência de pagamentos.
+    """
+    reais = {
+        (atleta_id, tipo, status): (quantidade, valor or 0)
+        for atleta_id, tipo, status, _, quantidade, valor in db.execute(_totais_pagamentos(racha_id))
+    }
+    livro_query = select(
+        SaldoAtleta.atleta_id, SaldoAtleta.tipo, SaldoAtleta.status, SaldoAtleta.quantidade, SaldoAtleta.valor_total
+    )
+    if racha_id is not None:
+        livro_query = livro_query.where(SaldoAtleta.racha_id == racha_id)
+    livro = {
+        (atleta_id, tipo, status): (quantidade, valor)
+        for atleta_id, tipo, status, quantidade, valor in db.execute(livro_query)
+    }
+
+    divergencias = []
+    for chave in sorted(reais.keys() | livro.keys(), key=lambda c: (c[0], c[1].name, c[2].name)):
+        real = reais.get(chave, (0, 0))
+        gravado = livro.get(chave, (0, 0))
+        if real != gravado:
+            atleta_id, tipo, status = chave
+            divergencias.append({
+                "atleta_id": atleta_id,
+                "tipo": tipo.value,
+                "status": status.value,
+                "gravado": {"quantidade": gravado[0], "valor_total": gravado[1]},
+                "real": {"quantidade": real[0], "valor_total": real[1]},
+            })
+    return {"linhas_verificadas": len(reais.keys() | livro.keys()), "divergentes": len(divergencias), "divergencias": divergencias}
+
+
+def reconstruir_saldos(db: Session, racha_id: Optional[int] = None) -> int:
+    """Refaz o livro (de um racha ou de todos) a partir de ``pagamentos`` e faz commit.
+
+    No Postgres, ``pagamentos`` fica travada para escrita (``SHARE``) durante a
+    reconstrução, para nenhum pagamento escapar entre a leitura e a gravação.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE pagamentos IN SHARE MODE"))
+    apagar = delete(SaldoAtleta)
+    if racha_id is not None:
+        apagar = apagar.where(SaldoAtleta.racha_id == racha_id)
+    db.execute(apagar)
+    result = db.execute(
+        insert(SaldoAtleta).from_select(
+            ["atleta_id", "tipo", "status", "racha_id", "quantidade", "valor_total"],
+            _totais_pagamentos(racha_id),
+        )
+    )
+    db.commit()
+    logger.info("Livro de saldos reconstruído: %d linhas.", result.rowcount)
+    return result.rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["verificar", "reconstruir"])
+    parser.add_argument("--racha-id", type=int)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        if args.comando == "reconstruir":
+            print(json.dumps({"linhas": reconstruir_saldos(db, racha_id=args.racha_id)}))
+            return
+        relatorio = verificar_saldos(db, racha_id=args.racha_id)
+    print(json.dumps(relatorio, indent=2))
+    if relatorio["divergentes"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
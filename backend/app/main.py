@@ -1,13 +1,24 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import logging
 import os
 
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, async_engine, Base
+from app.db_pool import pool_status, async_pool_metrics
+from app.http_clients import http_clients
+from app.metrics import MetricsMiddleware, registry as metrics_registry
+from app.query_stats import QueryStatsMiddleware
 from app.routers import rachas, atletas, jogos, presencas, pagamentos, auth, teams, profile, artilharia, temporadas, assinaturas
-from app.schema_compat import ensure_schema_compatibility
+from app.schema_compat import bootstrap_schema
+from app.services.acesso_racha import acesso_cache_stats
+from app.services.user_cache import user_cache_stats
+from app.services.metricas import registrar_coletores
+from app.services.password_hashing import shutdown_password_hasher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,13 +28,24 @@ logging.basicConfig(
 
 settings = get_settings()
 
-Base.metadata.create_all(bind=engine)
-ensure_schema_compatibility(engine)
+bootstrap_schema(engine, Base.metadata, force=settings.schema_bootstrap_force)
 
 # Cria diretório de uploads se não existe
 upload_path = settings.get_upload_path()
 os.makedirs(upload_path, exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.metrics_enabled:
+        metrics_registry.start_flusher()
+    yield
+    # Fecha as conexões keep-alive com Asaas/Supabase/Google.
+    await http_clients.aclose()
+    shutdown_password_hasher()
+    metrics_registry.stop_flusher()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="API para gestão de rachas/peladas de futebol",
@@ -31,6 +53,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 cors_origins = [origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()]
@@ -40,7 +63,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+if settings.metrics_enabled:
+    metrics_registry.configure_multiprocess(settings.metrics_multiproc_dir, settings.metrics_flush_interval_seconds)
+    registrar_coletores(metrics_registry)
+    app.add_middleware(MetricsMiddleware, metrics=metrics_registry)
+if settings.db_query_stats_enabled:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        debug=settings.debug,
+        n_plus_one_threshold=settings.db_n_plus_one_threshold,
+    )
 
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(teams.router, prefix="/api/v1")
@@ -66,3 +100,28 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+def health_pool():
+    """Estado dos pools de conexão deste worker (para scraping/monitoramento)."""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine, async_pool_metrics),
+    }
+
+
+@app.get("/health/cache")
+def health_cache():
+    """Contadores dos caches em memória deste worker."""
+    return {"users": user_cache_stats(), "racha_access": acesso_cache_stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(request: Request):
+    """Métricas no formato texto do Prometheus (somando todos os workers, se configurado)."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,353 @@
+"""Métricas da API no formato texto do Prometheus, sem dependências externas.
+
+O ``MetricsRegistry`` guarda contadores, gauges e histogramas em memória. O
+``MetricsMiddleware`` mede cada requisição HTTP (latência por rota, status e
+requisições em andamento); pool de conexões e caches entram como coletores,
+lidos no momento da coleta; as chamadas às APIs externas (Asaas, Supabase,
+Google) são medidas pelo transporte ``outbound_transport`` do httpx.
+
+Com vários workers do uvicorn, configure ``metrics_multiproc_dir``: cada worker
+grava um snapshot ``<pid>.json`` no diretório a cada
+``metrics_flush_interval_seconds``, numa thread própria (``start_flusher``, fora
+do event loop), e ``GET /metrics`` soma os snapshots de todos. Contadores e histogramas de workers encerrados continuam somando, como
+no Prometheus; gauges só valem de snapshots recentes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional, Sequence
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER, GAUGE, HISTOGRAM = "counter", "gauge", "histogram"
+
+
+class _Metric:
+    kind: str
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = [[list(key), value] for key, value in self._values.items()]
+        return {"type": self.kind, "help": self.help, "labelnames": list(self.labelnames), "values": values}
+
+
+class Counter(_Metric):
+    kind = COUNTER
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels) -> None:
+        """Para totais acumulados fora do registro (ex.: ``TTLCache.hits``)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Gauge(_Metric):
+    kind = GAUGE
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = HISTOGRAM
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            counts = list(counts)
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        snapshot["values"] = [[key, [list(counts), total, count]] for key, (counts, total, count) in snapshot["values"]]
+        return snapshot
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._multiproc_dir: Optional[str] = None
+        self._flush_interval = 5.0
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flusher = threading.Event()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existente = self._metrics.get(metric.name)
+            if existente is not None:
+                return existente
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Função chamada antes de cada snapshot para atualizar métricas lidas de fora."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Falha no coletor de métricas %r", collector)
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {"pid": os.getpid(), "written_at": time.time(), "metrics": {m.name: m.snapshot() for m in metrics}}
+
+    # Coleta entre workers
+
+    def configure_multiprocess(self, directory: Optional[str], flush_interval: float = 5.0) -> None:
+        self._multiproc_dir = directory or None
+        self._flush_interval = flush_interval
+        if self._multiproc_dir:
+            os.makedirs(self._multiproc_dir, exist_ok=True)
+
+    def start_flusher(self) -> None:
+        """Grava o snapshot a cada ``flush_interval`` numa thread daemon (coletores e I/O fora das requisições)."""
+        if not self._multiproc_dir or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self) -> None:
+        """Para a thread e grava um último snapshot."""
+        flusher, self._flusher = self._flusher, None
+        if flusher is None:
+            return
+        self._stop_flusher.set()
+        flusher.join()
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_flusher.wait(self._flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava o snapshot deste worker no diretório compartilhado (troca atômica do arquivo)."""
+        if not self._multiproc_dir:
+            return
+        destino = os.path.join(self._multiproc_dir, f"{os.getpid()}.json")
+        temporario = f"{destino}.tmp"
+        try:
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(self.snapshot(), arquivo)
+            os.replace(temporario, destino)
+        except OSError:
+            logger.exception("Não foi possível gravar as métricas em %s", destino)
+
+    def _snapshots(self) -> list[dict]:
+        if not self._multiproc_dir:
+            return [self.snapshot()]
+        # Este worker entra pela memória; do disco só vêm os outros (o arquivo
+        # próprio é gravado pela thread do ``start_flusher``, não pela coleta).
+        snapshots = [self.snapshot()]
+        proprio = f"{os.getpid()}.json"
+        for nome in os.listdir(self._multiproc_dir):
+            if not nome.endswith(".json") or nome == proprio:
+                continue
+            try:
+                with open(os.path.join(self._multiproc_dir, nome), encoding="utf-8") as arquivo:
+                    snapshots.append(json.load(arquivo))
+            except (OSError, ValueError):
+                # Arquivo sendo trocado ou corrompido; entra na próxima coleta.
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        """Métricas de todos os workers no formato texto do Prometheus (0.0.4)."""
+        snapshots = self._snapshots()
+        gauges_ate = time.time() - 3 * self._flush_interval
+        merged: dict[str, dict] = {}
+        for snapshot in snapshots:
+            recente = snapshot["pid"] == os.getpid() or snapshot["written_at"] >= gauges_ate
+            for name, metric in snapshot["metrics"].items():
+                if metric["type"] == GAUGE and not recente:
+                    continue
+                destino = merged.setdefault(name, {**metric, "values": {}})
+                for key, value in metric["values"]:
+                    _merge_value(destino, tuple(key), value)
+        return "".join(_render_metric(name, metric) for name, metric in sorted(merged.items()))
+
+
+def _merge_value(metric: dict, key: tuple, value) -> None:
+    atual = metric["values"].get(key)
+    if metric["type"] == HISTOGRAM:
+        counts, total, count = value
+        if atual is None:
+            metric["values"][key] = [list(counts), total, count]
+        else:
+            atual[0] = [a + b for a, b in zip(atual[0], counts)]
+            atual[1] += total
+            atual[2] += count
+    else:
+        metric["values"][key] = (atual or 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pares = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _render_metric(name: str, metric: dict) -> str:
+    linhas = [f"# HELP {name} {metric['help']}", f"# TYPE {name} {metric['type']}"]
+    names = metric["labelnames"]
+    for key, value in sorted(metric["values"].items()):
+        if metric["type"] == HISTOGRAM:
+            counts, total, count = value
+            limites = [_number(limite) for limite in metric["buckets"]] + ["+Inf"]
+            for limite, acumulado in zip(limites, [*counts, count]):
+                le = f'le="{limite}"'
+                linhas.append(f"{name}_bucket{_labels(names, key, le)} {acumulado}")
+            linhas.append(f"{name}_sum{_labels(names, key)} {_number(total)}")
+            linhas.append(f"{name}_count{_labels(names, key)} {count}")
+        else:
+            linhas.append(f"{name}{_labels(names, key)} {_number(value)}")
+    return "\n".join(linhas) + "\n"
+
+
+def _http_metrics(metrics: MetricsRegistry) -> tuple[Counter, Histogram, Gauge]:
+    return (
+        metrics.counter("http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status")),
+        metrics.histogram("http_request_duration_seconds", "Latência das requisições HTTP.", ("method", "route")),
+        metrics.gauge("http_requests_in_progress", "Requisições HTTP em andamento."),
+    )
+
+
+registry = MetricsRegistry()
+
+http_requests, http_request_duration, http_requests_in_progress = _http_metrics(registry)
+outbound_request_duration = registry.histogram(
+    "outbound_request_duration_seconds", "Latência das chamadas a APIs externas (até os headers da resposta).",
+    ("service", "method", "status"),
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência, status e concorrência das requisições HTTP.
+
+    A rota é o template (``/api/v1/jogos/{jogo_id}``), que o roteador do
+    FastAPI deixa em ``scope["route"]``; requisições sem rota correspondente
+    entram como ``<unmatched>`` para não explodir a cardinalidade.
+    """
+
+    def __init__(self, app, *, metrics: MetricsRegistry = registry, exclude_paths: Iterable[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.requests, self.duration, self.in_progress = _http_metrics(metrics)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_progress.dec()
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            method = scope.get("method", "")
+            self.duration.observe(time.perf_counter() - started, method=method, route=route)
+            self.requests.inc(method=method, route=route, status=str(status_code))
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport) -> None:
+        self.service = service
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            outbound_request_duration.observe(
+                time.perf_counter() - started, service=self.service, method=request.method, status=status,
+            )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def outbound_transport(service: str, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncBaseTransport:
+    """Transporte do httpx que mede as chamadas a ``service`` em ``outbound_request_duration_seconds``."""
+    return _InstrumentedTransport(service, transport or httpx.AsyncHTTPTransport())
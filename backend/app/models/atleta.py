@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -38,3 +38,9 @@ class Atleta(Base):
     pagamentos = relationship("Pagamento", back_populates="atleta", cascade="all, delete-orphan")
     cartoes = relationship("Cartao", back_populates="atleta", cascade="all, delete-orphan")
     team_members = relationship("TeamMember", back_populates="atleta", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Elenco ativo do racha e "qual o meu atleta neste racha".
+        Index("ix_atletas_racha_ativo", "racha_id", "ativo"),
+        Index("ix_atletas_user_racha", "user_id", "racha_id"),
+    )
@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Column, Integer, ForeignKey, DateTime
+﻿from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -17,3 +17,7 @@ class AtletaStat(Base):
 
     atleta = relationship("Atleta")
     racha = relationship("Racha")
+
+    __table_args__ = (
+        Index("ux_atleta_stats_racha_atleta", "racha_id", "atleta_id", unique=True),
+    )
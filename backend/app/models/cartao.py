@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -25,3 +25,8 @@ class Cartao(Base):
 
     atleta = relationship("Atleta", back_populates="cartoes")
     jogo = relationship("Jogo", back_populates="cartoes")
+
+    __table_args__ = (
+        # Cartões recentes do atleta por tipo (suspensões e multas).
+        Index("ix_cartoes_atleta_tipo_created", "atleta_id", "tipo", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -22,9 +22,19 @@ class Jogo(Base):
     time_b_nome = Column(String(80), nullable=True)
     placar_time_a = Column(Integer, nullable=True)
     placar_time_b = Column(Integer, nullable=True)
+    # Contadores da lista de presença, mantidos por trigger em ``presencas``
+    # (ver ``schema_compat``); TALVEZ conta como pendente.
+    total_confirmados = Column(Integer, nullable=False, default=0, server_default="0")
+    total_pendentes = Column(Integer, nullable=False, default=0, server_default="0")
+    total_recusados = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=False), server_default=func.now())  
     updated_at = Column(DateTime(timezone=False), onupdate=func.now())  
 
     racha = relationship("Racha", back_populates="jogos")
     presencas = relationship("Presenca", back_populates="jogo", cascade="all, delete-orphan")
     cartoes = relationship("Cartao", back_populates="jogo", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Agenda do racha: jogos não cancelados ordenados por data.
+        Index("ix_jogos_racha_cancelado_data", "racha_id", "cancelado", "data_hora"),
+    )
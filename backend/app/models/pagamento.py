@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index, Text, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -39,3 +39,14 @@ class Pagamento(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     atleta = relationship("Atleta", back_populates="pagamentos")
+
+    __table_args__ = (
+        # Uma mensalidade por atleta e referência (multas do mesmo mês podem se repetir).
+        Index(
+            "ux_pagamentos_mensalidade", "atleta_id", "tipo", "referencia",
+            unique=True, postgresql_where=text("tipo = 'MENSALIDADE'"),
+        ),
+        # Extrato do atleta (inclui multas) e fila de aprovação por status.
+        Index("ix_pagamentos_atleta_tipo_ref", "atleta_id", "tipo", "referencia"),
+        Index("ix_pagamentos_status_created", "status", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -27,4 +27,7 @@ class Presenca(Base):
 
     __table_args__ = (
         UniqueConstraint("jogo_id", "atleta_id", name="unique_presenca_jogo_atleta"),
+        # Lista de presença por status e histórico do atleta.
+        Index("ix_presencas_jogo_status", "jogo_id", "status"),
+        Index("ix_presencas_atleta_id", "atleta_id"),
     )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, Enum, ForeignKey
+from app.database import Base
+from app.models.pagamento import TipoPagamento, StatusPagamento
+
+
+class SaldoAtleta(Base):
+    """Totais dos pagamentos de um atleta por tipo e status.
+
+    Mantido por trigger em ``pagamentos`` (ver ``schema_compat``); o saldo do
+    racha é a soma das linhas dos seus atletas. Verificação e reconstrução em
+    ``python -m app.jobs.saldos``.
+    """
+
+    __tablename__ = "saldos_atletas"
+
+    atleta_id = Column(Integer, ForeignKey("atletas.id", ondelete="CASCADE"), primary_key=True)
+    tipo = Column(Enum(TipoPagamento), primary_key=True)
+    status = Column(Enum(StatusPagamento), primary_key=True)
+    racha_id = Column(Integer, ForeignKey("rachas.id"), nullable=False, index=True)
+    quantidade = Column(Integer, nullable=False, default=0, server_default="0")
+    valor_total = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -21,3 +21,7 @@ class TeamMember(Base):
 
     team = relationship("Team", back_populates="membros")
     atleta = relationship("Atleta", back_populates="team_members")
+
+    __table_args__ = (
+        Index("ix_team_members_team_ativo", "team_id", "ativo"),
+    )
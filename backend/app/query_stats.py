@@ -0,0 +1,181 @@
+"""Instrumentação de SQL por requisição.
+
+Os eventos ``before/after_cursor_execute`` dos engines (síncrono e asyncpg)
+registram cada statement no ``RequestQueryStats`` da requisição corrente,
+guardado num ``ContextVar``. As rotas síncronas rodam no threadpool com uma
+cópia do contexto, que aponta para o mesmo objeto, então as queries delas
+também entram na conta.
+
+No fim da requisição o ``QueryStatsMiddleware``:
+
+* em modo debug, devolve os totais nos headers ``X-DB-*``;
+* fora do debug, escreve uma linha de log em JSON (logger ``app.query_stats``).
+
+Statements com o mesmo formato (literais e listas de ``IN`` normalizados)
+repetidos ``db_n_plus_one_threshold`` vezes ou mais na mesma requisição são
+apontados como suspeitas de N+1, com um ``WARNING`` em qualquer modo.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestQueryStats"]] = ContextVar("request_query_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|\?|%s")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Formato do statement: literais e parâmetros viram ``?`` e listas de ``IN`` viram ``(?)``."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestQueryStats:
+    """Totais das queries de uma requisição."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.shapes[shape] += 1
+            if seconds >= self.slowest_seconds:
+                self.slowest_seconds = seconds
+                self.slowest_statement = shape
+
+    def n_plus_one(self, threshold: int) -> list[tuple[str, int]]:
+        """Formatos repetidos pelo menos ``threshold`` vezes, do mais repetido ao menos."""
+        if threshold <= 0:
+            return []
+        with self._lock:
+            return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def start_request_stats() -> tuple[RequestQueryStats, object]:
+    """Começa a contar as queries do contexto atual; devolve os totais e o token do ``ContextVar``."""
+    stats = RequestQueryStats()
+    return stats, _current.set(stats)
+
+
+def finish_request_stats(token) -> None:
+    _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Registra os eventos de cursor no engine (para o asyncpg, use ``async_engine.sync_engine``)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI que abre um ``RequestQueryStats`` por requisição HTTP."""
+
+    def __init__(self, app, *, debug: bool, n_plus_one_threshold: int) -> None:
+        self.app = app
+        self.debug = debug
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug:
+                    message = {**message, "headers": [*message.get("headers", ()), *self._headers(stats)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            finish_request_stats(token)
+            self._report(scope, stats, status_code, time.perf_counter() - started)
+
+    def _headers(self, stats: RequestQueryStats) -> list[tuple[bytes, bytes]]:
+        # Retrato no início da resposta; queries feitas durante um streaming não entram.
+        headers = [
+            (b"x-db-query-count", str(stats.count).encode()),
+            (b"x-db-time-ms", f"{stats.total_seconds * 1000:.2f}".encode()),
+            (b"x-db-slowest-ms", f"{stats.slowest_seconds * 1000:.2f}".encode()),
+        ]
+        if stats.slowest_statement:
+            headers.append((b"x-db-slowest-statement", stats.slowest_statement[:200].encode("latin-1", "replace")))
+        suspeitas = stats.n_plus_one(self.n_plus_one_threshold)
+        if suspeitas:
+            headers.append((b"x-db-n-plus-one", str(len(suspeitas)).encode()))
+        return headers
+
+    def _report(self, scope, stats: RequestQueryStats, status_code: int, seconds: float) -> None:
+        path = scope.get("path", "")
+        suspeitas = stats.n_plus_one(self.n_plus_one_threshold)
+        for shape, repeticoes in suspeitas:
+            logger.warning(
+                "Possível N+1 em %s %s: %d execuções de %s",
+                scope.get("method"), path, repeticoes, shape[:300],
+            )
+        if self.debug or stats.count == 0:
+            return
+        logger.info(json.dumps({
+            "event": "request_sql",
+            "method": scope.get("method"),
+            "path": path,
+            "status": status_code,
+            "duration_ms": round(seconds * 1000, 2),
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.total_seconds * 1000, 2),
+            "db_slowest_ms": round(stats.slowest_seconds * 1000, 2),
+            "db_slowest_statement": (stats.slowest_statement or "")[:300],
+            "n_plus_one": [{"statement": shape[:300], "count": n} for shape, n in suspeitas],
+        }, ensure_ascii=False))
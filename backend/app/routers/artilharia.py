@@ -1,12 +1,14 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
+﻿from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
 from app.models import Atleta, AtletaStat, User
 from app.schemas.artilharia import ArtilhariaItem, ArtilhariaUpdate, ArtilhariaResponse
 from app.services.auth import get_current_user
 from app.deps import verificar_acesso_racha, verificar_admin_racha
+from app.utils.cursor import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/artilharia", tags=["Artilharia"])
 
@@ -20,30 +22,67 @@ def get_or_create_stat(db: Session, atleta: Atleta) -> AtletaStat:
         return stat
     stat = AtletaStat(atleta_id=atleta.id, racha_id=atleta.racha_id, gols=0, assistencias=0)
     db.add(stat)
-    db.commit()
-    db.refresh(stat)
+    db.flush()
     return stat
 
 
 @router.get("/", response_model=List[ArtilhariaItem])
-def listar_artilharia(racha_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def listar_artilharia(
+    racha_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Ranking de gols/assistências dos atletas ativos, ordenado no banco.
+
+    Sem ``limit`` devolve o ranking inteiro. Com ``limit`` devolve o top N e,
+    se houver mais, o header ``X-Next-Cursor``; passe-o em ``cursor`` para a
+    próxima página (paginação keyset sobre a própria ordem do ranking).
+    Atletas sem linha em ``atleta_stats`` aparecem com zero — a leitura não
+    cria registros.
+    """
     verificar_acesso_racha(db, current_user, racha_id)
-    atletas = db.query(Atleta).filter(Atleta.racha_id == racha_id, Atleta.ativo.is_(True)).all()
-    items = []
-    for atleta in atletas:
-        stat = get_or_create_stat(db, atleta)
-        items.append(ArtilhariaItem(
-            atleta_id=atleta.id,
-            racha_id=racha_id,
-            nome=atleta.nome,
-            apelido=atleta.apelido,
-            posicao=atleta.posicao.value if atleta.posicao else None,
-            foto_url=atleta.foto_url,
-            gols=stat.gols,
-            assistencias=stat.assistencias,
+    gols = func.coalesce(AtletaStat.gols, 0)
+    assistencias = func.coalesce(AtletaStat.assistencias, 0)
+    query = (
+        select(Atleta.id, Atleta.nome, Atleta.apelido, Atleta.posicao, Atleta.foto_url,
+               gols.label("gols"), assistencias.label("assistencias"))
+        .outerjoin(AtletaStat, and_(AtletaStat.atleta_id == Atleta.id, AtletaStat.racha_id == Atleta.racha_id))
+        .where(Atleta.racha_id == racha_id, Atleta.ativo.is_(True))
+        .order_by(gols.desc(), assistencias.desc(), Atleta.nome, Atleta.id)
+    )
+    if cursor:
+        c_gols, c_assistencias, c_nome, c_id = decode_cursor(cursor, (int, int, str, int))
+        # Ordem mista (gols/assistências DESC, nome/id ASC): sem comparação de tupla.
+        query = query.where(or_(
+            gols < c_gols,
+            and_(gols == c_gols, assistencias < c_assistencias),
+            and_(gols == c_gols, assistencias == c_assistencias, Atleta.nome > c_nome),
+            and_(gols == c_gols, assistencias == c_assistencias, Atleta.nome == c_nome, Atleta.id > c_id),
         ))
-    items.sort(key=lambda i: (-i.gols, -i.assistencias, i.nome))
-    return items
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = db.execute(query).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        ultimo = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([ultimo.gols, ultimo.assistencias, ultimo.nome, ultimo.id])
+    return [
+        ArtilhariaItem(
+            atleta_id=row.id,
+            racha_id=racha_id,
+            nome=row.nome,
+            apelido=row.apelido,
+            posicao=row.posicao.value if row.posicao else None,
+            foto_url=row.foto_url,
+            gols=row.gols,
+            assistencias=row.assistencias,
+        )
+        for row in rows
+    ]
 
 
 @router.patch("/{atleta_id}", response_model=ArtilhariaResponse)
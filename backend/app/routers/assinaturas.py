@@ -12,6 +12,7 @@ from app.deps import assinatura_ativa
 from app.models import User, UserRole
 from app.services import asaas
 from app.services.auth import get_current_user
+from app.services.user_cache import invalidate_user
 
 router = APIRouter(prefix="/assinaturas", tags=["Assinaturas"])
 logger = logging.getLogger(__name__)
@@ -91,11 +92,14 @@ async def assinar(payload: AssinarRequest, request: Request, db: Session = Depen
         remote_ip=request.client.host if request.client else None,
     )
 
-    current_user.cpf_cnpj = cpf_cnpj
-    current_user.asaas_customer_id = customer_id
-    current_user.asaas_subscription_id = sub["id"]
-    current_user.subscription_status = "pending"
+    # current_user é um snapshot imutável; a alteração vai no registro da sessão.
+    user = db.get(User, current_user.id)
+    user.cpf_cnpj = cpf_cnpj
+    user.asaas_customer_id = customer_id
+    user.asaas_subscription_id = sub["id"]
+    user.subscription_status = "pending"
     db.commit()
+    invalidate_user(user.id)
 
     # Busca a primeira cobrança da assinatura para devolver link/QR Pix ao front
     invoice_url = None
@@ -162,4 +166,5 @@ async def webhook_asaas(request: Request, db: Session = Depends(get_db)):
         user.subscription_status = "canceled"
 
     db.commit()
+    invalidate_user(user.id)
     return {"received": True}
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import exists, func, select, tuple_
 from typing import List, Optional
 from datetime import datetime
 import os
@@ -8,7 +9,8 @@ import uuid
 import shutil
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.file_upload import ALLOWED_IMAGE_EXTENSIONS, validate_image_mime
 from app.models import (
     Atleta,
@@ -21,10 +23,15 @@ from app.models import (
     Pagamento,
     TipoPagamento,
     StatusPagamento,
+    Presenca,
+    StatusPresenca,
+    SaldoAtleta,
 )
 from app.schemas.atleta import AtletaCreate, AtletaUpdate, AtletaResponse
 from app.services.auth import get_current_user
 from app.deps import verificar_acesso_racha, verificar_admin_racha
+from app.services.acesso_racha import invalidar_acessos
+from app.services.saldos import STATUS_PENDENTES
 from app.config import get_settings
 
 router = APIRouter(prefix="/atletas", tags=["Atletas"])
@@ -78,22 +85,137 @@ def criar_atleta(atleta: AtletaCreate, db: Session = Depends(get_db), current_us
 
 
 @router.get("/", response_model=List[AtletaResponse])
-def listar_atletas(
+async def listar_atletas(
     racha_id: int,
+    response: Response,
     posicao: Optional[Posicao] = None,
     ativo: bool = True,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Atletas do racha por ``(nome, id)``.
+
+    Se houver mais, o header ``X-Next-Cursor`` traz o cursor da próxima
+    página; passado em ``cursor``, ele substitui ``skip``.
+    """
     # Verifica se o usuário tem acesso ao racha
-    verificar_acesso_racha(db, current_user, racha_id)
+    await db.run_sync(verificar_acesso_racha, current_user, racha_id)
 
-    query = db.query(Atleta).filter(Atleta.racha_id == racha_id, Atleta.ativo == ativo)
+    query = select(Atleta).where(Atleta.racha_id == racha_id, Atleta.ativo == ativo)
     if posicao:
-        query = query.filter(Atleta.posicao == posicao)
-    return query.order_by(Atleta.nome).offset(skip).limit(limit).all()
+        query = query.where(Atleta.posicao == posicao)
+    if cursor:
+        c_nome, c_id = decode_cursor(cursor, (str, int))
+        query = query.where(tuple_(Atleta.nome, Atleta.id) > (c_nome, c_id))
+        skip = 0
+    atletas = (await db.scalars(query.order_by(Atleta.nome, Atleta.id).offset(skip).limit(limit + 1))).all()
+    if len(atletas) > limit:
+        atletas = atletas[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([atletas[-1].nome, atletas[-1].id])
+    return atletas
+
+
+def _consultar_historicos(db: Session, *, atleta_id: Optional[int] = None, racha_id: Optional[int] = None) -> List[dict]:
+    """Histórico de um atleta ou de todos os atletas ativos de um racha, numa única query.
+
+    Presenças, saldos e cartões são agregados por atleta com ``FILTER`` em
+    subqueries (restritas aos mesmos atletas) e ligados por LEFT JOIN.
+    """
+    if atleta_id is not None:
+        escopo = select(Atleta.id).where(Atleta.id == atleta_id)
+    else:
+        escopo = select(Atleta.id).where(Atleta.racha_id == racha_id, Atleta.ativo.is_(True))
+    referencia_mes_atual = datetime.utcnow().strftime("%m/%Y")
+
+    presencas = (
+        select(
+            Presenca.atleta_id,
+            func.count(Presenca.id).label("total_jogos"),
+            func.count(Presenca.id).filter(Presenca.status == StatusPresenca.CONFIRMADO).label("confirmados"),
+        )
+        .where(Presenca.atleta_id.in_(escopo))
+        .group_by(Presenca.atleta_id)
+        .subquery()
+    )
+    saldos = (
+        select(
+            SaldoAtleta.atleta_id,
+            func.sum(SaldoAtleta.valor_total).filter(SaldoAtleta.status == StatusPagamento.APROVADO).label("total_pago"),
+            func.sum(SaldoAtleta.valor_total).filter(SaldoAtleta.status.in_(STATUS_PENDENTES)).label("total_pendente"),
+        )
+        .where(SaldoAtleta.atleta_id.in_(escopo))
+        .group_by(SaldoAtleta.atleta_id)
+        .subquery()
+    )
+    cartoes = (
+        select(
+            Cartao.atleta_id,
+            func.count(Cartao.id).filter(Cartao.tipo == TipoCartao.AMARELO).label("amarelos"),
+            func.count(Cartao.id).filter(Cartao.tipo == TipoCartao.VERMELHO).label("vermelhos"),
+        )
+        .where(Cartao.atleta_id.in_(escopo))
+        .group_by(Cartao.atleta_id)
+        .subquery()
+    )
+    mensalidade_paga = exists().where(
+        Pagamento.atleta_id == Atleta.id,
+        Pagamento.tipo == TipoPagamento.MENSALIDADE,
+        Pagamento.referencia == referencia_mes_atual,
+        Pagamento.status == StatusPagamento.APROVADO,
+    )
+
+    rows = db.execute(
+        select(
+            Atleta.id,
+            func.coalesce(presencas.c.total_jogos, 0).label("total_jogos"),
+            func.coalesce(presencas.c.confirmados, 0).label("confirmados"),
+            func.coalesce(saldos.c.total_pago, 0).label("total_pago"),
+            func.coalesce(saldos.c.total_pendente, 0).label("total_pendente"),
+            func.coalesce(cartoes.c.amarelos, 0).label("amarelos"),
+            func.coalesce(cartoes.c.vermelhos, 0).label("vermelhos"),
+            mensalidade_paga.label("pagamento_mes_atual"),
+        )
+        .outerjoin(presencas, presencas.c.atleta_id == Atleta.id)
+        .outerjoin(saldos, saldos.c.atleta_id == Atleta.id)
+        .outerjoin(cartoes, cartoes.c.atleta_id == Atleta.id)
+        .where(Atleta.id.in_(escopo))
+        .order_by(Atleta.nome, Atleta.id)
+    ).all()
+
+    return [
+        {
+            "atleta_id": row.id,
+            "presencas": {"total_jogos": row.total_jogos, "confirmados": row.confirmados,
+                          "taxa_presenca": f"{(row.confirmados / row.total_jogos * 100):.1f}%" if row.total_jogos > 0 else "0%"},
+            "financeiro": {"total_pago": int(row.total_pago), "total_pendente": int(row.total_pendente),
+                           "pago_formatado": f"R$ {row.total_pago / 100:.2f}", "pendente_formatado": f"R$ {row.total_pendente / 100:.2f}",
+                           "referencia_mes_atual": referencia_mes_atual,
+                           "pagamento_confirmado_mes_atual": bool(row.pagamento_mes_atual)},
+            "cartoes": {"amarelos": row.amarelos, "vermelhos": row.vermelhos},
+        }
+        for row in rows
+    ]
+
+
+@router.get("/historico")
+def listar_historicos(racha_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Histórico de todos os atletas ativos do racha (tela de elenco do admin)."""
+    acesso = verificar_acesso_racha(db, current_user, racha_id)
+    if not acesso.is_admin:
+        raise HTTPException(status_code=403, detail="Apenas administradores podem realizar esta ação")
+    return _consultar_historicos(db, racha_id=racha_id)
+
+
+@router.get("/{atleta_id}/historico")
+def obter_historico(atleta_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    atleta = db.query(Atleta).filter(Atleta.id == atleta_id).first()
+    if not atleta:
+        raise HTTPException(status_code=404, detail="Atleta não encontrado")
+    verificar_acesso_racha(db, current_user, atleta.racha_id)
+    return _consultar_historicos(db, atleta_id=atleta_id)[0]
 
 
 @router.get("/{atleta_id}", response_model=AtletaResponse)
@@ -119,6 +241,8 @@ def atualizar_atleta(atleta_id: int, atleta_update: AtletaUpdate, db: Session =
             raise HTTPException(status_code=400, detail="Limite de 5 administradores atingido")
     for field, value in update_data.items():
         setattr(atleta, field, value)
+    if "ativo" in update_data:
+        invalidar_acessos(db, atleta.user_id)
     db.commit()
     db.refresh(atleta)
     return atleta
@@ -131,45 +255,10 @@ def remover_atleta(atleta_id: int, db: Session = Depends(get_db), current_user:
         raise HTTPException(status_code=404, detail="Atleta não encontrado")
     verificar_admin_racha(db, current_user, atleta.racha_id)
     atleta.ativo = False
+    invalidar_acessos(db, atleta.user_id)
     db.commit()
 
 
-@router.get("/{atleta_id}/historico")
-def obter_historico(atleta_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    from app.models import Presenca, StatusPresenca
-    atleta = db.query(Atleta).filter(Atleta.id == atleta_id).first()
-    if not atleta:
-        raise HTTPException(status_code=404, detail="Atleta não encontrado")
-    verificar_acesso_racha(db, current_user, atleta.racha_id)
-    total_jogos = db.query(func.count(Presenca.id)).filter(Presenca.atleta_id == atleta_id).scalar()
-    confirmados = db.query(func.count(Presenca.id)).filter(
-        Presenca.atleta_id == atleta_id, Presenca.status == StatusPresenca.CONFIRMADO).scalar()
-    total_pago = db.query(func.sum(Pagamento.valor)).filter(
-        Pagamento.atleta_id == atleta_id, Pagamento.status == StatusPagamento.APROVADO).scalar() or 0
-    total_pendente = db.query(func.sum(Pagamento.valor)).filter(
-        Pagamento.atleta_id == atleta_id,
-        Pagamento.status.in_([StatusPagamento.PENDENTE, StatusPagamento.AGUARDANDO_APROVACAO])).scalar() or 0
-    amarelos = db.query(func.count(Cartao.id)).filter(Cartao.atleta_id == atleta_id, Cartao.tipo == "amarelo").scalar()
-    vermelhos = db.query(func.count(Cartao.id)).filter(Cartao.atleta_id == atleta_id, Cartao.tipo == "vermelho").scalar()
-    referencia_mes_atual = datetime.utcnow().strftime("%m/%Y")
-    pagamento_mes_atual = db.query(Pagamento.id).filter(
-        Pagamento.atleta_id == atleta_id,
-        Pagamento.tipo == TipoPagamento.MENSALIDADE,
-        Pagamento.referencia == referencia_mes_atual,
-        Pagamento.status == StatusPagamento.APROVADO
-    ).first()
-    return {
-        "atleta_id": atleta_id,
-        "presencas": {"total_jogos": total_jogos, "confirmados": confirmados,
-                      "taxa_presenca": f"{(confirmados / total_jogos * 100):.1f}%" if total_jogos > 0 else "0%"},
-        "financeiro": {"total_pago": total_pago, "total_pendente": total_pendente,
-                       "pago_formatado": f"R$ {total_pago / 100:.2f}", "pendente_formatado": f"R$ {total_pendente / 100:.2f}",
-                       "referencia_mes_atual": referencia_mes_atual,
-                       "pagamento_confirmado_mes_atual": bool(pagamento_mes_atual)},
-        "cartoes": {"amarelos": amarelos, "vermelhos": vermelhos}
-    }
-
-
 @router.post("/{atleta_id}/cartoes")
 def adicionar_cartao(
     atleta_id: int,
@@ -181,7 +270,7 @@ def adicionar_cartao(
     if not atleta:
         raise HTTPException(status_code=404, detail="Atleta nao encontrado")
 
-    admin = verificar_admin_racha(db, current_user, atleta.racha_id)
+    verificar_admin_racha(db, current_user, atleta.racha_id)
 
     if payload.jogo_id:
         jogo = db.query(Jogo).filter(Jogo.id == payload.jogo_id, Jogo.racha_id == atleta.racha_id).first()
@@ -200,7 +289,8 @@ def adicionar_cartao(
     )
     db.add(cartao)
 
-    valor_multa = admin.racha.valor_cartao_amarelo if payload.tipo == TipoCartao.AMARELO else admin.racha.valor_cartao_vermelho
+    racha = db.get(Racha, atleta.racha_id)
+    valor_multa = racha.valor_cartao_amarelo if payload.tipo == TipoCartao.AMARELO else racha.valor_cartao_vermelho
     if valor_multa and valor_multa > 0:
         pagamento = Pagamento(
             atleta_id=atleta.id,
@@ -275,7 +365,7 @@ def confirmar_pagamento_atleta(
 
     if payload.confirmado:
         if not pagamento:
-            valor = payload.valor if payload.valor is not None else admin.racha.valor_mensalidade
+            valor = payload.valor if payload.valor is not None else db.get(Racha, atleta.racha_id).valor_mensalidade
             if not valor or valor <= 0:
                 raise HTTPException(status_code=400, detail="Informe um valor maior que zero para confirmar o pagamento")
             pagamento = Pagamento(
@@ -288,7 +378,7 @@ def confirmar_pagamento_atleta(
             db.add(pagamento)
 
         pagamento.status = StatusPagamento.APROVADO
-        pagamento.aprovado_por = admin.id
+        pagamento.aprovado_por = admin.admin_id
         pagamento.data_aprovacao = datetime.utcnow()
         pagamento.motivo_rejeicao = None
     else:
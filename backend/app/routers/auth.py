@@ -19,7 +19,8 @@ from app.schemas.user import (
 from app.schemas.invite import InviteCreate, InviteResponse, InviteAccept
 from app.services.auth import (
     hash_password,
-    verify_password,
+    unusable_password,
+    verify_and_update_password,
     create_access_token,
     create_password_reset_token,
     verify_password_reset_token,
@@ -29,6 +30,7 @@ from app.services.google_auth import exchange_code_for_tokens, get_google_user_i
 from app.services.supabase_auth import get_supabase_user
 from app.services.email_service import send_password_reset_email
 from app.services.invite_service import processar_invite
+from app.services.user_cache import invalidate_user
 from app.deps import verificar_admin_racha
 from app.config import get_settings
 
@@ -87,8 +89,15 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(
         or_(User.email == payload.identificador, User.telefone == payload.identificador)
     ).first()
-    if not user or not verify_password(payload.senha, user.senha_hash):
+    if not user:
+        raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    senha_ok, novo_hash = verify_and_update_password(payload.senha, user.senha_hash)
+    if not senha_ok:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    if novo_hash:
+        # Hash gravado com outro custo (bcrypt_rounds mudou): regrava com o atual.
+        user.senha_hash = novo_hash
+        db.commit()
 
     if payload.push_token:
         existing = db.query(PushToken).filter(
@@ -186,7 +195,7 @@ async def google_auth(payload: GoogleAuthRequest, db: Session = Depends(get_db))
         user = User(
             nome=google_user.get("name", email.split("@")[0]),
             email=email,
-            senha_hash=hash_password(uuid.uuid4().hex),
+            senha_hash=unusable_password(),
             role=payload.role,
             ativo=True,
         )
@@ -229,7 +238,7 @@ async def supabase_exchange(payload: SupabaseExchangeRequest, db: Session = Depe
         user = User(
             nome=nome,
             email=email,
-            senha_hash=hash_password(uuid.uuid4().hex),
+            senha_hash=unusable_password(),
             role=payload.role,
             ativo=True,
         )
@@ -278,4 +287,5 @@ def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db))
 
     user.senha_hash = hash_password(payload.new_password)
     db.commit()
+    invalidate_user(user.id)
     return {"message": "Senha redefinida com sucesso"}
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import insert, literal, select, tuple_
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
+import json
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import Jogo, Racha, Presenca, Atleta, StatusPresenca, User, Team
-from app.schemas.jogo import JogoCreate, JogoUpdate, JogoResponse
+from app.schemas.jogo import JogoCreate, JogoRecorrenteCreate, JogoUpdate, JogoResponse
 from app.services.auth import get_current_user
+from app.services.presenca_eventos import RESYNC, get_broker, item_lista
 from app.deps import verificar_acesso_racha
+from app.utils.cursor import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/jogos", tags=["Jogos"])
 
 BRT = timezone(timedelta(hours=-3)) 
+STREAM_KEEPALIVE_SECONDS = 15
 
 
 def _resolve_team(db: Session, racha_id: int, team_id: Optional[int]):
@@ -24,13 +30,11 @@ def _resolve_team(db: Session, racha_id: int, team_id: Optional[int]):
     return team
 
 
-@router.post("/", response_model=JogoResponse, status_code=status.HTTP_201_CREATED)
-def criar_jogo(jogo: JogoCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    verificar_acesso_racha(db, current_user, jogo.racha_id)
+def _preparar_dados_jogo(db: Session, jogo: JogoCreate, exclude: Optional[set] = None) -> dict:
     racha = db.query(Racha).filter(Racha.id == jogo.racha_id).first()
     if not racha:
         raise HTTPException(status_code=404, detail="Racha não encontrado")
-    data = jogo.model_dump()
+    data = jogo.model_dump(exclude=exclude)
     if data.get("valor_campo") is None:
         data["valor_campo"] = 0
 
@@ -40,44 +44,84 @@ def criar_jogo(jogo: JogoCreate, db: Session = Depends(get_db), current_user: Us
         data["time_a_nome"] = team_a.nome
     if team_b and not data.get("time_b_nome"):
         data["time_b_nome"] = team_b.nome
+    return data
+
+
+def _materializar_lista(db: Session, jogo_ids: List[int]) -> int:
+    """Cria a presença PENDENTE de cada atleta ativo nos jogos informados.
+
+    Um único ``INSERT ... SELECT`` (jogos JOIN atletas do mesmo racha), na
+    transação corrente. Retorna o número de presenças criadas.
+    """
+    if not jogo_ids:
+        return 0
+    lista = (
+        select(Jogo.id, Atleta.id, literal(StatusPresenca.PENDENTE, Presenca.status.type))
+        .join(Atleta, Atleta.racha_id == Jogo.racha_id)
+        .where(Jogo.id.in_(jogo_ids), Atleta.ativo.is_(True))
+    )
+    result = db.execute(insert(Presenca).from_select(["jogo_id", "atleta_id", "status"], lista))
+    return result.rowcount
+
+
+@router.post("/", response_model=JogoResponse, status_code=status.HTTP_201_CREATED)
+def criar_jogo(jogo: JogoCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    verificar_acesso_racha(db, current_user, jogo.racha_id)
+    data = _preparar_dados_jogo(db, jogo)
 
     db_jogo = Jogo(**data)
     db.add(db_jogo)
+    db.flush()
+    _materializar_lista(db, [db_jogo.id])
     db.commit()
     db.refresh(db_jogo)
-    atletas = db.query(Atleta).filter(Atleta.racha_id == jogo.racha_id, Atleta.ativo.is_(True)).all()
-    for atleta in atletas:
-        presenca = Presenca(jogo_id=db_jogo.id, atleta_id=atleta.id, status=StatusPresenca.PENDENTE)
-        db.add(presenca)
+    return JogoResponse(**{c.name: getattr(db_jogo, c.name) for c in db_jogo.__table__.columns})
+
+
+@router.post("/recorrentes", response_model=List[JogoResponse], status_code=status.HTTP_201_CREATED)
+def criar_jogos_recorrentes(payload: JogoRecorrenteCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Agenda vários jogos de uma vez (ex.: toda quarta às 20h pelo próximo ano), já com as listas de presença."""
+    verificar_acesso_racha(db, current_user, payload.racha_id)
+    data = _preparar_dados_jogo(db, payload, exclude={"semanas", "intervalo_dias"})
+    intervalo = timedelta(days=payload.intervalo_dias)
+    rows = [
+        {**data, "data_hora": payload.data_hora + intervalo * semana, "finalizado": False, "cancelado": False}
+        for semana in range(payload.semanas)
+    ]
+
+    jogo_ids = db.scalars(insert(Jogo).returning(Jogo.id), rows).all()
+    _materializar_lista(db, jogo_ids)
+    # Relê os jogos depois das presenças (o trigger atualizou os contadores) e
+    # monta a resposta antes do commit: depois dele cada jogo expiraria e seria
+    # recarregado com um SELECT próprio.
+    jogos = db.scalars(select(Jogo).where(Jogo.id.in_(jogo_ids)).order_by(Jogo.data_hora)).all()
+    response = [JogoResponse(**{c.name: getattr(j, c.name) for c in j.__table__.columns}) for j in jogos]
     db.commit()
-    return JogoResponse(**{c.name: getattr(db_jogo, c.name) for c in db_jogo.__table__.columns}, total_confirmados=0)
+    return response
 
 
 @router.get("/", response_model=List[JogoResponse])
-def listar_jogos(racha_id: int, apenas_futuros: bool = True, skip: int = 0, limit: int = 50, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    verificar_acesso_racha(db, current_user, racha_id)
-    query = db.query(Jogo).filter(Jogo.racha_id == racha_id, Jogo.cancelado.is_(False))
+async def listar_jogos(racha_id: int, response: Response, apenas_futuros: bool = True, skip: int = 0, limit: int = 50,
+                       cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """Jogos do racha por ``(data_hora, id)``.
+
+    Se houver mais jogos, o header ``X-Next-Cursor`` traz o cursor da próxima
+    página; passado em ``cursor``, ele substitui ``skip`` (paginação keyset).
+    """
+    await db.run_sync(verificar_acesso_racha, current_user, racha_id)
+    query = select(Jogo).where(Jogo.racha_id == racha_id, Jogo.cancelado.is_(False))
     if apenas_futuros:
         agora_brt = datetime.now(BRT).replace(tzinfo=None)
-        query = query.filter(Jogo.data_hora >= agora_brt)
-    jogos = query.order_by(Jogo.data_hora).offset(skip).limit(limit).all()
-    jogo_ids = [j.id for j in jogos]
-
-    # Busca todos os contadores de confirmados em uma única query
-    confirmados_por_jogo: dict[int, int] = {}
-    if jogo_ids:
-        rows = (
-            db.query(Presenca.jogo_id, func.count(Presenca.id))
-            .filter(Presenca.jogo_id.in_(jogo_ids), Presenca.status == StatusPresenca.CONFIRMADO)
-            .group_by(Presenca.jogo_id)
-            .all()
-        )
-        confirmados_por_jogo = {jogo_id: count for jogo_id, count in rows}
-
-    return [
-        JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns}, total_confirmados=confirmados_por_jogo.get(jogo.id, 0))
-        for jogo in jogos
-    ]
+        query = query.where(Jogo.data_hora >= agora_brt)
+    if cursor:
+        c_data_hora, c_id = decode_cursor(cursor, (datetime, int))
+        query = query.where(tuple_(Jogo.data_hora, Jogo.id) > (c_data_hora, c_id))
+        skip = 0
+    jogos = (await db.scalars(query.order_by(Jogo.data_hora, Jogo.id).offset(skip).limit(limit + 1))).all()
+    if len(jogos) > limit:
+        jogos = jogos[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([jogos[-1].data_hora, jogos[-1].id])
+    return [JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns}) for jogo in jogos]
 
 
 @router.get("/{jogo_id}", response_model=JogoResponse)
@@ -86,9 +130,7 @@ def obter_jogo(jogo_id: int, db: Session = Depends(get_db), current_user: User =
     if not jogo:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
     verificar_acesso_racha(db, current_user, jogo.racha_id)
-    confirmados = db.query(func.count(Presenca.id)).filter(
-        Presenca.jogo_id == jogo.id, Presenca.status == StatusPresenca.CONFIRMADO).scalar()
-    return JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns}, total_confirmados=confirmados)
+    return JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns})
 
 
 @router.patch("/{jogo_id}", response_model=JogoResponse)
@@ -114,9 +156,7 @@ def atualizar_jogo(jogo_id: int, jogo_update: JogoUpdate, db: Session = Depends(
         setattr(jogo, field, value)
     db.commit()
     db.refresh(jogo)
-    confirmados = db.query(func.count(Presenca.id)).filter(
-        Presenca.jogo_id == jogo.id, Presenca.status == StatusPresenca.CONFIRMADO).scalar()
-    return JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns}, total_confirmados=confirmados)
+    return JogoResponse(**{c.name: getattr(jogo, c.name) for c in jogo.__table__.columns})
 
 
 @router.delete("/{jogo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -129,23 +169,74 @@ def cancelar_jogo(jogo_id: int, db: Session = Depends(get_db), current_user: Use
     db.commit()
 
 
-@router.get("/{jogo_id}/lista")
-def obter_lista_presenca(jogo_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    jogo = db.query(Jogo).filter(Jogo.id == jogo_id).first()
-    if not jogo:
-        raise HTTPException(status_code=404, detail="Jogo não encontrado")
-    verificar_acesso_racha(db, current_user, jogo.racha_id)
-    presencas = db.query(Presenca, Atleta).join(Atleta).filter(Presenca.jogo_id == jogo_id).all()
+async def _montar_lista(db: AsyncSession, jogo: Jogo) -> dict:
+    presencas = (await db.execute(select(Presenca, Atleta).join(Atleta).where(Presenca.jogo_id == jogo.id))).all()
     confirmados, pendentes, recusados = [], [], []
     for presenca, atleta in presencas:
-        item = {"atleta_id": atleta.id, "user_id": atleta.user_id, "nome": atleta.nome, "apelido": atleta.apelido,
-                "posicao": atleta.posicao.value, "status": presenca.status.value}
+        item = item_lista(atleta, presenca.status)
         if presenca.status == StatusPresenca.CONFIRMADO:
             confirmados.append(item)
         elif presenca.status == StatusPresenca.RECUSADO:
             recusados.append(item)
         else:
             pendentes.append(item)
-    return {"jogo_id": jogo_id, "data_hora": jogo.data_hora, "local": jogo.local,
+    return {"jogo_id": jogo.id, "data_hora": jogo.data_hora, "local": jogo.local,
             "confirmados": confirmados, "pendentes": pendentes, "recusados": recusados,
             "total_confirmados": len(confirmados), "total_pendentes": len(pendentes), "total_recusados": len(recusados)}
+
+
+@router.get("/{jogo_id}/lista")
+async def obter_lista_presenca(jogo_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    jogo = await db.get(Jogo, jogo_id)
+    if not jogo:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    await db.run_sync(verificar_acesso_racha, current_user, jogo.racha_id)
+    return await _montar_lista(db, jogo)
+
+
+def _sse(evento: str, dados: dict) -> str:
+    return f"event: {evento}\ndata: {json.dumps(dados, default=str)}\n\n"
+
+
+@router.get("/{jogo_id}/lista/stream")
+async def acompanhar_lista_presenca(jogo_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """Lista de presença ao vivo (Server-Sent Events), no lugar do polling de ``/lista``.
+
+    Envia um evento ``snapshot`` (mesmo corpo de ``GET /jogos/{id}/lista``) e,
+    a cada mudança feita pelas rotas de ``presencas``, um ``delta`` com os
+    itens alterados (``status`` indica em qual lista o atleta passa a ficar).
+    Um evento ``resync`` pede ao cliente que reconecte para um snapshot novo.
+    """
+    jogo = await db.get(Jogo, jogo_id)
+    if not jogo:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    await db.run_sync(verificar_acesso_racha, current_user, jogo.racha_id)
+
+    # Assina antes de ler o snapshot para não perder mudanças no intervalo; um
+    # delta já refletido no snapshot é inofensivo (só repete o status).
+    assinatura = get_broker().subscribe(jogo_id)
+    try:
+        snapshot = await _montar_lista(db, jogo)
+    except BaseException:
+        assinatura.close()
+        raise
+
+    async def eventos():
+        try:
+            yield _sse("snapshot", snapshot)
+            while not await request.is_disconnected():
+                evento = await assinatura.proximo(timeout=STREAM_KEEPALIVE_SECONDS)
+                if evento is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(evento["tipo"], evento)
+                if evento is RESYNC:
+                    return
+        finally:
+            assinatura.close()
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
 from app.database import get_db
-from app.models import Pagamento, Atleta, StatusPagamento, TipoPagamento, User
+from app.models import Pagamento, Atleta, Racha, StatusPagamento, TipoPagamento, User
 from app.schemas.pagamento import PagamentoCreate, PagamentoResponse, PagamentoAprovacao
 from app.services.auth import get_current_user
+from app.services.mensalidades import gerar_mensalidades
 from app.deps import verificar_acesso_racha, verificar_admin_racha
+from app.utils.cursor import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/pagamentos", tags=["Pagamentos"])
 
@@ -20,20 +24,30 @@ def criar_pagamento(pagamento: PagamentoCreate, db: Session = Depends(get_db), c
     verificar_acesso_racha(db, current_user, atleta.racha_id)
     db_pagamento = Pagamento(**pagamento.model_dump())
     db.add(db_pagamento)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Já existe mensalidade deste atleta para esta referência")
     db.refresh(db_pagamento)
     return PagamentoResponse(**{c.name: getattr(db_pagamento, c.name) for c in db_pagamento.__table__.columns}, atleta_nome=atleta.nome)
 
 
 @router.get("/", response_model=List[PagamentoResponse])
-def listar_pagamentos(racha_id: int, atleta_id: Optional[int] = None, status_filter: Optional[StatusPagamento] = None,
-                      tipo: Optional[TipoPagamento] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def listar_pagamentos(racha_id: int, response: Response, atleta_id: Optional[int] = None, status_filter: Optional[StatusPagamento] = None,
+                      tipo: Optional[TipoPagamento] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                      db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Pagamentos do racha, mais recentes primeiro (``created_at DESC NULLS LAST, id DESC``).
+
+    Se houver mais, o header ``X-Next-Cursor`` traz o cursor da próxima
+    página; passado em ``cursor``, ele substitui ``skip``.
+    """
     acesso = verificar_acesso_racha(db, current_user, racha_id)
     query = db.query(Pagamento, Atleta).join(Atleta).filter(Atleta.racha_id == racha_id)
 
     # Atletas só podem ver os próprios pagamentos
-    if acesso["tipo"] == "atleta":
-        query = query.filter(Pagamento.atleta_id == acesso["obj"].id)
+    if not acesso.is_admin:
+        query = query.filter(Pagamento.atleta_id == acesso.atleta_id)
     elif atleta_id:
         query = query.filter(Pagamento.atleta_id == atleta_id)
 
@@ -41,7 +55,22 @@ def listar_pagamentos(racha_id: int, atleta_id: Optional[int] = None, status_fil
         query = query.filter(Pagamento.status == status_filter)
     if tipo:
         query = query.filter(Pagamento.tipo == tipo)
-    results = query.order_by(Pagamento.created_at.desc()).offset(skip).limit(limit).all()
+    if cursor:
+        c_created_at, c_id = decode_cursor(cursor, (Optional[datetime], int))
+        # Linhas sem created_at ficam no fim (NULLS LAST), como em ``listar_rachas``.
+        if c_created_at is None:
+            query = query.filter(Pagamento.created_at.is_(None), Pagamento.id < c_id)
+        else:
+            query = query.filter(or_(
+                tuple_(Pagamento.created_at, Pagamento.id) < (c_created_at, c_id),
+                Pagamento.created_at.is_(None),
+            ))
+        skip = 0
+    results = query.order_by(Pagamento.created_at.desc().nullslast(), Pagamento.id.desc()).offset(skip).limit(limit + 1).all()
+    if len(results) > limit:
+        results = results[:limit]
+        ultimo = results[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor([ultimo.created_at, ultimo.id])
     return [PagamentoResponse(**{c.name: getattr(pag, c.name) for c in pag.__table__.columns}, atleta_nome=atleta.nome)
             for pag, atleta in results]
 
@@ -86,7 +115,7 @@ def aprovar_pagamento(pagamento_id: int, aprovacao: PagamentoAprovacao, db: Sess
         raise HTTPException(status_code=400, detail="Pagamento não está aguardando aprovação")
     if aprovacao.aprovado:
         pagamento.status = StatusPagamento.APROVADO
-        pagamento.aprovado_por = admin.id
+        pagamento.aprovado_por = admin.admin_id
         pagamento.data_aprovacao = datetime.utcnow()
         message = "Pagamento aprovado"
     else:
@@ -98,23 +127,19 @@ def aprovar_pagamento(pagamento_id: int, aprovacao: PagamentoAprovacao, db: Sess
 
 
 @router.post("/gerar-mensalidade/{racha_id}")
-def gerar_mensalidade(racha_id: int, referencia: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def gerar_mensalidade(racha_id: int, referencia: List[str] = Query(...), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Gera as mensalidades do racha para uma ou mais referências (``?referencia=11/2026&referencia=12/2026``)."""
     verificar_admin_racha(db, current_user, racha_id)
-    from app.models import Racha
-    racha = db.query(Racha).filter(Racha.id == racha_id).first()
+    racha = db.get(Racha, racha_id)
     if not racha:
         raise HTTPException(status_code=404, detail="Racha não encontrado")
     if racha.valor_mensalidade <= 0:
         raise HTTPException(status_code=400, detail="Racha não possui mensalidade configurada")
-    atletas = db.query(Atleta).filter(Atleta.racha_id == racha_id, Atleta.ativo.is_(True)).all()
-    criados = 0
-    for atleta in atletas:
-        existing = db.query(Pagamento).filter(
-            Pagamento.atleta_id == atleta.id, Pagamento.tipo == TipoPagamento.MENSALIDADE, Pagamento.referencia == referencia).first()
-        if not existing:
-            pagamento = Pagamento(atleta_id=atleta.id, tipo=TipoPagamento.MENSALIDADE, valor=racha.valor_mensalidade,
-                                  referencia=referencia, descricao=f"Mensalidade {referencia}")
-            db.add(pagamento)
-            criados += 1
-    db.commit()
-    return {"message": f"Mensalidades geradas para {criados} atletas", "total_atletas": len(atletas), "cobrancas_criadas": criados}
+    total_atletas = db.scalar(select(func.count(Atleta.id)).where(Atleta.racha_id == racha_id, Atleta.ativo.is_(True)))
+    try:
+        criados = gerar_mensalidades(db, referencia, racha_ids=[racha_id]).get(racha_id, 0)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Mensalidades sendo geradas por outra requisição; tente novamente")
+    return {"message": f"Mensalidades geradas para {criados} atletas", "total_atletas": total_atletas, "cobrancas_criadas": criados}
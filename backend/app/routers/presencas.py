@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Presenca, Jogo, Atleta, StatusPresenca, User
-from app.schemas.presenca import PresencaCreate, PresencaUpdate, PresencaResponse
+from app.schemas.presenca import PresencaCreate, PresencaUpdate, PresencaResponse, PresencaBulkUpdate, PresencaBulkResponse
 from app.services.auth import get_current_user
-from app.deps import verificar_acesso_racha
+from app.services.presenca_eventos import item_lista, publicar_apos_commit
+from app.deps import verificar_acesso_racha, verificar_admin_racha
+from app.utils.upsert import upsert_insert
 
 router = APIRouter(prefix="/presencas", tags=["Presenças"])
 
@@ -21,9 +24,11 @@ def criar_presenca(presenca: PresencaCreate, db: Session = Depends(get_db), curr
         Presenca.jogo_id == presenca.jogo_id, Presenca.atleta_id == presenca.atleta_id).first()
     if existing:
         existing.status = presenca.status
+        atleta = db.query(Atleta).filter(Atleta.id == existing.atleta_id).first()
+        if atleta:
+            publicar_apos_commit(db, jogo.id, [item_lista(atleta, existing.status)])
         db.commit()
         db.refresh(existing)
-        atleta = db.query(Atleta).filter(Atleta.id == existing.atleta_id).first()
         return PresencaResponse(**{c.name: getattr(existing, c.name) for c in existing.__table__.columns},
                                 atleta_nome=atleta.nome if atleta else None,
                                 atleta_posicao=atleta.posicao.value if atleta else None)
@@ -34,12 +39,57 @@ def criar_presenca(presenca: PresencaCreate, db: Session = Depends(get_db), curr
         raise HTTPException(status_code=400, detail="Atleta não pertence a este racha")
     db_presenca = Presenca(**presenca.model_dump())
     db.add(db_presenca)
+    publicar_apos_commit(db, jogo.id, [item_lista(atleta, presenca.status)])
     db.commit()
     db.refresh(db_presenca)
     return PresencaResponse(**{c.name: getattr(db_presenca, c.name) for c in db_presenca.__table__.columns},
                             atleta_nome=atleta.nome, atleta_posicao=atleta.posicao.value)
 
 
+@router.post("/bulk", response_model=PresencaBulkResponse)
+def atualizar_presencas_em_lote(payload: PresencaBulkUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Aplica de uma vez o status de vários atletas num jogo (ex.: conferência da enquete do grupo).
+
+    Só admins do racha. Um único ``INSERT ... ON CONFLICT (jogo_id, atleta_id) DO UPDATE`` cria as
+    presenças que faltam e atualiza as existentes, na mesma transação.
+    """
+    jogo = db.get(Jogo, payload.jogo_id)
+    if not jogo:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    verificar_admin_racha(db, current_user, jogo.racha_id)
+
+    # Um mesmo atleta repetido no lote faria o ON CONFLICT tocar a mesma linha
+    # duas vezes (erro no Postgres); vale o último status enviado.
+    status_por_atleta = {item.atleta_id: item.status for item in payload.presencas}
+    do_racha = db.scalars(
+        select(Atleta).where(Atleta.id.in_(status_por_atleta), Atleta.racha_id == jogo.racha_id)
+    ).all()
+    invalidos = sorted(status_por_atleta.keys() - {atleta.id for atleta in do_racha})
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Atletas não pertencem a este racha: {invalidos}")
+
+    stmt = upsert_insert(db, Presenca).values([
+        {"jogo_id": jogo.id, "atleta_id": atleta_id, "status": novo_status}
+        for atleta_id, novo_status in status_por_atleta.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Presenca.jogo_id, Presenca.atleta_id],
+        set_={"status": stmt.excluded.status, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+    publicar_apos_commit(db, jogo.id, [item_lista(atleta, status_por_atleta[atleta.id]) for atleta in do_racha])
+    db.commit()
+    # Os contadores do jogo foram atualizados pelo trigger de ``presencas``;
+    # o acesso abaixo recarrega só a linha do jogo.
+    return PresencaBulkResponse(
+        jogo_id=jogo.id,
+        atualizadas=len(status_por_atleta),
+        total_confirmados=jogo.total_confirmados,
+        total_pendentes=jogo.total_pendentes,
+        total_recusados=jogo.total_recusados,
+    )
+
+
 @router.patch("/{presenca_id}", response_model=PresencaResponse)
 def atualizar_presenca(presenca_id: int, presenca_update: PresencaUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     presenca = db.query(Presenca).filter(Presenca.id == presenca_id).first()
@@ -48,9 +98,11 @@ def atualizar_presenca(presenca_id: int, presenca_update: PresencaUpdate, db: Se
     jogo = db.query(Jogo).filter(Jogo.id == presenca.jogo_id).first()
     verificar_acesso_racha(db, current_user, jogo.racha_id)
     presenca.status = presenca_update.status
+    atleta = db.query(Atleta).filter(Atleta.id == presenca.atleta_id).first()
+    if atleta:
+        publicar_apos_commit(db, jogo.id, [item_lista(atleta, presenca.status)])
     db.commit()
     db.refresh(presenca)
-    atleta = db.query(Atleta).filter(Atleta.id == presenca.atleta_id).first()
     return PresencaResponse(**{c.name: getattr(presenca, c.name) for c in presenca.__table__.columns},
                             atleta_nome=atleta.nome if atleta else None,
                             atleta_posicao=atleta.posicao.value if atleta else None)
@@ -62,10 +114,12 @@ def confirmar_presenca(jogo_id: int, atleta_id: int, db: Session = Depends(get_d
     if not jogo:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
     verificar_acesso_racha(db, current_user, jogo.racha_id)
-    presenca = db.query(Presenca).filter(Presenca.jogo_id == jogo_id, Presenca.atleta_id == atleta_id).first()
-    if not presenca:
+    row = db.query(Presenca, Atleta).join(Atleta).filter(Presenca.jogo_id == jogo_id, Presenca.atleta_id == atleta_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Presença não encontrada")
+    presenca, atleta = row
     presenca.status = StatusPresenca.CONFIRMADO
+    publicar_apos_commit(db, jogo_id, [item_lista(atleta, presenca.status)])
     db.commit()
     return {"message": "Presença confirmada", "status": "confirmado"}
 
@@ -76,9 +130,11 @@ def recusar_presenca(jogo_id: int, atleta_id: int, db: Session = Depends(get_db)
     if not jogo:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
     verificar_acesso_racha(db, current_user, jogo.racha_id)
-    presenca = db.query(Presenca).filter(Presenca.jogo_id == jogo_id, Presenca.atleta_id == atleta_id).first()
-    if not presenca:
+    row = db.query(Presenca, Atleta).join(Atleta).filter(Presenca.jogo_id == jogo_id, Presenca.atleta_id == atleta_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Presença não encontrada")
+    presenca, atleta = row
     presenca.status = StatusPresenca.RECUSADO
+    publicar_apos_commit(db, jogo_id, [item_lista(atleta, presenca.status)])
     db.commit()
     return {"message": "Presença recusada", "status": "recusado"}
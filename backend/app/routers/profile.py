@@ -12,7 +12,9 @@ from app.database import get_db
 from app.models import AthleteProfile, User, Atleta
 from app.schemas.athlete_profile import AthleteProfileUpdate, AthleteProfileResponse
 from app.services.auth import get_current_user
+from app.services.user_cache import invalidate_user
 from app.config import get_settings
+from app.schema_catalog import schema_catalog
 from app.utils.file_upload import ALLOWED_IMAGE_EXTENSIONS, validate_image_mime
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
@@ -49,35 +51,10 @@ def _resolve_enum_label(db: Session, table_name: str, column_name: str, value) -
     if not normalized:
         return None
 
-    row = db.execute(
-        text(
-            """
-            SELECT udt_name
-            FROM information_schema.columns
-            WHERE table_name = :table_name AND column_name = :column_name
-            LIMIT 1
-            """
-        ),
-        {"table_name": table_name, "column_name": column_name},
-    ).mappings().first()
-    udt_name = row["udt_name"] if row else None
-    if not udt_name:
+    labels = schema_catalog.enum_labels(db, table_name, column_name)
+    if not labels:
         return normalized
 
-    labels = [
-        item[0]
-        for item in db.execute(
-            text(
-                """
-                SELECT e.enumlabel
-                FROM pg_type t
-                JOIN pg_enum e ON e.enumtypid = t.oid
-                WHERE t.typname = :type_name
-                """
-            ),
-            {"type_name": udt_name},
-        ).all()
-    ]
     if normalized in labels:
         return normalized
     upper = normalized.upper()
@@ -201,6 +178,7 @@ def update_me(payload: AthleteProfileUpdate, db: Session = Depends(get_db), curr
             values,
         )
         db.commit()
+        invalidate_user(current_user.id)
         return _profile_response(row, current_user)
     except SQLAlchemyError:
         logger.exception("Falha ao salvar perfil do usuário %s", current_user.id)
@@ -1,17 +1,22 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import Racha, TipoRacha, Atleta, RachaAdmin, User, UserRole
 from app.schemas.racha import RachaCreate, RachaUpdate, RachaResponse
 from app.services.auth import get_current_user
+from app.schema_catalog import schema_catalog
 from app.deps import verificar_acesso_racha, verificar_admin_racha, exigir_assinatura
+from app.services.acesso_racha import invalidar_acessos
+from app.services.saldos import totais_financeiros
+from app.utils.cursor import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/rachas", tags=["Rachas"])
 logger = logging.getLogger(__name__)
@@ -38,34 +43,7 @@ def _resolve_tipo_db_label(db: Session, tipo: TipoRacha) -> str:
     compatible with both.
     """
 
-    row = db.execute(
-        text(
-            """
-            SELECT udt_name
-            FROM information_schema.columns
-            WHERE table_name = 'rachas' AND column_name = 'tipo'
-            LIMIT 1
-            """
-        )
-    ).mappings().first()
-    udt_name = row["udt_name"] if row else None
-    if not udt_name:
-        return tipo.value
-
-    labels = [
-        item[0]
-        for item in db.execute(
-            text(
-                """
-                SELECT e.enumlabel
-                FROM pg_type t
-                JOIN pg_enum e ON e.enumtypid = t.oid
-                WHERE t.typname = :type_name
-                """
-            ),
-            {"type_name": udt_name},
-        ).all()
-    ]
+    labels = schema_catalog.enum_labels(db, "rachas", "tipo")
     if tipo.name in labels:
         return tipo.name
     if tipo.value in labels:
@@ -94,35 +72,11 @@ def _racha_response_from_mapping(row, *, total_atletas: int = 0, is_admin: bool
 
 
 def _table_exists(db: Session, table_name: str) -> bool:
-    return bool(
-        db.execute(
-            text(
-                """
-                SELECT 1
-                FROM information_schema.tables
-                WHERE table_schema = 'public' AND table_name = :table_name
-                LIMIT 1
-                """
-            ),
-            {"table_name": table_name},
-        ).first()
-    )
+    return schema_catalog.table_exists(db, table_name)
 
 
 def _table_columns(db: Session, table_name: str) -> set[str]:
-    return {
-        row[0]
-        for row in db.execute(
-            text(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema = 'public' AND table_name = :table_name
-                """
-            ),
-            {"table_name": table_name},
-        ).all()
-    }
+    return set(schema_catalog.table_columns(db, table_name))
 
 
 def _select_column(
@@ -193,128 +147,180 @@ def criar_racha(racha: RachaCreate, db: Session = Depends(get_db), current_user:
         ),
         {"user_id": current_user.id, "racha_id": row["id"]},
     )
+    invalidar_acessos(db, current_user.id)
     db.commit()
     return _racha_response_from_mapping(row, total_atletas=0, is_admin=True)
 
 
-@router.get("/", response_model=List[RachaResponse])
-def listar_rachas(
-    skip: int = 0,
-    limit: int = 100,
-    ativo: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    try:
-        if not _table_exists(db, "rachas"):
-            return []
+def _listar_rachas_sql(
+    db: Session, user_id: int, ativo: Optional[bool], cursor_created_at_nulo: Optional[bool] = None,
+) -> Optional[str]:
+    """Monta o SELECT de ``listar_rachas`` conforme as tabelas/colunas existentes.
 
-        racha_columns = _table_columns(db, "rachas")
-        if not {"id", "nome"}.issubset(racha_columns):
-            logger.warning("Tabela rachas sem colunas mínimas: %s", sorted(racha_columns))
-            return []
+    Com ``cursor_created_at_nulo`` (``True``/``False`` conforme o ``created_at``
+    do cursor), filtra os rachas depois de ``:cursor_created_at``/``:cursor_id``
+    na ordem da listagem. Retorna ``None`` quando o schema não tem o mínimo
+    para listar rachas.
+    """
+    if not _table_exists(db, "rachas"):
+        return None
 
-        access_parts = []
-
-        if _table_exists(db, "racha_admins"):
-            admin_columns = _table_columns(db, "racha_admins")
-            if {"racha_id", "user_id"}.issubset(admin_columns):
-                admin_active_filter = "AND ativo IS TRUE" if "ativo" in admin_columns else ""
-                access_parts.append(
-                    f"""
-                    SELECT racha_id, TRUE AS is_admin
-                    FROM racha_admins
-                    WHERE user_id = :user_id {admin_active_filter}
-                    """
-                )
-
-        has_atletas = _table_exists(db, "atletas")
-        atleta_columns = _table_columns(db, "atletas") if has_atletas else set()
-        if {"racha_id", "user_id"}.issubset(atleta_columns):
-            atleta_active_filter = "AND ativo IS TRUE" if "ativo" in atleta_columns else ""
+    racha_columns = _table_columns(db, "rachas")
+    if not {"id", "nome"}.issubset(racha_columns):
+        logger.warning("Tabela rachas sem colunas mínimas: %s", sorted(racha_columns))
+        return None
+
+    access_parts = []
+
+    if _table_exists(db, "racha_admins"):
+        admin_columns = _table_columns(db, "racha_admins")
+        if {"racha_id", "user_id"}.issubset(admin_columns):
+            admin_active_filter = "AND ativo IS TRUE" if "ativo" in admin_columns else ""
             access_parts.append(
                 f"""
-                SELECT racha_id, FALSE AS is_admin
-                FROM atletas
-                WHERE user_id = :user_id {atleta_active_filter}
+                SELECT racha_id, TRUE AS is_admin
+                FROM racha_admins
+                WHERE user_id = :user_id {admin_active_filter}
                 """
             )
 
-        if not access_parts:
-            logger.warning("Nenhuma relação de acesso a rachas disponível para user_id=%s", current_user.id)
-            return []
-
-        if "racha_id" in atleta_columns:
-            count_active_filter = "WHERE ativo IS TRUE" if "ativo" in atleta_columns else ""
-            atletas_count_sql = f"""
-                SELECT racha_id, COUNT(*) AS total_atletas
-                FROM atletas
-                {count_active_filter}
-                GROUP BY racha_id
-            """
-        else:
-            atletas_count_sql = """
-                SELECT NULL::integer AS racha_id, 0::bigint AS total_atletas
-                WHERE FALSE
+    has_atletas = _table_exists(db, "atletas")
+    atleta_columns = _table_columns(db, "atletas") if has_atletas else set()
+    if {"racha_id", "user_id"}.issubset(atleta_columns):
+        atleta_active_filter = "AND ativo IS TRUE" if "ativo" in atleta_columns else ""
+        access_parts.append(
+            f"""
+            SELECT racha_id, FALSE AS is_admin
+            FROM atletas
+            WHERE user_id = :user_id {atleta_active_filter}
             """
+        )
 
-        select_columns = [
-            "r.id AS id",
-            "r.nome AS nome",
-            _select_column(racha_columns, "r", "tipo", "'society'", cast_text=True),
-            _select_column(racha_columns, "r", "descricao", "NULL"),
-            _select_column(racha_columns, "r", "max_atletas", "30"),
-            _select_column(racha_columns, "r", "valor_mensalidade", "0"),
-            _select_column(racha_columns, "r", "valor_cartao_amarelo", "1000"),
-            _select_column(racha_columns, "r", "valor_cartao_vermelho", "2000"),
-            _select_column(racha_columns, "r", "estatuto", "NULL"),
-            _select_column(racha_columns, "r", "escalacao_size", "NULL"),
-            _select_column(racha_columns, "r", "ativo", "TRUE"),
-            _select_column(racha_columns, "r", "created_at", "now()"),
-            _select_column(racha_columns, "r", "updated_at", "NULL"),
-            "COALESCE(ac.total_atletas, 0) AS total_atletas",
-            "COALESCE(ur.is_admin, FALSE) AS is_admin",
-        ]
+    if not access_parts:
+        logger.warning("Nenhuma relação de acesso a rachas disponível para user_id=%s", user_id)
+        return None
+
+    if "racha_id" in atleta_columns:
+        count_active_filter = "WHERE ativo IS TRUE" if "ativo" in atleta_columns else ""
+        atletas_count_sql = f"""
+            SELECT racha_id, COUNT(*) AS total_atletas
+            FROM atletas
+            {count_active_filter}
+            GROUP BY racha_id
+        """
+    else:
+        atletas_count_sql = """
+            SELECT NULL::integer AS racha_id, 0::bigint AS total_atletas
+            WHERE FALSE
+        """
+
+    select_columns = [
+        "r.id AS id",
+        "r.nome AS nome",
+        _select_column(racha_columns, "r", "tipo", "'society'", cast_text=True),
+        _select_column(racha_columns, "r", "descricao", "NULL"),
+        _select_column(racha_columns, "r", "max_atletas", "30"),
+        _select_column(racha_columns, "r", "valor_mensalidade", "0"),
+        _select_column(racha_columns, "r", "valor_cartao_amarelo", "1000"),
+        _select_column(racha_columns, "r", "valor_cartao_vermelho", "2000"),
+        _select_column(racha_columns, "r", "estatuto", "NULL"),
+        _select_column(racha_columns, "r", "escalacao_size", "NULL"),
+        _select_column(racha_columns, "r", "ativo", "TRUE"),
+        _select_column(racha_columns, "r", "created_at", "now()"),
+        _select_column(racha_columns, "r", "updated_at", "NULL"),
+        "COALESCE(ac.total_atletas, 0) AS total_atletas",
+        "COALESCE(ur.is_admin, FALSE) AS is_admin",
+    ]
+
+    filters = []
+    if ativo is not None and "ativo" in racha_columns:
+        filters.append("r.ativo = :ativo")
+    if cursor_created_at_nulo is not None:
+        if "created_at" not in racha_columns:
+            filters.append("r.id < :cursor_id")
+        elif cursor_created_at_nulo:
+            filters.append("r.created_at IS NULL AND r.id < :cursor_id")
+        else:
+            # Mesma ordem do ORDER BY abaixo: os NULLs vêm depois de tudo.
+            cursor_created_at = "CAST(CAST(:cursor_created_at AS TEXT) AS TIMESTAMPTZ)"
+            filters.append(
+                f"(r.created_at < {cursor_created_at}"
+                f" OR (r.created_at = {cursor_created_at} AND r.id < :cursor_id)"
+                " OR r.created_at IS NULL)"
+            )
+    where_sql = f"WHERE {' AND '.join(filters)}" if filters else ""
+    order_sql = (
+        "ORDER BY r.created_at DESC NULLS LAST, r.id DESC"
+        if "created_at" in racha_columns
+        else "ORDER BY r.id DESC"
+    )
 
-        active_filter = "WHERE r.ativo = :ativo" if ativo is not None and "ativo" in racha_columns else ""
-        order_sql = (
-            "ORDER BY r.created_at DESC NULLS LAST, r.id DESC"
-            if "created_at" in racha_columns
-            else "ORDER BY r.id DESC"
+    return f"""
+        WITH access_rows AS (
+            {" UNION ALL ".join(access_parts)}
+        ),
+        user_rachas AS (
+            SELECT racha_id, BOOL_OR(is_admin) AS is_admin
+            FROM access_rows
+            GROUP BY racha_id
+        ),
+        atletas_count AS (
+            {atletas_count_sql}
         )
+        SELECT
+            {", ".join(select_columns)}
+        FROM rachas r
+        JOIN user_rachas ur ON ur.racha_id = r.id
+        LEFT JOIN atletas_count ac ON ac.racha_id = r.id
+        {where_sql}
+        {order_sql}
+        OFFSET :skip
+        LIMIT :limit
+    """
 
-        rows = db.execute(
-            text(
-                f"""
-                WITH access_rows AS (
-                    {" UNION ALL ".join(access_parts)}
-                ),
-                user_rachas AS (
-                    SELECT racha_id, BOOL_OR(is_admin) AS is_admin
-                    FROM access_rows
-                    GROUP BY racha_id
-                ),
-                atletas_count AS (
-                    {atletas_count_sql}
-                )
-                SELECT
-                    {", ".join(select_columns)}
-                FROM rachas r
-                JOIN user_rachas ur ON ur.racha_id = r.id
-                LEFT JOIN atletas_count ac ON ac.racha_id = r.id
-                {active_filter}
-                {order_sql}
-                OFFSET :skip
-                LIMIT :limit
-                """
-            ),
+
+@router.get("/", response_model=List[RachaResponse])
+async def listar_rachas(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    ativo: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Rachas do usuário, mais recentes primeiro (``created_at DESC, id DESC``).
+
+    Se houver mais, o header ``X-Next-Cursor`` traz o cursor da próxima
+    página; passado em ``cursor``, ele substitui ``skip``.
+    """
+    cursor_created_at = cursor_id = cursor_created_at_nulo = None
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, (Optional[datetime], int))
+        cursor_created_at_nulo = cursor_created_at is None
+        if cursor_created_at is not None:
+            # O SQL faz o CAST a partir de texto.
+            cursor_created_at = cursor_created_at.isoformat()
+        skip = 0
+    try:
+        sql = await db.run_sync(_listar_rachas_sql, current_user.id, ativo, cursor_created_at_nulo)
+        if sql is None:
+            return []
+
+        rows = (await db.execute(
+            text(sql),
             {
                 "user_id": current_user.id,
                 "ativo": ativo,
+                "cursor_created_at": cursor_created_at,
+                "cursor_id": cursor_id,
                 "skip": skip,
-                "limit": limit,
+                "limit": limit + 1,
             },
-        ).mappings().all()
+        )).mappings().all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor([rows[-1]["created_at"], rows[-1]["id"]])
 
         return [
             _racha_response_from_mapping(
@@ -325,7 +331,7 @@ def listar_rachas(
             for row in rows
         ]
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         logger.exception("Erro ao listar rachas para user_id=%s", current_user.id)
         return []
 
@@ -396,18 +402,13 @@ def deletar_racha(racha_id: int, db: Session = Depends(get_db), current_user: Us
 @router.get("/{racha_id}/saldo")
 def obter_saldo(racha_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     verificar_acesso_racha(db, current_user, racha_id)
-    from app.models import Pagamento, StatusPagamento
     exists = db.execute(
         text("SELECT 1 FROM rachas WHERE id = :racha_id"),
         {"racha_id": racha_id},
     ).first()
     if not exists:
         raise HTTPException(status_code=404, detail="Racha não encontrado")
-    total_recebido = db.query(func.sum(Pagamento.valor)).join(Atleta).filter(
-        Atleta.racha_id == racha_id, Pagamento.status == StatusPagamento.APROVADO).scalar() or 0
-    total_pendente = db.query(func.sum(Pagamento.valor)).join(Atleta).filter(
-        Atleta.racha_id == racha_id,
-        Pagamento.status.in_([StatusPagamento.PENDENTE, StatusPagamento.AGUARDANDO_APROVACAO])).scalar() or 0
+    total_recebido, total_pendente = totais_financeiros(db, racha_id=racha_id)
     return {
         "racha_id": racha_id, "saldo": total_recebido, "pendente": total_pendente,
         "saldo_formatado": f"R$ {total_recebido / 100:.2f}", "pendente_formatado": f"R$ {total_pendente / 100:.2f}"
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, insert, select, update
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from datetime import datetime
+from collections import defaultdict
 
 from app.database import get_db
-from app.models import Team, TeamMember, Atleta, Racha, User
+from app.models import Team, TeamMember, Atleta, AtletaStat, Jogo, Presenca, Racha, StatusPresenca, User
 from app.schemas.team import (
     TeamCreate, TeamUpdate, TeamResponse,
     TeamMemberCreate, TeamMemberUpdate,
-    TeamWithMembersDetailed, TeamMemberWithAtleta
+    TeamWithMembersDetailed, TeamMemberWithAtleta,
+    SorteioRequest, SorteioResponse
 )
 from app.services.auth import get_current_user
+from app.services.sorteio import Jogador, quantidade_padrao, sortear_times
 from app.deps import verificar_admin_racha, verificar_acesso_racha
 
 router = APIRouter(prefix="/teams", tags=["Times"])
@@ -54,21 +58,139 @@ def _build_member_with_atleta(member: TeamMember) -> dict:
 
 
 @router.get("/", response_model=List[TeamWithMembersDetailed])
-def listar_times(racha_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def listar_times(racha_id: int, include: str = "membros", db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Times ativos do racha com seus membros ativos.
+
+    Os membros de todos os times vêm numa única query (com o atleta via JOIN)
+    e são agrupados em memória — duas queries no total, qualquer que seja o
+    número de times. ``include=`` (vazio) devolve só os times, com ``membros``
+    vazio, para telas que não precisam do elenco.
+    """
     verificar_acesso_racha(db, current_user, racha_id)
     teams = db.query(Team).filter(Team.racha_id == racha_id, Team.ativo.is_(True)).all()
-    result = []
-    for team in teams:
-        membros = db.query(TeamMember).options(
-            joinedload(TeamMember.atleta)
-        ).filter(TeamMember.team_id == team.id, TeamMember.ativo.is_(True)).all()
-
-        membros_detailed = [_build_member_with_atleta(m) for m in membros]
-        result.append({
-            **TeamResponse.model_validate(team).model_dump(),
-            "membros": membros_detailed
-        })
-    return result
+
+    membros_por_time: dict[int, list] = defaultdict(list)
+    if teams and "membros" in include.split(","):
+        membros = db.query(TeamMember).options(joinedload(TeamMember.atleta)).filter(
+            TeamMember.team_id.in_([team.id for team in teams]), TeamMember.ativo.is_(True)
+        ).order_by(TeamMember.id).all()
+        for membro in membros:
+            membros_por_time[membro.team_id].append(_build_member_with_atleta(membro))
+
+    return [
+        {**TeamResponse.model_validate(team).model_dump(), "membros": membros_por_time[team.id]}
+        for team in teams
+    ]
+
+
+@router.post("/sorteio", response_model=SorteioResponse)
+def sortear_times_do_jogo(payload: SorteioRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Sorteia times equilibrados entre os confirmados do jogo.
+
+    Sem ``quantidade_times``, usa quantos times completos cabem pela
+    ``escalacao_size`` do racha (no mínimo dois). Com ``salvar``, cria os times
+    e seus membros em lote (os vínculos ativos anteriores dos atletas no racha
+    são encerrados e os times que ficam vazios, desativados) e, com dois
+    times, os associa ao jogo como time A e B.
+    """
+    jogo = db.get(Jogo, payload.jogo_id)
+    if not jogo:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    verificar_admin_racha(db, current_user, jogo.racha_id)
+    escalacao_size = db.execute(select(Racha.escalacao_size).where(Racha.id == jogo.racha_id)).scalar()
+
+    rows = db.execute(
+        select(Atleta, AtletaStat.gols, AtletaStat.assistencias)
+        .join(Presenca, Presenca.atleta_id == Atleta.id)
+        .outerjoin(AtletaStat, and_(AtletaStat.atleta_id == Atleta.id, AtletaStat.racha_id == jogo.racha_id))
+        .where(
+            Presenca.jogo_id == jogo.id,
+            Presenca.status == StatusPresenca.CONFIRMADO,
+            Atleta.ativo.is_(True),
+        )
+        .order_by(Atleta.id)
+    ).all()
+    # Nome e apelido guardados antes do commit, que expira os objetos da sessão.
+    atletas = {atleta.id: (atleta.nome, atleta.apelido) for atleta, _, _ in rows}
+    jogadores = [Jogador(atleta.id, atleta.posicao, gols or 0, assistencias or 0) for atleta, gols, assistencias in rows]
+
+    quantidade = payload.quantidade_times or quantidade_padrao(len(jogadores), escalacao_size)
+    if len(jogadores) < quantidade:
+        raise HTTPException(status_code=400, detail="Confirmados insuficientes para a quantidade de times")
+    sorteados = sortear_times(jogadores, quantidade, escalacao_size=escalacao_size, seed=payload.seed)
+    nomes = [f"Time {time.indice + 1}" for time in sorteados]
+
+    team_ids = [None] * len(sorteados)
+    if payload.salvar:
+        team_ids = db.execute(
+            insert(Team).returning(Team.id, sort_by_parameter_order=True),
+            [{"racha_id": jogo.racha_id, "nome": nome, "ativo": True} for nome in nomes],
+        ).scalars().all()
+        esvaziados = set(db.execute(
+            update(TeamMember)
+            .where(
+                TeamMember.atleta_id.in_(list(atletas)),
+                TeamMember.ativo.is_(True),
+                TeamMember.team_id.in_(select(Team.id).where(Team.racha_id == jogo.racha_id)),
+                TeamMember.team_id.notin_(team_ids),
+            )
+            .values(ativo=False, ate=datetime.utcnow())
+            .returning(TeamMember.team_id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        if esvaziados:
+            # Times (de sorteios anteriores) que ficaram sem ninguém saem da
+            # lista; re-sortear não acumula times vazios.
+            db.execute(
+                update(Team)
+                .where(
+                    Team.id.in_(esvaziados),
+                    Team.id.notin_(select(TeamMember.team_id).where(TeamMember.ativo.is_(True))),
+                )
+                .values(ativo=False)
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(insert(TeamMember), [
+            {
+                "team_id": team_id,
+                "atleta_id": escalado.jogador.atleta_id,
+                "ativo": True,
+                "is_titular": escalado.is_titular,
+                "posicao_escalacao": escalado.jogador.posicao.value,
+                "ordem_banco": escalado.ordem_banco,
+            }
+            for team_id, time in zip(team_ids, sorteados)
+            for escalado in time.escalados
+        ])
+        if len(sorteados) == 2:
+            jogo.time_a_id, jogo.time_b_id = team_ids
+            jogo.time_a_nome, jogo.time_b_nome = nomes
+        db.commit()
+
+    return {
+        "jogo_id": payload.jogo_id,
+        "salvo": payload.salvar,
+        "times": [
+            {
+                "team_id": team_id,
+                "nome": nome,
+                "forca": time.forca,
+                "membros": [
+                    {
+                        "atleta_id": escalado.jogador.atleta_id,
+                        "nome": atletas[escalado.jogador.atleta_id][0],
+                        "apelido": atletas[escalado.jogador.atleta_id][1],
+                        "posicao": escalado.jogador.posicao.value,
+                        "forca": escalado.jogador.forca,
+                        "is_titular": escalado.is_titular,
+                        "ordem_banco": escalado.ordem_banco,
+                    }
+                    for escalado in time.escalados
+                ],
+            }
+            for team_id, nome, time in zip(team_ids, nomes, sorteados)
+        ],
+    }
 
 
 @router.get("/{team_id}", response_model=TeamWithMembersDetailed)
@@ -0,0 +1,108 @@
+"""Cache do catálogo do Postgres (tabelas, colunas e rótulos de enum).
+
+Algumas rotas se adaptam ao schema real do banco (bancos antigos sem certas
+colunas, enums criados com nomes ``SOCIETY`` ou valores ``society``). Essas
+consultas ao ``information_schema``/``pg_enum`` rodavam a cada requisição;
+agora o catálogo é lido uma vez por processo — em ``ensure_schema_compatibility``
+logo após o DDL, ou na primeira consulta se o startup não o carregou — e as
+rotas só consultam a memória.
+
+Depois de qualquer DDL feito em runtime, chame ``schema_catalog.refresh(bind)``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCatalog:
+    """Snapshot em memória de ``information_schema.columns`` e ``pg_enum``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._columns: Optional[dict[str, frozenset[str]]] = None
+        self._column_types: dict[tuple[str, str], str] = {}
+        self._enum_labels: dict[str, tuple[str, ...]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._columns is not None
+
+    def refresh(self, bind) -> None:
+        """Relê o catálogo. ``bind`` pode ser Engine, Connection ou Session."""
+        if isinstance(bind, Engine):
+            with bind.connect() as connection:
+                return self.refresh(connection)
+
+        column_rows = bind.execute(
+            text(
+                """
+                SELECT table_name, column_name, udt_name
+                FROM information_schema.columns
+                WHERE table_schema = 'public'
+                """
+            )
+        ).all()
+        enum_rows = bind.execute(
+            text(
+                """
+                SELECT t.typname, e.enumlabel
+                FROM pg_type t
+                JOIN pg_enum e ON e.enumtypid = t.oid
+                ORDER BY t.typname, e.enumsortorder
+                """
+            )
+        ).all()
+
+        columns: dict[str, set[str]] = {}
+        column_types: dict[tuple[str, str], str] = {}
+        for table_name, column_name, udt_name in column_rows:
+            columns.setdefault(table_name, set()).add(column_name)
+            column_types[(table_name, column_name)] = udt_name
+        enum_labels: dict[str, list[str]] = {}
+        for type_name, label in enum_rows:
+            enum_labels.setdefault(type_name, []).append(label)
+
+        with self._lock:
+            self._columns = {name: frozenset(cols) for name, cols in columns.items()}
+            self._column_types = column_types
+            self._enum_labels = {name: tuple(labels) for name, labels in enum_labels.items()}
+        logger.info("Catálogo do schema carregado: %d tabelas, %d enums.", len(columns), len(enum_labels))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._columns = None
+            self._column_types = {}
+            self._enum_labels = {}
+
+    def _ensure_loaded(self, db) -> None:
+        # Carga preguiçosa, uma vez por processo. Duas threads podem recarregar
+        # ao mesmo tempo na partida; o resultado é o mesmo.
+        if self._columns is None:
+            self.refresh(db)
+
+    def table_exists(self, db, table_name: str) -> bool:
+        self._ensure_loaded(db)
+        return table_name in self._columns
+
+    def table_columns(self, db, table_name: str) -> frozenset[str]:
+        self._ensure_loaded(db)
+        return self._columns.get(table_name, frozenset())
+
+    def enum_labels(self, db, table_name: str, column_name: str) -> tuple[str, ...]:
+        """Rótulos do enum usado pela coluna (vazio se a coluna não for enum)."""
+        self._ensure_loaded(db)
+        type_name = self._column_types.get((table_name, column_name))
+        if not type_name:
+            return ()
+        return self._enum_labels.get(type_name, ())
+
+
+schema_catalog = SchemaCatalog()
@@ -5,26 +5,41 @@ for creating missing tables in a fresh Railway/Supabase database, but SQLAlchemy
 does not add new columns to tables that already exist. During this test phase we
 keep a tiny, idempotent compatibility layer so deploys do not fail with opaque
 500 errors after model changes.
+
+Running all of that on every process start is slow and takes DDL locks from
+every worker at once, so ``bootstrap_schema`` records a fingerprint of the
+models and of the statements below, and skips everything when it matches.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from app.schema_catalog import schema_catalog
 
 logger = logging.getLogger(__name__)
 
 
-def ensure_schema_compatibility(engine: Engine) -> None:
-    """Apply safe additive schema fixes.
+# Arbitrary constant for pg_advisory_xact_lock: serializes bootstrap across
+# workers that start at the same time.
+SCHEMA_LOCK_KEY = 7_201_004_501
+# Session-level lock held while CONCURRENT_INDEXES are being built.
+INDEX_LOCK_KEY = 7_201_004_502
 
-    Every statement is idempotent and only adds missing structures. It never
-    drops, renames or rewrites existing data.
-    """
 
-    statements = [
+def compat_statements() -> list[str]:
+    """The additive DDL applied by ``ensure_schema_compatibility``, in order."""
+
+    return [
         # SQLAlchemy Enum columns persist enum member names in this project.
         # These DO blocks make the additive ALTERs below safe on fresh DBs where
         # create_all has not created the type yet.
@@ -261,6 +276,225 @@ def ensure_schema_compatibility(engine: Engine) -> None:
         ALTER TABLE jogos
         ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP
         """,
+        # Presence counters on jogos, so listing/polling reads a single row
+        # instead of counting presencas. The columns are backfilled only when
+        # they are first added; afterwards the statement-level triggers below
+        # keep them in sync (including bulk INSERT ... SELECT and upserts).
+        # Drift can be checked/repaired with ``python -m app.jobs.contadores_jogos``.
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_schema = 'public'
+                  AND table_name = 'jogos'
+                  AND column_name = 'total_confirmados'
+            ) THEN
+                ALTER TABLE jogos
+                    ADD COLUMN total_confirmados INTEGER NOT NULL DEFAULT 0,
+                    ADD COLUMN total_pendentes INTEGER NOT NULL DEFAULT 0,
+                    ADD COLUMN total_recusados INTEGER NOT NULL DEFAULT 0;
+                UPDATE jogos j
+                SET total_confirmados = c.confirmados,
+                    total_pendentes = c.pendentes,
+                    total_recusados = c.recusados
+                FROM (
+                    SELECT jogo_id,
+                           count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                           count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                           count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+                    FROM presencas
+                    GROUP BY jogo_id
+                ) c
+                WHERE j.id = c.jogo_id;
+            END IF;
+        END
+        $$;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION jogos_contadores_presenca() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE jogos j
+                SET total_confirmados = j.total_confirmados - d.confirmados,
+                    total_pendentes = j.total_pendentes - d.pendentes,
+                    total_recusados = j.total_recusados - d.recusados
+                FROM (
+                    SELECT jogo_id,
+                           count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                           count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                           count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+                    FROM presencas_antigas
+                    GROUP BY jogo_id
+                ) d
+                WHERE j.id = d.jogo_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE jogos j
+                SET total_confirmados = j.total_confirmados + d.confirmados,
+                    total_pendentes = j.total_pendentes + d.pendentes,
+                    total_recusados = j.total_recusados + d.recusados
+                FROM (
+                    SELECT jogo_id,
+                           count(*) FILTER (WHERE status::text = 'CONFIRMADO') AS confirmados,
+                           count(*) FILTER (WHERE status::text IN ('PENDENTE', 'TALVEZ')) AS pendentes,
+                           count(*) FILTER (WHERE status::text = 'RECUSADO') AS recusados
+                    FROM presencas_novas
+                    GROUP BY jogo_id
+                ) d
+                WHERE j.id = d.jogo_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+        """,
+        # Transition tables require one trigger per event.
+        """
+        DO $$
+        BEGIN
+            CREATE TRIGGER presencas_contadores_insert
+            AFTER INSERT ON presencas
+            REFERENCING NEW TABLE AS presencas_novas
+            FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca();
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END
+        $$;
+        """,
+        """
+        DO $$
+        BEGIN
+            CREATE TRIGGER presencas_contadores_update
+            AFTER UPDATE ON presencas
+            REFERENCING OLD TABLE AS presencas_antigas NEW TABLE AS presencas_novas
+            FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca();
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END
+        $$;
+        """,
+        """
+        DO $$
+        BEGIN
+            CREATE TRIGGER presencas_contadores_delete
+            AFTER DELETE ON presencas
+            REFERENCING OLD TABLE AS presencas_antigas
+            FOR EACH STATEMENT EXECUTE FUNCTION jogos_contadores_presenca();
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END
+        $$;
+        """,
+        # Leaderboard reads filter atleta_stats by racha and join by atleta.
+        # Databases created by create_all never got the UNIQUE from the
+        # migration, and the old get-or-create-on-read could race into
+        # duplicates: keep the row with the most goals/assists before indexing.
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE schemaname = 'public' AND indexname = 'ux_atleta_stats_racha_atleta'
+            ) THEN
+                DELETE FROM atleta_stats s
+                USING atleta_stats d
+                WHERE s.racha_id = d.racha_id
+                  AND s.atleta_id = d.atleta_id
+                  AND (COALESCE(s.gols, 0), COALESCE(s.assistencias, 0), s.id)
+                    < (COALESCE(d.gols, 0), COALESCE(d.assistencias, 0), d.id);
+                CREATE UNIQUE INDEX ux_atleta_stats_racha_atleta ON atleta_stats (racha_id, atleta_id);
+            END IF;
+        END
+        $$;
+        """,
+        # Monthly fee generation relies on this index to never bill the same
+        # athlete twice for a month. Existing duplicates are real payment rows,
+        # so they are not deleted here: the index is skipped (with a warning)
+        # until someone reconciles them.
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_indexes
+                WHERE schemaname = 'public' AND indexname = 'ux_pagamentos_mensalidade'
+            ) THEN
+                IF EXISTS (
+                    SELECT 1 FROM pagamentos
+                    WHERE tipo = 'MENSALIDADE'
+                    GROUP BY atleta_id, tipo, referencia
+                    HAVING count(*) > 1
+                ) THEN
+                    RAISE WARNING 'duplicate MENSALIDADE rows in pagamentos; ux_pagamentos_mensalidade not created';
+                ELSE
+                    CREATE UNIQUE INDEX ux_pagamentos_mensalidade
+                    ON pagamentos (atleta_id, tipo, referencia)
+                    WHERE tipo = 'MENSALIDADE';
+                END IF;
+            END IF;
+        END
+        $$;
+        """,
+        # Payment ledger: totals per athlete, tipo and status, so balances are
+        # read from a bounded number of rows instead of summing pagamentos.
+        # Same statement-level trigger approach as the jogo counters. On the
+        # first run the triggers are created before the backfill: CREATE
+        # TRIGGER locks pagamentos against writes until this transaction
+        # commits, so no payment can slip between the backfill and the
+        # triggers. Audit/rebuild with ``python -m app.jobs.saldos``.
+        """
+        CREATE OR REPLACE FUNCTION saldos_atletas_pagamentos() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO saldos_atletas AS s (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+                SELECT p.atleta_id, p.tipo, p.status, a.racha_id, -count(*)::int, -sum(p.valor)
+                FROM pagamentos_antigos p
+                JOIN atletas a ON a.id = p.atleta_id
+                GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id
+                ON CONFLICT (atleta_id, tipo, status) DO UPDATE
+                SET quantidade = s.quantidade + excluded.quantidade,
+                    valor_total = s.valor_total + excluded.valor_total;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO saldos_atletas AS s (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+                SELECT p.atleta_id, p.tipo, p.status, a.racha_id, count(*)::int, sum(p.valor)
+                FROM pagamentos_novos p
+                JOIN atletas a ON a.id = p.atleta_id
+                GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id
+                ON CONFLICT (atleta_id, tipo, status) DO UPDATE
+                SET quantidade = s.quantidade + excluded.quantidade,
+                    valor_total = s.valor_total + excluded.valor_total;
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'pagamentos_saldos_insert') THEN
+                CREATE TRIGGER pagamentos_saldos_insert
+                AFTER INSERT ON pagamentos
+                REFERENCING NEW TABLE AS pagamentos_novos
+                FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos();
+                CREATE TRIGGER pagamentos_saldos_update
+                AFTER UPDATE ON pagamentos
+                REFERENCING OLD TABLE AS pagamentos_antigos NEW TABLE AS pagamentos_novos
+                FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos();
+                CREATE TRIGGER pagamentos_saldos_delete
+                AFTER DELETE ON pagamentos
+                REFERENCING OLD TABLE AS pagamentos_antigos
+                FOR EACH STATEMENT EXECUTE FUNCTION saldos_atletas_pagamentos();
+
+                DELETE FROM saldos_atletas;
+                INSERT INTO saldos_atletas (atleta_id, tipo, status, racha_id, quantidade, valor_total)
+                SELECT p.atleta_id, p.tipo, p.status, a.racha_id, count(*), sum(p.valor)
+                FROM pagamentos p
+                JOIN atletas a ON a.id = p.atleta_id
+                GROUP BY p.atleta_id, p.tipo, p.status, a.racha_id;
+            END IF;
+        END
+        $$;
+        """,
         # Profile table exists in recent models; add missing nullable columns if
         # it came from an older deploy.
         """
@@ -395,11 +629,227 @@ def ensure_schema_compatibility(engine: Engine) -> None:
         """,
     ]
 
+
+# Composite indexes for the hot request filters (presence lists, rosters,
+# schedules, payment statements, cards). Tables in production are large enough
+# that a plain CREATE INDEX would block writes for the whole build, so these
+# run CONCURRENTLY, outside any transaction, after the DDL above. The models
+# declare the same indexes so create_all builds them on fresh databases.
+CONCURRENT_INDEXES: tuple[tuple[str, str], ...] = (
+    ("ix_presencas_jogo_status", "presencas (jogo_id, status)"),
+    ("ix_presencas_atleta_id", "presencas (atleta_id)"),
+    ("ix_atletas_racha_ativo", "atletas (racha_id, ativo)"),
+    ("ix_atletas_user_racha", "atletas (user_id, racha_id)"),
+    ("ix_jogos_racha_cancelado_data", "jogos (racha_id, cancelado, data_hora)"),
+    ("ix_pagamentos_atleta_tipo_ref", "pagamentos (atleta_id, tipo, referencia)"),
+    ("ix_pagamentos_status_created", "pagamentos (status, created_at)"),
+    ("ix_team_members_team_ativo", "team_members (team_id, ativo)"),
+    ("ix_cartoes_atleta_tipo_created", "cartoes (atleta_id, tipo, created_at)"),
+)
+
+
+def pending_concurrent_indexes(connection: Connection) -> list[str]:
+    """Names from ``CONCURRENT_INDEXES`` that are missing or INVALID."""
+
+    valid = set(
+        connection.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_class c
+                JOIN pg_index i ON i.indexrelid = c.oid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public' AND c.relname = ANY(:names) AND i.indisvalid
+                """
+            ),
+            {"names": [name for name, _ in CONCURRENT_INDEXES]},
+        ).scalars()
+    )
+    return [name for name, _ in CONCURRENT_INDEXES if name not in valid]
+
+
+def ensure_concurrent_indexes(engine: Engine, *, wait: bool = True) -> bool:
+    """Create ``CONCURRENT_INDEXES`` without blocking writes.
+
+    A CREATE INDEX CONCURRENTLY that fails (or whose process dies) leaves an
+    INVALID index behind that IF NOT EXISTS would then skip forever, so
+    invalid leftovers are dropped and rebuilt. A session advisory lock keeps
+    two workers from building the same index; with ``wait=False`` the call
+    returns False right away when another worker holds it.
+    """
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if wait:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INDEX_LOCK_KEY})
+        elif not connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": INDEX_LOCK_KEY}).scalar():
+            return False
+        try:
+            targets = dict(CONCURRENT_INDEXES)
+            for name in pending_concurrent_indexes(connection):
+                exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": f"public.{name}"}).scalar()
+                if exists is not None:
+                    logger.warning("Rebuilding invalid index %s.", name)
+                    connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                started = time.perf_counter()
+                connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {targets[name]}"))
+                logger.info("Index %s created in %.1f s.", name, time.perf_counter() - started)
+        finally:
+            # Session locks survive the connection going back to the pool.
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INDEX_LOCK_KEY})
+    return True
+
+
+def start_concurrent_index_build(engine: Engine) -> threading.Thread:
+    """Run ``ensure_concurrent_indexes`` in a daemon thread.
+
+    Building large indexes can take minutes; doing it at import time would
+    keep the worker from passing its healthcheck. If the process dies halfway
+    the index is left INVALID and the next startup sees it as pending again.
+    """
+
+    def build() -> None:
+        try:
+            ensure_concurrent_indexes(engine, wait=False)
+        except Exception:
+            logger.exception("Failed to build concurrent indexes; the next startup retries.")
+
+    thread = threading.Thread(target=build, name="concurrent-indexes", daemon=True)
+    thread.start()
+    return thread
+
+
+def _apply_statements(connection: Connection) -> None:
+    for statement in compat_statements():
+        connection.execute(text(statement))
+
+
+def ensure_schema_compatibility(engine: Engine) -> None:
+    """Apply safe additive schema fixes.
+
+    Every statement is idempotent and only adds missing structures. It never
+    drops, renames or rewrites existing data.
+    """
+
     try:
         with engine.begin() as connection:
-            for statement in statements:
-                connection.execute(text(statement))
+            _apply_statements(connection)
+        ensure_concurrent_indexes(engine)
         logger.info("Schema compatibility checks applied.")
     except Exception:
         logger.exception("Failed to apply schema compatibility checks.")
         raise
+
+    # The request path reads tables/columns/enum labels from this cache, so it
+    # must be reloaded after the DDL above.
+    schema_catalog.refresh(engine)
+
+
+def schema_fingerprint(metadata: MetaData) -> str:
+    """Hash of the model DDL (as Postgres would see it) plus the compat DDL.
+
+    Any model or ``compat_statements`` change yields a new fingerprint, which
+    makes the next startup run the full bootstrap again.
+    """
+
+    dialect = postgresql.dialect()
+    digest = hashlib.sha256()
+    for _, table in sorted(metadata.tables.items()):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for statement in compat_statements():
+        digest.update(" ".join(statement.split()).encode())
+    for name, target in CONCURRENT_INDEXES:
+        digest.update(f"{name} ON {target}".encode())
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(connection: Connection) -> Optional[str]:
+    exists = connection.execute(text("SELECT to_regclass('public.schema_fingerprint')")).scalar()
+    if exists is None:
+        return None
+    return connection.execute(text("SELECT fingerprint FROM schema_fingerprint WHERE id = 1")).scalar()
+
+
+def _store_fingerprint(connection: Connection, fingerprint: str) -> None:
+    connection.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS schema_fingerprint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            fingerprint VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    ))
+    connection.execute(
+        text(
+            """
+            INSERT INTO schema_fingerprint (id, fingerprint, applied_at)
+            VALUES (1, :fingerprint, now())
+            ON CONFLICT (id) DO UPDATE
+            SET fingerprint = EXCLUDED.fingerprint, applied_at = EXCLUDED.applied_at
+            """
+        ),
+        {"fingerprint": fingerprint},
+    )
+
+
+def bootstrap_schema(engine: Engine, metadata: MetaData, *, force: bool = False) -> bool:
+    """Startup entry point: ``create_all`` plus compat DDL, only when needed.
+
+    The fingerprint of the current models is compared with the one recorded by
+    the last successful bootstrap. When they match, startup costs a few small
+    queries and no locks. Otherwise a transaction-scoped advisory lock makes a
+    single worker run the DDL; the others wait on the lock, re-read the
+    fingerprint and skip. ``CONCURRENT_INDEXES`` are checked on every start
+    (one catalog query) independently of the fingerprint: any that are
+    missing or INVALID are built by ``start_concurrent_index_build`` in the
+    background, so startup never waits for them. ``force`` ignores the
+    recorded fingerprint (e.g. after a manual change to the database).
+    Returns True when the DDL ran in this process.
+
+    Non-Postgres databases (the sqlite test setup) only get ``create_all``.
+    """
+
+    if engine.dialect.name != "postgresql":
+        metadata.create_all(bind=engine)
+        return False
+
+    started = time.perf_counter()
+    fingerprint = schema_fingerprint(metadata)
+    current = False
+    if not force:
+        with engine.connect() as connection:
+            current = _stored_fingerprint(connection) == fingerprint
+            connection.rollback()
+
+    applied = False
+    if not current:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+                stale = force or _stored_fingerprint(connection) != fingerprint
+                if stale:
+                    metadata.create_all(bind=connection)
+                    _apply_statements(connection)
+                    _store_fingerprint(connection, fingerprint)
+            applied = stale
+        except Exception:
+            logger.exception("Failed to apply schema compatibility checks.")
+            raise
+
+    with engine.connect() as connection:
+        pending = pending_concurrent_indexes(connection)
+        connection.rollback()
+    if pending:
+        logger.info("Building indexes in the background: %s.", ", ".join(pending))
+        start_concurrent_index_build(engine)
+
+    schema_catalog.refresh(engine)
+    logger.info(
+        "Schema bootstrap %s in %.0f ms (fingerprint %s).",
+        "applied" if applied else "skipped",
+        (time.perf_counter() - started) * 1000,
+        fingerprint[:12],
+    )
+    return applied
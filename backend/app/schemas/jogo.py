@@ -48,6 +48,12 @@ class JogoCreate(JogoBase):
     racha_id: int
 
 
+class JogoRecorrenteCreate(JogoCreate):
+    """Agenda ``semanas`` jogos a partir de ``data_hora``, um a cada ``intervalo_dias``."""
+    semanas: int = Field(..., ge=1, le=52)
+    intervalo_dias: int = Field(default=7, ge=1, le=31)
+
+
 class JogoUpdate(BaseModel):
     data_hora: Optional[datetime] = None
     local: Optional[str] = Field(None, max_length=200)
@@ -85,6 +91,8 @@ class JogoResponse(JogoBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     total_confirmados: int = 0
+    total_pendentes: int = 0
+    total_recusados: int = 0
 
     class Config:
         from_attributes = True
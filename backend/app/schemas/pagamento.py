@@ -34,7 +34,7 @@ class PagamentoResponse(PagamentoBase):
     motivo_rejeicao: Optional[str] = None
     aprovado_por: Optional[int] = None
     data_aprovacao: Optional[datetime] = None
-    created_at: datetime
+    created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     atleta_nome: Optional[str] = None
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.models.presenca import StatusPresenca
 
@@ -28,3 +28,21 @@ class PresencaResponse(PresencaBase):
 
     class Config:
         from_attributes = True
+
+
+class PresencaBulkItem(BaseModel):
+    atleta_id: int
+    status: StatusPresenca
+
+
+class PresencaBulkUpdate(BaseModel):
+    jogo_id: int
+    presencas: List[PresencaBulkItem] = Field(..., min_length=1, max_length=500)
+
+
+class PresencaBulkResponse(BaseModel):
+    jogo_id: int
+    atualizadas: int
+    total_confirmados: int
+    total_pendentes: int
+    total_recusados: int
@@ -82,3 +82,33 @@ class TeamWithMembers(TeamResponse):
 class TeamWithMembersDetailed(TeamResponse):
     """Time com membros incluindo dados completos dos atletas"""
     membros: List[TeamMemberWithAtleta] = []
+
+
+class SorteioRequest(BaseModel):
+    jogo_id: int
+    quantidade_times: Optional[int] = Field(None, ge=2, le=10)
+    seed: Optional[int] = None
+    salvar: bool = False
+
+
+class MembroSorteado(BaseModel):
+    atleta_id: int
+    nome: str
+    apelido: Optional[str] = None
+    posicao: str
+    forca: float
+    is_titular: bool
+    ordem_banco: Optional[int] = None
+
+
+class TimeSorteadoResponse(BaseModel):
+    team_id: Optional[int] = None
+    nome: str
+    forca: float
+    membros: List[MembroSorteado] = []
+
+
+class SorteioResponse(BaseModel):
+    jogo_id: int
+    salvo: bool
+    times: List[TimeSorteadoResponse]
@@ -0,0 +1,121 @@
+"""Resolução dos papéis (admin/atleta) de um usuário em todos os seus rachas.
+
+``verificar_acesso_racha`` e ``verificar_admin_racha`` rodam em quase toda
+rota. Em vez de consultar ``racha_admins`` e depois ``atletas`` a cada chamada,
+os papéis do usuário em todos os rachas são carregados numa única query e
+guardados em dois níveis:
+
+* na própria sessão (``db.info``), valendo até o fim da requisição;
+* num ``TTLCache`` do processo, com TTL curto, entre requisições.
+
+Quem altera ``racha_admins`` ou ``atletas.ativo``/``atletas.user_id`` deve
+chamar ``invalidar_acessos(db, user_id)``; o cache do processo é limpo de novo
+quando a transação é confirmada, para não guardar o estado anterior ao commit.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy import event, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Atleta, RachaAdmin
+from app.utils.cache import TTLCache
+
+_SESSION_KEY = "acessos_racha"
+_PENDING_KEY = "acessos_racha_invalidados"
+
+
+@dataclass(frozen=True)
+class AcessoRacha:
+    """Papel do usuário num racha. ``admin_id``/``atleta_id`` são as PKs das relações."""
+
+    racha_id: int
+    admin_id: Optional[int] = None
+    atleta_id: Optional[int] = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.admin_id is not None
+
+    @property
+    def tipo(self) -> str:
+        return "admin" if self.is_admin else "atleta"
+
+
+_settings = get_settings()
+_acessos_cache = TTLCache(
+    maxsize=_settings.racha_access_cache_max_entries,
+    ttl=_settings.racha_access_cache_ttl_seconds,
+)
+
+
+def _carregar_acessos(db: Session, user_id: int) -> Mapping[int, AcessoRacha]:
+    papeis = union_all(
+        select(RachaAdmin.racha_id, literal("admin").label("papel"), RachaAdmin.id).where(
+            RachaAdmin.user_id == user_id, RachaAdmin.ativo.is_(True)
+        ),
+        select(Atleta.racha_id, literal("atleta").label("papel"), Atleta.id).where(
+            Atleta.user_id == user_id, Atleta.ativo.is_(True)
+        ),
+    )
+    admin_ids: dict[int, int] = {}
+    atleta_ids: dict[int, int] = {}
+    for racha_id, papel, papel_id in db.execute(papeis).all():
+        destino = admin_ids if papel == "admin" else atleta_ids
+        destino.setdefault(racha_id, papel_id)
+
+    return MappingProxyType({
+        racha_id: AcessoRacha(
+            racha_id=racha_id,
+            admin_id=admin_ids.get(racha_id),
+            atleta_id=atleta_ids.get(racha_id),
+        )
+        for racha_id in admin_ids.keys() | atleta_ids.keys()
+    })
+
+
+def resolver_acessos(db: Session, user_id: int) -> Mapping[int, AcessoRacha]:
+    """Papéis do usuário indexados por ``racha_id`` (no máximo uma query por requisição)."""
+    memo = db.info.setdefault(_SESSION_KEY, {})
+    acessos = memo.get(user_id)
+    if acessos is not None:
+        return acessos
+
+    acessos = _acessos_cache.get(user_id)
+    if acessos is None:
+        acessos = _carregar_acessos(db, user_id)
+        _acessos_cache.set(user_id, acessos)
+    memo[user_id] = acessos
+    return acessos
+
+
+def invalidar_acessos(db: Session, *user_ids: Optional[int]) -> None:
+    """Descarta os papéis em cache dos usuários após uma alteração de vínculo."""
+    memo = db.info.get(_SESSION_KEY, {})
+    pendentes = db.info.setdefault(_PENDING_KEY, set())
+    for user_id in user_ids:
+        if user_id is None:
+            continue
+        memo.pop(user_id, None)
+        pendentes.add(user_id)
+        _acessos_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _limpar_cache_apos_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        _acessos_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_pendentes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def acesso_cache_stats() -> dict:
+    return _acessos_cache.stats()
@@ -12,11 +12,10 @@ import httpx
 from fastapi import HTTPException
 
 from app.config import get_settings
+from app.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
-TIMEOUT = 20.0
-
 
 def _headers() -> dict:
     settings = get_settings()
@@ -35,8 +34,7 @@ def _base_url() -> str:
 async def _request(method: str, path: str, **kwargs) -> dict:
     url = f"{_base_url()}{path}"
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.request(method, url, headers=_headers(), **kwargs)
+        response = await http_clients.get("asaas").request(method, url, headers=_headers(), **kwargs)
     except httpx.HTTPError as exc:
         logger.exception("Falha de conexão com a Asaas")
         raise HTTPException(status_code=502, detail="Não foi possível contatar o gateway de pagamento") from exc
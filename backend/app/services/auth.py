@@ -1,36 +1,30 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.config import get_settings
 from app.database import get_db
 from app.models import User
+from app.services.password_hashing import (  # noqa: F401 - reexportados para as rotas
+    hash_password,
+    unusable_password,
+    verify_and_update_password,
+    verify_password,
+)
+from app.services.user_cache import UserSnapshot, cache_user, get_cached_user
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def hash_password(password: str) -> str:
-    if password and len(password.encode("utf-8")) > 72:
-        password = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    if plain_password and len(plain_password.encode("utf-8")) > 72:
-        plain_password = plain_password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     settings = get_settings()
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
+    to_encode.update({"exp": expire, "iat": now})
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -58,7 +52,7 @@ def verify_password_reset_token(token: str) -> tuple[int, str]:
     return int(user_id), str(pwd_marker)
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> UserSnapshot:
     settings = get_settings()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,7 +66,12 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # Tokens antigos não têm "iat"; o "exp" identifica o token da mesma forma.
+    issued_at = payload.get("iat") or payload.get("exp")
+    cached = get_cached_user(int(user_id), issued_at)
+    if cached is not None:
+        return cached
     user = db.query(User).filter(User.id == int(user_id), User.ativo.is_(True)).first()
     if not user:
         raise credentials_exception
-    return user
+    return cache_user(user, issued_at)
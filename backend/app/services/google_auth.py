@@ -1,7 +1,7 @@
-import httpx
 from typing import Optional
 from urllib.parse import urlencode
 from app.config import get_settings
+from app.http_clients import http_clients
 
 
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
@@ -12,30 +12,28 @@ async def exchange_code_for_tokens(code: str, redirect_uri: str) -> dict:
     """Troca o código de autorização por tokens do Google."""
     settings = get_settings()
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            GOOGLE_TOKEN_URL,
-            data={
-                "code": code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code",
-            },
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await http_clients.get("google").post(
+        GOOGLE_TOKEN_URL,
+        data={
+            "code": code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 async def get_google_user_info(access_token: str) -> dict:
     """Busca informações do usuário no Google."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            GOOGLE_USERINFO_URL,
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await http_clients.get("google").get(
+        GOOGLE_USERINFO_URL,
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 def get_google_auth_url(redirect_uri: str, state: Optional[str] = None) -> str:
@@ -3,6 +3,8 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
+from app.services.acesso_racha import invalidar_acessos
+
 from app.models import (
     Atleta,
     AthleteProfile,
@@ -56,5 +58,6 @@ def processar_invite(db: Session, user: User, invite: Invite) -> None:
             if invite.team_id:
                 db.add(TeamMember(team_id=invite.team_id, atleta_id=atleta.id, ativo=True))
 
+    invalidar_acessos(db, user.id)
     invite.status = InviteStatus.ACEITO
     invite.aceito_em = datetime.now(timezone.utc).replace(tzinfo=None)
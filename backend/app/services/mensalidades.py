@@ -0,0 +1,72 @@
+"""Geração das cobranças de mensalidade em lote.
+
+Uma única instrução ``INSERT ... SELECT ... WHERE NOT EXISTS`` cria a
+mensalidade de cada atleta ativo para cada referência pedida, em um ou em todos
+os rachas com mensalidade configurada. O índice único parcial
+``ux_pagamentos_mensalidade`` (atleta, tipo, referência) impede duplicatas
+mesmo com duas gerações concorrentes; nesse caso a segunda falha com
+``IntegrityError`` e pode ser repetida.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import String, and_, exists, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Atleta, Pagamento, Racha, StatusPagamento, TipoPagamento
+
+
+def gerar_mensalidades(
+    db: Session,
+    referencias: Iterable[str],
+    racha_ids: Optional[Iterable[int]] = None,
+) -> dict[int, int]:
+    """Cria as mensalidades que faltam e devolve quantas foram criadas por racha.
+
+    Sem ``racha_ids``, considera todos os rachas ativos com ``valor_mensalidade``
+    positivo. Não faz commit.
+    """
+    referencias = list(dict.fromkeys(referencias))
+    if not referencias:
+        return {}
+    refs = union_all(*(select(literal(ref, String).label("referencia")) for ref in referencias)).subquery("refs")
+
+    candidatos = (
+        select(
+            Atleta.id,
+            literal(TipoPagamento.MENSALIDADE, Pagamento.tipo.type),
+            Racha.valor_mensalidade,
+            refs.c.referencia,
+            literal("Mensalidade ", String) + refs.c.referencia,
+            literal(StatusPagamento.PENDENTE, Pagamento.status.type),
+        )
+        .select_from(Atleta)
+        .join(Racha, Racha.id == Atleta.racha_id)
+        .join(refs, literal(True))
+        .where(
+            Atleta.ativo.is_(True),
+            Racha.ativo.isnot(False),
+            Racha.valor_mensalidade > 0,
+            ~exists().where(and_(
+                Pagamento.atleta_id == Atleta.id,
+                Pagamento.tipo == TipoPagamento.MENSALIDADE,
+                Pagamento.referencia == refs.c.referencia,
+            )),
+        )
+    )
+    if racha_ids is not None:
+        candidatos = candidatos.where(Racha.id.in_(list(racha_ids)))
+
+    criados = db.execute(
+        insert(Pagamento)
+        .from_select(["atleta_id", "tipo", "valor", "referencia", "descricao", "status"], candidatos)
+        .returning(Pagamento.atleta_id)
+    ).scalars().all()
+    if not criados:
+        return {}
+
+    racha_por_atleta = dict(db.execute(select(Atleta.id, Atleta.racha_id).where(Atleta.id.in_(set(criados)))).all())
+    return dict(Counter(racha_por_atleta[atleta_id] for atleta_id in criados))
@@ -0,0 +1,71 @@
+"""Coletores de ``/metrics`` para o estado que outros módulos já mantêm.
+
+Pool de conexões (``db_pool``), caches em memória (``TTLCache``) e o pool de
+hash de senhas guardam os próprios contadores; aqui eles são copiados para o registro de métricas a
+cada coleta, sem instrumentar de novo o caminho quente.
+"""
+
+from __future__ import annotations
+
+from app.database import async_engine, engine
+from app.db_pool import async_pool_metrics, pool_status, sync_pool_metrics
+from app.metrics import MetricsRegistry
+from app.services.acesso_racha import acesso_cache_stats
+from app.services.password_hashing import password_hash_stats
+from app.services.supabase_auth import supabase_token_cache_stats
+from app.services.user_cache import user_cache_stats
+
+
+def registrar_coletores(registry: MetricsRegistry) -> None:
+    pool_connections = registry.gauge(
+        "db_pool_connections", "Conexões do pool por estado.", ("engine", "state"),
+    )
+    pool_size = registry.gauge("db_pool_size", "Tamanho configurado do pool.", ("engine",))
+    pool_checkouts = registry.counter("db_pool_checkouts_total", "Checkouts de conexão do pool.", ("engine",))
+    pool_timeouts = registry.counter("db_pool_timeouts_total", "Checkouts que estouraram pool_timeout.", ("engine",))
+    pool_wait = registry.counter(
+        "db_pool_wait_seconds_total", "Tempo total de espera por uma conexão livre.", ("engine",),
+    )
+    cache_hits = registry.counter("cache_hits_total", "Leituras atendidas pelo cache.", ("cache",))
+    cache_misses = registry.counter("cache_misses_total", "Leituras que não acharam valor válido no cache.", ("cache",))
+    cache_evictions = registry.counter("cache_evictions_total", "Entradas descartadas por limite de tamanho.", ("cache",))
+    cache_entries = registry.gauge("cache_entries", "Entradas guardadas no cache.", ("cache",))
+    hash_in_flight = registry.gauge("password_hash_in_flight", "Hashes de senha executando ou na fila.")
+    hash_completed = registry.counter("password_hash_completed_total", "Hashes/verificações de senha concluídos.")
+    hash_rejected = registry.counter("password_hash_rejected_total", "Pedidos de hash recusados com 503 (fila cheia).")
+
+    def coletar_pools() -> None:
+        for nome, status in (
+            ("sync", pool_status(engine, sync_pool_metrics)),
+            ("async", pool_status(async_engine.sync_engine, async_pool_metrics)),
+        ):
+            for state in ("checked_in", "checked_out", "overflow"):
+                if state in status:
+                    # ``overflow`` do QueuePool é negativo enquanto há folga no pool.
+                    pool_connections.set(max(0, status[state]), engine=nome, state=state)
+            if "size" in status:
+                pool_size.set(status["size"], engine=nome)
+            pool_checkouts.set_total(status["checkouts"], engine=nome)
+            pool_timeouts.set_total(status["timeouts"], engine=nome)
+            pool_wait.set_total(status["wait_seconds_total"], engine=nome)
+
+    def coletar_caches() -> None:
+        for nome, stats in (
+            ("users", user_cache_stats()),
+            ("racha_access", acesso_cache_stats()),
+            ("supabase_tokens", supabase_token_cache_stats()),
+        ):
+            cache_hits.set_total(stats["hits"], cache=nome)
+            cache_misses.set_total(stats["misses"], cache=nome)
+            cache_evictions.set_total(stats["evictions"], cache=nome)
+            cache_entries.set(stats["size"], cache=nome)
+
+    def coletar_hash_senhas() -> None:
+        stats = password_hash_stats()
+        hash_in_flight.set(stats["in_flight"])
+        hash_completed.set_total(stats["completed"])
+        hash_rejected.set_total(stats["rejected"])
+
+    registry.add_collector(coletar_pools)
+    registry.add_collector(coletar_caches)
+    registry.add_collector(coletar_hash_senhas)
@@ -0,0 +1,180 @@
+"""Hash e verificação de senhas (bcrypt) fora do threadpool das requisições.
+
+Cada bcrypt custa ~250 ms de CPU no custo 12. Rodando nos threads do AnyIO,
+uma rajada de logins segurava o GIL e atrasava todas as outras rotas. Aqui o
+trabalho vai para um ``ProcessPoolExecutor`` próprio, com ``password_hash_workers``
+processos por worker do uvicorn e uma fila limitada a
+``password_hash_queue_size`` pedidos; acima disso a requisição recebe 503 na
+hora, em vez de esperar sem limite.
+
+O custo vem de ``bcrypt_rounds``. ``verify_and_update_password`` devolve um
+hash novo quando o hash salvo usa outro custo, para o login regravá-lo.
+
+Contas criadas via Google/Supabase não têm senha local: recebem
+``unusable_password()``, que nunca confere e não custa um bcrypt.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import secrets
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_MAX_BYTES = 72
+UNUSABLE_PREFIX = "!"
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _truncate(password: str) -> str:
+    if password and len(password.encode("utf-8")) > BCRYPT_MAX_BYTES:
+        password = password.encode("utf-8")[:BCRYPT_MAX_BYTES].decode("utf-8", errors="ignore")
+    return password
+
+
+# Executadas nos processos do pool: funções de módulo, só com argumentos simples.
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(_truncate(password))
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(_truncate(password), hashed)
+
+
+class PasswordHasher:
+    """Pool de processos com fila limitada (por worker do uvicorn)."""
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.capacity) if workers > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: o processo filho não herda conexões nem threads do worker.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn: Callable, *args):
+        """Executa ``fn(*args)`` no pool e espera o resultado (503 se a fila estiver cheia)."""
+        if self._slots is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("Fila de hash de senhas cheia (%d pedidos); respondendo 503.", self.capacity)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.in_flight += 1
+        executor = self._get_executor()
+        try:
+            future: Future = executor.submit(fn, *args)
+            result = future.result()
+            with self._lock:
+                self.completed += 1
+            return result
+        except BrokenProcessPool:
+            logger.exception("Pool de hash de senhas quebrado; será recriado.")
+            self._reset_executor(executor)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                settings = get_settings()
+                _hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_queue_size)
+    return _hasher
+
+
+def password_hash_stats() -> dict:
+    return get_hasher().stats()
+
+
+def shutdown_password_hasher() -> None:
+    """Encerra os processos do pool (no ``lifespan`` da app), se ele chegou a ser criado."""
+    if _hasher is not None:
+        _hasher.shutdown()
+
+
+def hash_password(password: str) -> str:
+    return get_hasher().run(_hash, password, get_settings().bcrypt_rounds)
+
+
+def verify_and_update_password(password: str, hashed: Optional[str]) -> tuple[bool, Optional[str]]:
+    """``(confere, hash_novo)``; ``hash_novo`` só vem quando o custo mudou."""
+    if not hashed or hashed.startswith(UNUSABLE_PREFIX):
+        return False, None
+    return get_hasher().run(_verify_and_update, password, hashed, get_settings().bcrypt_rounds)
+
+
+def verify_password(password: str, hashed: Optional[str]) -> bool:
+    return verify_and_update_password(password, hashed)[0]
+
+
+def unusable_password() -> str:
+    """Marcador para contas sem senha local (nunca confere; não é um hash bcrypt)."""
+    return UNUSABLE_PREFIX + secrets.token_hex(16)
@@ -0,0 +1,153 @@
+"""Pub/sub das mudanças de presença, para a lista ao vivo de cada jogo.
+
+As rotas de ``presencas`` registram as mudanças com ``publicar_apos_commit``;
+elas só são publicadas quando a transação é confirmada (listener de
+``after_commit``, como em ``acesso_racha``). ``GET /jogos/{id}/lista/stream``
+assina o jogo e repassa cada evento ao cliente.
+
+O ``InProcessBroker`` entrega só aos assinantes do próprio worker. Com vários
+workers, troque-o com ``set_broker`` por uma implementação que repasse os
+eventos entre processos (Redis, ``LISTEN/NOTIFY`` do Postgres) e entregue a
+cada worker pelo mesmo contrato: ``publish`` pode ser chamado de qualquer
+thread; ``subscribe`` devolve uma ``Assinatura`` lida no event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Atleta, StatusPresenca
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "presenca_eventos"
+
+# Evento enviado quando um assinante fica para trás (fila cheia): o cliente
+# deve descartar o estado e pedir um snapshot novo.
+RESYNC = {"tipo": "resync"}
+
+
+def item_lista(atleta: Atleta, status: StatusPresenca) -> dict:
+    """Item de um atleta na lista de presença (mesmo formato de ``GET /jogos/{id}/lista``)."""
+    return {
+        "atleta_id": atleta.id,
+        "user_id": atleta.user_id,
+        "nome": atleta.nome,
+        "apelido": atleta.apelido,
+        "posicao": atleta.posicao.value,
+        "status": status.value,
+    }
+
+
+class Assinatura:
+    """Fila de eventos de um jogo para um cliente conectado."""
+
+    def __init__(self, broker: "InProcessBroker", jogo_id: int, maxsize: int) -> None:
+        self.broker = broker
+        self.jogo_id = jogo_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        self.atrasada = False
+
+    def _entregar(self, evento: dict) -> None:
+        # Roda no event loop do assinante.
+        if self.atrasada:
+            return
+        try:
+            self._queue.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.atrasada = True
+            self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+
+    def entregar(self, evento: dict) -> None:
+        self._loop.call_soon_threadsafe(self._entregar, evento)
+
+    async def proximo(self, timeout: float) -> Optional[dict]:
+        """Próximo evento, ou ``None`` se nada chegou em ``timeout`` segundos."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Pub/sub em memória, por jogo, restrito ao processo atual."""
+
+    def __init__(self, maxsize: int = 100) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._assinaturas: dict[int, set[Assinatura]] = {}
+
+    def subscribe(self, jogo_id: int) -> Assinatura:
+        assinatura = Assinatura(self, jogo_id, self.maxsize)
+        with self._lock:
+            self._assinaturas.setdefault(jogo_id, set()).add(assinatura)
+        return assinatura
+
+    def unsubscribe(self, assinatura: Assinatura) -> None:
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.jogo_id)
+            if assinaturas is None:
+                return
+            assinaturas.discard(assinatura)
+            if not assinaturas:
+                del self._assinaturas[assinatura.jogo_id]
+
+    def publish(self, jogo_id: int, evento: dict) -> None:
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(jogo_id, ()))
+        for assinatura in assinaturas:
+            try:
+                assinatura.entregar(evento)
+            except RuntimeError:
+                # Event loop do assinante já foi encerrado.
+                self.unsubscribe(assinatura)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jogos": len(self._assinaturas),
+                "assinaturas": sum(len(a) for a in self._assinaturas.values()),
+            }
+
+
+_broker = InProcessBroker()
+
+
+def get_broker() -> InProcessBroker:
+    return _broker
+
+
+def set_broker(broker) -> None:
+    global _broker
+    _broker = broker
+
+
+def publicar_apos_commit(db: Session, jogo_id: int, itens: list[dict]) -> None:
+    """Agenda a publicação de um delta da lista do jogo para depois do commit."""
+    if itens:
+        db.info.setdefault(_PENDING_KEY, []).append((jogo_id, itens))
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_pendentes(session: Session) -> None:
+    for jogo_id, itens in session.info.pop(_PENDING_KEY, ()):
+        try:
+            _broker.publish(jogo_id, {"tipo": "delta", "jogo_id": jogo_id, "presencas": itens})
+        except Exception:
+            logger.exception("Falha ao publicar mudança de presença do jogo %s", jogo_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_pendentes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,30 @@
+"""Leitura do livro de saldos (``saldos_atletas``).
+
+``recebido`` soma os pagamentos APROVADOS; ``pendente`` os PENDENTES e os
+AGUARDANDO_APROVACAO — a mesma divisão usada antes sobre ``pagamentos``.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import SaldoAtleta, StatusPagamento
+
+STATUS_PENDENTES = (StatusPagamento.PENDENTE, StatusPagamento.AGUARDANDO_APROVACAO)
+
+
+def totais_financeiros(db: Session, *, racha_id: Optional[int] = None, atleta_id: Optional[int] = None) -> tuple[int, int]:
+    """``(recebido, pendente)`` em centavos, de um racha ou de um atleta."""
+    query = select(
+        func.coalesce(func.sum(SaldoAtleta.valor_total).filter(SaldoAtleta.status == StatusPagamento.APROVADO), 0),
+        func.coalesce(func.sum(SaldoAtleta.valor_total).filter(SaldoAtleta.status.in_(STATUS_PENDENTES)), 0),
+    )
+    if racha_id is not None:
+        query = query.where(SaldoAtleta.racha_id == racha_id)
+    if atleta_id is not None:
+        query = query.where(SaldoAtleta.atleta_id == atleta_id)
+    recebido, pendente = db.execute(query).one()
+    return int(recebido), int(pendente)
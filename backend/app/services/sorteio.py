@@ -0,0 +1,163 @@
+"""Sorteio equilibrado de times a partir dos confirmados de um jogo.
+
+A força de cada atleta vem de ``atleta_stats`` (gols + 0,7 x assistências).
+Os atletas são separados por setor (goleiro, defesa, meio, ataque) e
+distribuídos em rodízio, o que garante que cada time receba no máximo um
+goleiro e que os setores e os tamanhos dos times difiram em no máximo um
+atleta. Em seguida uma busca local troca atletas do mesmo setor entre times
+enquanto a soma dos quadrados dos desvios de força diminuir; o ganho de todas
+as trocas possíveis é calculado de uma vez com NumPy. A busca é repetida a
+partir de algumas distribuições iniciais aleatórias e fica a melhor.
+
+O módulo não acessa o banco: ``routers/teams.py`` carrega os jogadores e
+persiste o resultado.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import Posicao
+
+PESO_ASSISTENCIA = 0.7
+
+GOLEIRO, DEFESA, MEIO, ATAQUE = range(4)
+SETORES = {
+    Posicao.GOLEIRO: GOLEIRO,
+    Posicao.ZAGUEIRO: DEFESA,
+    Posicao.LATERAL: DEFESA,
+    Posicao.VOLANTE: MEIO,
+    Posicao.MEIA: MEIO,
+    Posicao.ATACANTE: ATAQUE,
+    Posicao.PONTA: ATAQUE,
+}
+
+
+@dataclass(frozen=True)
+class Jogador:
+    atleta_id: int
+    posicao: Posicao
+    gols: int = 0
+    assistencias: int = 0
+
+    @property
+    def forca(self) -> float:
+        return (self.gols or 0) + PESO_ASSISTENCIA * (self.assistencias or 0)
+
+
+@dataclass(frozen=True)
+class Escalado:
+    jogador: Jogador
+    is_titular: bool
+    ordem_banco: Optional[int]
+
+
+@dataclass(frozen=True)
+class TimeSorteado:
+    indice: int
+    forca: float
+    escalados: tuple[Escalado, ...]
+
+
+def quantidade_padrao(total_jogadores: int, escalacao_size: Optional[int]) -> int:
+    """Número de times para o racha: quantos times completos cabem, no mínimo dois."""
+    if not escalacao_size:
+        return 2
+    return max(2, total_jogadores // escalacao_size)
+
+
+def _setores(jogadores: Sequence[Jogador], forcas: np.ndarray, quantidade_times: int) -> np.ndarray:
+    setores = np.array([SETORES.get(j.posicao, MEIO) for j in jogadores], dtype=np.int8)
+    # Só cabe um goleiro por time; os excedentes (os mais fracos) jogam na defesa.
+    goleiros = np.flatnonzero(setores == GOLEIRO)
+    if len(goleiros) > quantidade_times:
+        excedentes = goleiros[np.argsort(-forcas[goleiros], kind="stable")][quantidade_times:]
+        setores[excedentes] = DEFESA
+    return setores
+
+
+def _distribuicao_inicial(setores: np.ndarray, forcas: np.ndarray, quantidade_times: int, rng: Optional[np.random.Generator]) -> np.ndarray:
+    # Ordena por setor e, dentro do setor, do mais forte ao mais fraco (ou em
+    # ordem aleatória nas tentativas seguintes) e distribui em rodízio com um
+    # ponteiro único: qualquer trecho contínuo do rodízio dá a cada time o piso
+    # ou o teto da média, então setores e tamanhos ficam equilibrados.
+    desempate = -forcas if rng is None else rng.random(len(forcas))
+    ordem = np.lexsort((desempate, setores))
+    rotulos = np.arange(quantidade_times) if rng is None else rng.permutation(quantidade_times)
+    times = np.empty(len(forcas), dtype=np.int64)
+    times[ordem] = rotulos[np.arange(len(forcas)) % quantidade_times]
+    return times
+
+
+def _busca_local(times: np.ndarray, setores: np.ndarray, forcas: np.ndarray, quantidade_times: int) -> float:
+    """Aplica a melhor troca entre times, no mesmo setor, até nenhuma reduzir o custo.
+
+    Custo: soma de (força do time - média)². Trocar ``i`` (time a) por ``j``
+    (time b), com D = f_j - f_i e T = t_a - t_b, muda o custo em 2·D·(T + D).
+    """
+    mesmo_setor = setores[:, None] == setores[None, :]
+    diferenca = forcas[None, :] - forcas[:, None]
+    totais = np.bincount(times, weights=forcas, minlength=quantidade_times)
+    for _ in range(len(forcas) * len(forcas)):
+        delta_times = totais[times][:, None] - totais[times][None, :]
+        ganho = 2.0 * diferenca * (delta_times + diferenca)
+        ganho[~mesmo_setor | (times[:, None] == times[None, :])] = 0.0
+        melhor = int(np.argmin(ganho))
+        i, j = divmod(melhor, len(forcas))
+        if ganho[i, j] >= -1e-9:
+            break
+        totais[times[i]] += diferenca[i, j]
+        totais[times[j]] -= diferenca[i, j]
+        times[i], times[j] = times[j], times[i]
+    return float(np.square(totais - totais.mean()).sum())
+
+
+def sortear_times(
+    jogadores: Sequence[Jogador],
+    quantidade_times: int,
+    *,
+    escalacao_size: Optional[int] = None,
+    seed: Optional[int] = None,
+    tentativas: int = 8,
+) -> list[TimeSorteado]:
+    """Divide ``jogadores`` em ``quantidade_times`` times de força equilibrada.
+
+    Com ``escalacao_size``, os excedentes de cada time vão para o banco
+    (``is_titular=False``), com ``ordem_banco`` a partir de 1. A mesma
+    ``seed`` reproduz o mesmo sorteio.
+    """
+    if quantidade_times < 2:
+        raise ValueError("São necessários ao menos dois times")
+    if len(jogadores) < quantidade_times:
+        raise ValueError("Jogadores insuficientes para a quantidade de times")
+
+    forcas = np.array([j.forca for j in jogadores], dtype=np.float64)
+    setores = _setores(jogadores, forcas, quantidade_times)
+    rng = np.random.default_rng(seed)
+
+    melhor_custo, melhores_times = None, None
+    for tentativa in range(max(1, tentativas)):
+        times = _distribuicao_inicial(setores, forcas, quantidade_times, rng if tentativa else None)
+        custo = _busca_local(times, setores, forcas, quantidade_times)
+        if melhor_custo is None or custo < melhor_custo - 1e-9:
+            melhor_custo, melhores_times = custo, times
+
+    resultado = []
+    for indice in range(quantidade_times):
+        membros = np.flatnonzero(melhores_times == indice)
+        # Goleiro primeiro e os demais do mais forte ao mais fraco: os mais
+        # fracos ficam no banco quando o time passa de ``escalacao_size``.
+        membros = membros[np.lexsort((-forcas[membros], setores[membros] != GOLEIRO))]
+        escalados = []
+        for posicao, idx in enumerate(membros):
+            titular = escalacao_size is None or posicao < escalacao_size
+            escalados.append(Escalado(
+                jogador=jogadores[idx],
+                is_titular=titular,
+                ordem_banco=None if titular else posicao - escalacao_size + 1,
+            ))
+        resultado.append(TimeSorteado(indice=indice, forca=float(forcas[membros].sum()), escalados=tuple(escalados)))
+    return resultado
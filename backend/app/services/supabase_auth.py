@@ -1,14 +1,49 @@
-import time
-import httpx
+"""Validação de access tokens do Supabase.
+
+O caminho normal é local: a assinatura é conferida com as chaves do JWKS do
+projeto. A API ``/auth/v1/user`` do Supabase só é chamada quando isso não é
+possível (JWKS fora do ar, ``kid`` desconhecido, assinatura que não confere) —
+cada ida à API conta em ``supabase_remote_fallback_total``.
+
+* Tokens já validados ficam em cache pelo hash do token até o ``exp`` (no
+  máximo ``supabase_token_cache_ttl_seconds``).
+* O JWKS é renovado por uma única busca por vez (single-flight). Passado
+  ``supabase_jwks_ttl_seconds`` as chaves antigas continuam valendo enquanto a
+  renovação roda em segundo plano, até ``supabase_jwks_stale_seconds``. Se a
+  renovação falhar, a próxima só é tentada depois de ``min(ttl, 30 s)``.
+* Um ``kid`` fora do JWKS força no máximo uma renovação; se continuar ausente,
+  fica em cache negativo por ``supabase_unknown_kid_ttl_seconds``.
+"""
+
+import asyncio
+import hashlib
 import logging
+import time
+from typing import Optional
+
 from jose import jwt
 from jose.exceptions import JWTError
+
 from app.config import get_settings
+from app.http_clients import http_clients
+from app.metrics import registry
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-_jwks_cache: dict = {"keys": None, "fetched_at": 0.0}
-_JWKS_TTL = 60 * 60  # 1h
+token_verifications = registry.counter(
+    "supabase_token_verifications_total", "Tokens do Supabase validados, por origem.", ("source",),
+)
+remote_fallbacks = registry.counter(
+    "supabase_remote_fallback_total", "Validações que precisaram da API /auth/v1/user.", ("reason",),
+)
+jwks_refreshes = registry.counter("supabase_jwks_refresh_total", "Buscas do JWKS do Supabase.", ("result",))
+
+_settings = get_settings()
+_token_cache = TTLCache(
+    maxsize=_settings.supabase_token_cache_max_entries, ttl=_settings.supabase_token_cache_ttl_seconds,
+)
+_unknown_kids = TTLCache(maxsize=1_000, ttl=_settings.supabase_unknown_kid_ttl_seconds)
 
 
 def _get_supabase_base_url() -> str:
@@ -25,20 +60,100 @@ def _get_supabase_base_url() -> str:
     return supabase_url
 
 
-async def _get_jwks() -> dict:
-    now = time.time()
-    if _jwks_cache["keys"] and now - _jwks_cache["fetched_at"] < _JWKS_TTL:
-        return _jwks_cache["keys"]
-
+async def _fetch_jwks() -> dict:
     url = f"{_get_supabase_base_url()}/auth/v1/.well-known/jwks.json"
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        jwks = response.json()
+    response = await http_clients.get("supabase").get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+class JwksCache:
+    """JWKS em memória com renovação single-flight e stale-while-revalidate."""
+
+    def __init__(self, ttl: float, stale: float, *, failure_backoff: float = 30.0, clock=time.monotonic) -> None:
+        self.ttl = ttl
+        self.stale = stale
+        self.failure_backoff = min(ttl, failure_backoff)
+        self._clock = clock
+        self._keys: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._failed_at: Optional[float] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _age(self) -> float:
+        return self._clock() - self._fetched_at
+
+    async def _do_refresh(self) -> dict:
+        try:
+            keys = await _fetch_jwks()
+        except Exception:
+            jwks_refreshes.inc(result="error")
+            self._failed_at = self._clock()
+            raise
+        jwks_refreshes.inc(result="ok")
+        self._keys, self._fetched_at, self._failed_at = keys, self._clock(), None
+        return keys
+
+    def _backing_off(self) -> bool:
+        return self._failed_at is not None and self._clock() - self._failed_at < self.failure_backoff
+
+    def _start_refresh(self) -> asyncio.Task:
+        task = self._refresh
+        # Uma task de outro event loop (scripts, testes) não pode ser aguardada aqui.
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._refresh = asyncio.ensure_future(self._do_refresh())
+            task.add_done_callback(self._log_background_failure)
+        return task
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Falha ao renovar o JWKS do Supabase: %s", task.exception())
+
+    async def get(self) -> dict:
+        if self._keys is not None:
+            age = self._age()
+            if age < self.ttl:
+                return self._keys
+            if age < self.ttl + self.stale:
+                # Com o JWKS fora do ar, cada requisição dispararia uma busca
+                # (multiplicada pelas retentativas do cliente HTTP).
+                if not self._backing_off():
+                    self._start_refresh()
+                return self._keys
+        return await asyncio.shield(self._start_refresh())
+
+    async def refresh(self, min_interval: float) -> dict:
+        """Força uma renovação, a não ser que a última tenha menos de ``min_interval`` segundos."""
+        if self._keys is not None and self._age() < min_interval:
+            return self._keys
+        return await asyncio.shield(self._start_refresh())
 
-    _jwks_cache["keys"] = jwks
-    _jwks_cache["fetched_at"] = now
-    return jwks
+    def clear(self) -> None:
+        self._keys, self._fetched_at, self._failed_at, self._refresh = None, 0.0, None, None
+
+
+_jwks = JwksCache(_settings.supabase_jwks_ttl_seconds, _settings.supabase_jwks_stale_seconds)
+
+
+def _find_key(jwks: dict, kid: Optional[str]) -> Optional[dict]:
+    return next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
+
+
+def _token_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def _cache_verified(access_token: str, payload: dict, exp: Optional[int]) -> None:
+    if not exp:
+        return
+    restante = int(exp) - time.time()
+    if restante > 0:
+        _token_cache.set(_token_key(access_token), payload, ttl=min(restante, _token_cache.ttl))
+
+
+def supabase_token_cache_stats() -> dict:
+    return _token_cache.stats()
 
 
 async def _get_user_via_supabase_api(access_token: str) -> dict:
@@ -47,32 +162,61 @@ async def _get_user_via_supabase_api(access_token: str) -> dict:
         raise RuntimeError("SUPABASE_ANON_KEY não configurada no backend")
 
     url = f"{_get_supabase_base_url()}/auth/v1/user"
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(
-            url,
-            headers={
-                "apikey": settings.supabase_anon_key,
-                "Authorization": f"Bearer {access_token}",
-            },
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await http_clients.get("supabase").get(
+        url,
+        headers={
+            "apikey": settings.supabase_anon_key,
+            "Authorization": f"Bearer {access_token}",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def _remote_fallback(access_token: str, reason: str) -> dict:
+    remote_fallbacks.inc(reason=reason)
+    user = await _get_user_via_supabase_api(access_token)
+    token_verifications.inc(source="remote")
+    try:
+        exp = jwt.get_unverified_claims(access_token).get("exp")
+    except JWTError:
+        exp = None
+    # A API confirmou o token; o exp vem do próprio token.
+    _cache_verified(access_token, user, exp)
+    return user
 
 
 async def get_supabase_user(access_token: str) -> dict:
-    """Valida um JWT do Supabase via JWKS e retorna o payload."""
+    """Valida um JWT do Supabase (cache, depois JWKS, por último a API) e retorna o payload."""
+    cached = _token_cache.get(_token_key(access_token))
+    if cached is not None:
+        token_verifications.inc(source="cache")
+        return cached
+
     try:
-        jwks = await _get_jwks()
         header = jwt.get_unverified_header(access_token)
+    except JWTError as e:
+        logger.warning("Cabeçalho do JWT Supabase ilegível, tentando API Supabase: %s", e)
+        return await _remote_fallback(access_token, "malformed_token")
+    try:
+        jwks = await _jwks.get()
     except Exception as e:
         logger.warning("JWKS indisponível, tentando validar token pela API Supabase: %s", e)
-        return await _get_user_via_supabase_api(access_token)
+        return await _remote_fallback(access_token, "jwks_unavailable")
 
     kid = header.get("kid")
-    key = next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
+    key = _find_key(jwks, kid)
+    if not key and _unknown_kids.get(kid) is None:
+        # Chave nova (rotação no Supabase): renova o JWKS uma vez antes de desistir.
+        try:
+            key = _find_key(await _jwks.refresh(min_interval=_unknown_kids.ttl), kid)
+        except Exception as e:
+            logger.warning("Falha ao renovar JWKS para kid=%s: %s", kid, e)
+        if not key:
+            _unknown_kids.set(kid, True)
     if not key:
         logger.warning("Chave JWKS não encontrada para kid=%s, tentando API Supabase", kid)
-        return await _get_user_via_supabase_api(access_token)
+        return await _remote_fallback(access_token, "unknown_kid")
 
     try:
         payload = jwt.decode(
@@ -84,6 +228,8 @@ async def get_supabase_user(access_token: str) -> dict:
         )
     except JWTError as e:
         logger.warning("Falha ao validar JWT Supabase via JWKS, tentando API Supabase: %s", e)
-        return await _get_user_via_supabase_api(access_token)
+        return await _remote_fallback(access_token, "invalid_signature")
 
+    token_verifications.inc(source="jwks")
+    _cache_verified(access_token, payload, payload.get("exp"))
     return payload
@@ -0,0 +1,84 @@
+"""Cache do usuário autenticado usado por ``get_current_user``.
+
+Cada tela do front dispara várias chamadas com o mesmo token, e todas
+buscavam o mesmo registro em ``users``. O cache guarda uma cópia imutável
+(desligada da sessão do SQLAlchemy) indexada por ``(user_id, iat do token)``.
+
+Quem altera dados do usuário deve chamar ``invalidate_user`` depois do commit.
+Como o cache é por worker, o TTL limita por quanto tempo outro worker pode
+enxergar o usuário antigo (por exemplo, logo após uma desativação).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.config import get_settings
+from app.models import User, UserRole
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Cópia somente leitura das colunas de ``User`` que as rotas consultam.
+
+    Não inclui ``senha_hash``. Para alterar o usuário, carregue o registro
+    com ``db.get(User, snapshot.id)``.
+    """
+
+    id: int
+    nome: Optional[str]
+    email: Optional[str]
+    telefone: Optional[str]
+    role: UserRole
+    ativo: bool
+    cpf_cnpj: Optional[str]
+    asaas_customer_id: Optional[str]
+    asaas_subscription_id: Optional[str]
+    subscription_status: Optional[str]
+    subscription_current_period_end: Optional[datetime]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            nome=user.nome,
+            email=user.email,
+            telefone=user.telefone,
+            role=user.role,
+            ativo=user.ativo,
+            cpf_cnpj=user.cpf_cnpj,
+            asaas_customer_id=user.asaas_customer_id,
+            asaas_subscription_id=user.asaas_subscription_id,
+            subscription_status=user.subscription_status,
+            subscription_current_period_end=user.subscription_current_period_end,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+_settings = get_settings()
+_user_cache = TTLCache(maxsize=_settings.user_cache_max_entries, ttl=_settings.user_cache_ttl_seconds)
+
+
+def get_cached_user(user_id: int, issued_at) -> Optional[UserSnapshot]:
+    return _user_cache.get((user_id, issued_at))
+
+
+def cache_user(user: User, issued_at) -> UserSnapshot:
+    snapshot = UserSnapshot.from_user(user)
+    _user_cache.set((user.id, issued_at), snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    """Descarta todas as entradas do usuário (qualquer token)."""
+    _user_cache.delete_where(lambda key: key[0] == user_id)
+
+
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
@@ -0,0 +1,60 @@
+"""Cursores opacos para paginação keyset.
+
+O cursor é a chave de ordenação do último item da página (lista JSON em
+base64 url-safe). O cliente só o devolve no próximo pedido; o formato pode
+mudar sem quebrar a API.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Union, get_args, get_origin
+
+from fastapi import HTTPException
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não suportado no cursor: {type(value).__name__}")
+
+
+def encode_cursor(values: list) -> str:
+    """Datetimes viram ISO 8601 (``decode_cursor`` os devolve como ``datetime``)."""
+    raw = json.dumps(values, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _check(value, tipo):
+    """Valor do cursor convertido para ``tipo`` (``Optional[...]`` aceita ``None``)."""
+    if get_origin(tipo) is Union:
+        if value is None and type(None) in get_args(tipo):
+            return None
+        tipo = next(arg for arg in get_args(tipo) if arg is not type(None))
+    if tipo is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    # bool é subclasse de int, mas ``true`` nunca é um id válido.
+    if isinstance(value, tipo) and not (tipo is int and isinstance(value, bool)):
+        return value
+    raise ValueError(f"esperado {tipo.__name__}")
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """Decodifica o cursor e confere cada valor contra ``types`` (400 se inválido).
+
+    ``types`` tem um tipo por posição: ``int``, ``str``, ``datetime`` (ISO
+    8601, devolvido já como ``datetime``) ou ``Optional[...]`` para colunas
+    que aceitam NULL. Um cursor editado pelo cliente vira 400 aqui, em vez de
+    chegar ao banco com o tipo errado.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("tamanho inesperado")
+        return [_check(value, tipo) for value, tipo in zip(values, types)]
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
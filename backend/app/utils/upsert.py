@@ -0,0 +1,17 @@
+"""``INSERT ... ON CONFLICT`` no dialeto da sessão.
+
+Produção é Postgres; os testes rodam em sqlite, que tem a mesma sintaxe de
+``on_conflict_do_update``/``excluded`` no SQLAlchemy.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(db: Session, table):
+    """``insert(table)`` com ``on_conflict_do_update`` para o banco ligado a ``db``."""
+    return _INSERTS[db.get_bind().dialect.name](table)
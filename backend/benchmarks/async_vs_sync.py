@@ -0,0 +1,123 @@
+"""Compara requests/s e p99 entre o caminho síncrono (threadpool) e o assíncrono (asyncpg).
+
+Monta uma app FastAPI mínima com a mesma consulta de ``listar_jogos`` exposta
+duas vezes: ``/sync`` usa ``get_db`` numa rota ``def`` (roda no threadpool do
+AnyIO, como as rotas ainda não migradas) e ``/async`` usa ``get_async_db`` numa
+rota ``async def``. Autenticação fica de fora para isolar o custo do banco.
+
+Uso (a partir de ``backend/``, com dados no DATABASE_URL):
+
+    python -m benchmarks.async_vs_sync --racha-id 1 --concurrency 200 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import async_engine, engine, get_async_db, get_db
+from app.models import Jogo, Presenca, StatusPresenca
+from benchmarks.stats import summarize_ms
+
+
+def _jogos_query(racha_id: int):
+    return (
+        select(Jogo)
+        .where(Jogo.racha_id == racha_id, Jogo.cancelado.is_(False))
+        .order_by(Jogo.data_hora)
+        .limit(50)
+    )
+
+
+def _confirmados_query(jogo_ids: list[int]):
+    return (
+        select(Presenca.jogo_id, func.count(Presenca.id))
+        .where(Presenca.jogo_id.in_(jogo_ids), Presenca.status == StatusPresenca.CONFIRMADO)
+        .group_by(Presenca.jogo_id)
+    )
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(racha_id: int, db: Session = Depends(get_db)):
+        jogos = db.scalars(_jogos_query(racha_id)).all()
+        ids = [j.id for j in jogos]
+        contagens = dict(db.execute(_confirmados_query(ids)).all()) if ids else {}
+        return [{"id": j.id, "total_confirmados": contagens.get(j.id, 0)} for j in jogos]
+
+    @app.get("/async")
+    async def async_route(racha_id: int, db: AsyncSession = Depends(get_async_db)):
+        jogos = (await db.scalars(_jogos_query(racha_id))).all()
+        ids = [j.id for j in jogos]
+        contagens = dict((await db.execute(_confirmados_query(ids))).all()) if ids else {}
+        return [{"id": j.id, "total_confirmados": contagens.get(j.id, 0)} for j in jogos]
+
+    return app
+
+
+async def load(client: httpx.AsyncClient, path: str, racha_id: int, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.get(path, params={"racha_id": racha_id})
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "requests": total,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(len(latencies) / wall, 1) if wall else 0.0,
+        "latency_ms": summarize_ms(latencies),
+    }
+
+
+async def main_async(args) -> dict:
+    transport = httpx.ASGITransport(app=build_app())
+    results = {"concurrency": args.concurrency, "racha_id": args.racha_id}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for path in ("/sync", "/async"):
+            # aquecimento: abre as conexões do pool antes de medir
+            await load(client, path, args.racha_id, args.concurrency, args.concurrency)
+            results[path.strip("/")] = await load(client, path, args.racha_id, args.concurrency, args.requests)
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--racha-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""Gerador de dados sintéticos para todas as tabelas do racha, carregados com COPY.
+
+Gera users, rachas, racha_admins, atletas, teams, team_members, temporadas,
+jogos, presencas, cartoes, pagamentos e atleta_stats com distribuições
+configuráveis (atletas por racha, assiduidade, adimplência, cartões e gols por
+posição). Os dados dependem só de ``--seed``, dos parâmetros e de
+``--data-referencia``: os mesmos argumentos produzem os mesmos arquivos.
+
+As linhas são geradas em streaming e enviadas ao Postgres por ``COPY ... FROM
+STDIN`` (formato CSV), tabela a tabela e com ids explícitos; no fim as
+sequências são ajustadas e o banco é analisado. Os triggers de contadores dos
+jogos e de saldos rodam normalmente. O banco deve ter sido criado pela app
+(enums com os nomes dos membros) e as tabelas devem estar vazias, a menos que
+se passe ``--truncate``.
+
+Os usuários seguem o padrão do ``load_seed`` (``bench-<id>@bench.local``, senha
+``benchmark``), então o ``load_test`` roda sobre estes dados com
+``--total-usuarios`` igual ao número de usuários gerados.
+
+Uso (a partir de ``backend/``):
+
+    # gera e carrega no DATABASE_URL, guardando um dump reutilizável
+    python -m benchmarks.datagen gerar --seed 7 --rachas 5000 --dump dumps/seed7
+    # só o dump, sem banco
+    python -m benchmarks.datagen gerar --seed 7 --dump dumps/seed7 --sem-banco
+    # recarrega um dump em outro banco
+    python -m benchmarks.datagen carregar dumps/seed7 --truncate
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from passlib.hash import bcrypt as bcrypt_hash
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+from app.database import Base
+from app.models import Posicao, StatusPagamento, StatusPresenca, StatusTemporada, TipoCartao, TipoPagamento, TipoRacha, UserRole
+from app.schema_compat import ensure_schema_compatibility
+from benchmarks.load_seed import SENHA_PADRAO, email_bench
+
+# Ordem de carga (respeita as FKs) e colunas de cada tabela no CSV.
+TABELAS = {
+    "users": ("id", "nome", "email", "senha_hash", "role", "ativo", "subscription_status"),
+    "rachas": ("id", "nome", "tipo", "descricao", "max_atletas", "valor_mensalidade",
+               "valor_cartao_amarelo", "valor_cartao_vermelho", "escalacao_size", "ativo"),
+    "racha_admins": ("id", "racha_id", "user_id", "is_owner", "ativo"),
+    "atletas": ("id", "user_id", "racha_id", "nome", "apelido", "posicao", "numero_camisa", "is_admin", "ativo"),
+    "teams": ("id", "racha_id", "nome", "ativo"),
+    "team_members": ("id", "team_id", "atleta_id", "ativo", "is_titular", "posicao_escalacao"),
+    "temporadas": ("id", "racha_id", "nome", "mes", "ano", "status", "campeao_team_id"),
+    "jogos": ("id", "racha_id", "data_hora", "local", "valor_campo", "finalizado", "cancelado",
+              "time_a_id", "time_b_id", "time_a_nome", "time_b_nome", "placar_time_a", "placar_time_b"),
+    "presencas": ("id", "jogo_id", "atleta_id", "status"),
+    "cartoes": ("id", "atleta_id", "jogo_id", "tipo", "multa_gerada"),
+    "pagamentos": ("id", "atleta_id", "tipo", "valor", "descricao", "referencia", "status"),
+    "atleta_stats": ("id", "atleta_id", "racha_id", "gols", "assistencias"),
+}
+
+# Gols e assistências esperados por jogo confirmado, por posição.
+GOLS_POR_JOGO = {
+    Posicao.GOLEIRO: 0.01, Posicao.ZAGUEIRO: 0.08, Posicao.LATERAL: 0.12, Posicao.VOLANTE: 0.15,
+    Posicao.MEIA: 0.35, Posicao.ATACANTE: 0.7, Posicao.PONTA: 0.5,
+}
+ASSISTENCIAS_POR_JOGO = {
+    Posicao.GOLEIRO: 0.02, Posicao.ZAGUEIRO: 0.08, Posicao.LATERAL: 0.2, Posicao.VOLANTE: 0.2,
+    Posicao.MEIA: 0.4, Posicao.ATACANTE: 0.3, Posicao.PONTA: 0.4,
+}
+# Proporção das posições num elenco típico.
+PESOS_POSICAO = {
+    Posicao.GOLEIRO: 2, Posicao.ZAGUEIRO: 4, Posicao.LATERAL: 3, Posicao.VOLANTE: 3,
+    Posicao.MEIA: 5, Posicao.ATACANTE: 4, Posicao.PONTA: 3,
+}
+
+
+@dataclass(frozen=True)
+class Config:
+    seed: int = 42
+    data_referencia: str = ""  # AAAA-MM-DD; vazio = hoje
+    rachas: int = 5000
+    atletas_media: float = 30.0  # Poisson, limitado a [atletas_min, atletas_max]
+    atletas_min: int = 10
+    atletas_max: int = 60
+    fracao_com_usuario: float = 1.0  # atletas com conta de usuário
+    jogos_por_racha: int = 40  # semanais; os ``jogos_futuros`` últimos ainda não aconteceram
+    jogos_futuros: int = 4
+    taxa_confirmacao: float = 0.6  # média da assiduidade (Beta) de cada atleta
+    taxa_recusa: float = 0.25  # fração dos não confirmados que recusam (o resto fica pendente)
+    concentracao_assiduidade: float = 4.0  # maior = atletas mais parecidos entre si
+    meses_mensalidade: int = 6
+    taxa_adimplencia: float = 0.85
+    cartoes_por_jogo: float = 0.4  # Poisson por jogo finalizado
+    fracao_vermelho: float = 0.1
+    temporadas_por_racha: int = 3
+    valor_mensalidade: int = 5000
+
+    def referencia(self) -> date:
+        return date.fromisoformat(self.data_referencia) if self.data_referencia else date.today()
+
+
+class _CsvStream:
+    """Arquivo somente leitura que serializa linhas em CSV sob demanda (para ``copy_expert``)."""
+
+    def __init__(self, linhas: Iterable[tuple], lote: int = 5000) -> None:
+        self._linhas = iter(linhas)
+        self._lote = lote
+        self._buffer = ""
+        self.total = 0
+
+    def _encher(self) -> bool:
+        bloco = list(itertools.islice(self._linhas, self._lote))
+        if not bloco:
+            return False
+        saida = io.StringIO()
+        csv.writer(saida, lineterminator="\n").writerows(bloco)
+        self._buffer += saida.getvalue()
+        self.total += len(bloco)
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buffer) < size) and self._encher():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        dados, self._buffer = self._buffer[:size], self._buffer[size:]
+        return dados
+
+    def readline(self, size: int = -1) -> str:
+        while "\n" not in self._buffer and self._encher():
+            pass
+        fim = self._buffer.find("\n") + 1 or len(self._buffer)
+        dados, self._buffer = self._buffer[:fim], self._buffer[fim:]
+        return dados
+
+
+def _bool(valor: bool) -> str:
+    return "t" if valor else "f"
+
+
+def _senha_hash(seed: int) -> str:
+    # Sal derivado da seed para o dump sair idêntico; o último caractere do sal
+    # do bcrypt só carrega 2 bits, daí o ``.`` fixo.
+    alfabeto = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    rng = random.Random(f"{seed}:senha")
+    salt = "".join(rng.choice(alfabeto) for _ in range(21)) + "."
+    return bcrypt_hash.using(salt=salt, rounds=12, ident="2b").hash(SENHA_PADRAO)
+
+
+def _referencias(base: date, meses: int) -> list[tuple[str, int]]:
+    """Referências ``MM/AAAA`` do mês de ``base`` para trás, com a idade em meses."""
+    refs, ano, mes = [], base.year, base.month
+    for idade in range(meses):
+        refs.append((f"{mes:02d}/{ano}", idade))
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+    return refs
+
+
+class Gerador:
+    """Gera as tabelas na ordem de ``TABELAS``; cada uma depende só das anteriores."""
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.base = datetime.combine(config.referencia(), dtime(20, 0))
+        self.senha_hash = _senha_hash(config.seed)
+        # Estado compartilhado entre tabelas, preenchido à medida que são geradas.
+        self.atletas_por_racha: list[list[int]] = []
+        self.atleta_user: dict[int, Optional[int]] = {}
+        self.atleta_posicao: list[Posicao] = [None]  # índice = atleta_id
+        self.assiduidade: list[float] = [0.0]
+        self.jogos_confirmados = None
+        self.times_por_racha: list[tuple[int, int]] = []
+        self.cartoes: list[tuple[int, int, TipoCartao]] = []
+
+    def _rng(self, tabela: str) -> random.Random:
+        return random.Random(f"{self.config.seed}:{tabela}")
+
+    def linhas(self, tabela: str) -> Iterator[tuple]:
+        return getattr(self, f"_gerar_{tabela}")()
+
+    def _tamanhos_elenco(self) -> np.ndarray:
+        rng = np.random.default_rng([self.config.seed, 1])
+        tamanhos = rng.poisson(self.config.atletas_media, self.config.rachas)
+        return np.clip(tamanhos, self.config.atletas_min, self.config.atletas_max)
+
+    def _gerar_users(self) -> Iterator[tuple]:
+        cfg = self.config
+        rng = self._rng("users")
+        posicoes, pesos = list(PESOS_POSICAO), list(PESOS_POSICAO.values())
+        media, k = cfg.taxa_confirmacao, cfg.concentracao_assiduidade
+        atleta_id = user_id = 0
+        for racha_idx, tamanho in enumerate(self._tamanhos_elenco()):
+            ids = []
+            for posicao_elenco in range(int(tamanho)):
+                atleta_id += 1
+                ids.append(atleta_id)
+                self.atleta_posicao.append(rng.choices(posicoes, pesos)[0])
+                self.assiduidade.append(rng.betavariate(media * k, (1 - media) * k))
+                # O primeiro atleta de cada racha é o admin e sempre tem usuário.
+                if posicao_elenco == 0 or rng.random() < cfg.fracao_com_usuario:
+                    user_id += 1
+                    self.atleta_user[atleta_id] = user_id
+                    admin = posicao_elenco == 0
+                    yield (
+                        user_id, f"Usuário {user_id}", email_bench(user_id), self.senha_hash,
+                        (UserRole.ADMIN if admin else UserRole.ATLETA).name, "t", "active" if admin else None,
+                    )
+                else:
+                    self.atleta_user[atleta_id] = None
+            self.atletas_por_racha.append(ids)
+
+    def _gerar_rachas(self) -> Iterator[tuple]:
+        cfg = self.config
+        tipos = [TipoRacha.SOCIETY, TipoRacha.SOCIETY, TipoRacha.CAMPO, TipoRacha.FUTSAL]
+        rng = self._rng("rachas")
+        for racha_id, atletas in enumerate(self.atletas_por_racha, start=1):
+            yield (
+                racha_id, f"Racha {racha_id}", rng.choice(tipos).name, "benchmark", max(30, len(atletas) + 10),
+                cfg.valor_mensalidade, 1000, 2000, rng.choice((5, 6, 7, 8, 11)), "t",
+            )
+
+    def _gerar_racha_admins(self) -> Iterator[tuple]:
+        for racha_id, atletas in enumerate(self.atletas_por_racha, start=1):
+            yield (racha_id, racha_id, self.atleta_user[atletas[0]], "t", "t")
+
+    def _gerar_atletas(self) -> Iterator[tuple]:
+        for racha_id, atletas in enumerate(self.atletas_por_racha, start=1):
+            for camisa, atleta_id in enumerate(atletas, start=1):
+                yield (
+                    atleta_id, self.atleta_user[atleta_id], racha_id, f"Atleta {atleta_id}", f"A{atleta_id}",
+                    self.atleta_posicao[atleta_id].name, camisa, _bool(camisa == 1), "t",
+                )
+
+    def _gerar_teams(self) -> Iterator[tuple]:
+        for racha_id in range(1, len(self.atletas_por_racha) + 1):
+            time_a, time_b = 2 * racha_id - 1, 2 * racha_id
+            self.times_por_racha.append((time_a, time_b))
+            yield (time_a, racha_id, "Time A", "t")
+            yield (time_b, racha_id, "Time B", "t")
+
+    def _gerar_team_members(self) -> Iterator[tuple]:
+        member_id = 0
+        for atletas, times in zip(self.atletas_por_racha, self.times_por_racha):
+            for i, atleta_id in enumerate(atletas):
+                member_id += 1
+                yield (member_id, times[i % 2], atleta_id, "t", "t", self.atleta_posicao[atleta_id].value)
+
+    def _gerar_temporadas(self) -> Iterator[tuple]:
+        rng = self._rng("temporadas")
+        refs = _referencias(self.config.referencia(), self.config.temporadas_por_racha)
+        temporada_id = 0
+        for racha_id, times in enumerate(self.times_por_racha, start=1):
+            for referencia, idade in refs:
+                temporada_id += 1
+                mes, ano = (int(p) for p in referencia.split("/"))
+                ativa = idade == 0
+                yield (
+                    temporada_id, racha_id, f"Temporada {referencia}", mes, ano,
+                    (StatusTemporada.ATIVA if ativa else StatusTemporada.ENCERRADA).name,
+                    None if ativa else rng.choice(times),
+                )
+
+    def _gerar_jogos(self) -> Iterator[tuple]:
+        cfg = self.config
+        rng = self._rng("jogos")
+        passados = max(0, cfg.jogos_por_racha - cfg.jogos_futuros)
+        jogo_id = 0
+        for racha_id, (time_a, time_b) in enumerate(self.times_por_racha, start=1):
+            for k in range(cfg.jogos_por_racha):
+                jogo_id += 1
+                data_hora = self.base + timedelta(weeks=k - passados)
+                finalizado = k < passados
+                placar = (rng.randint(0, 8), rng.randint(0, 8)) if finalizado else (None, None)
+                yield (
+                    jogo_id, racha_id, data_hora.isoformat(sep=" "), f"Campo {racha_id % 50}", 20000,
+                    _bool(finalizado), "f", time_a, time_b, "Time A", "Time B", *placar,
+                )
+
+    def _gerar_presencas(self) -> Iterator[tuple]:
+        cfg = self.config
+        rng = self._rng("presencas")
+        passados = max(0, cfg.jogos_por_racha - cfg.jogos_futuros)
+        self.jogos_confirmados = np.zeros(len(self.assiduidade), dtype=np.int64)
+        presenca_id = jogo_id = 0
+        confirmado, recusado, pendente = (s.name for s in (StatusPresenca.CONFIRMADO, StatusPresenca.RECUSADO, StatusPresenca.PENDENTE))
+        for atletas in self.atletas_por_racha:
+            for k in range(cfg.jogos_por_racha):
+                jogo_id += 1
+                finalizado = k < passados
+                # Jogos futuros ainda têm parte da lista sem resposta.
+                respondeu = 1.0 if finalizado else 0.7
+                confirmados = []
+                for atleta_id in atletas:
+                    presenca_id += 1
+                    sorteio = rng.random()
+                    if sorteio < self.assiduidade[atleta_id] * respondeu:
+                        status = confirmado
+                        confirmados.append(atleta_id)
+                    elif sorteio < respondeu and rng.random() < cfg.taxa_recusa:
+                        status = recusado
+                    else:
+                        status = pendente
+                    yield (presenca_id, jogo_id, atleta_id, status)
+                if finalizado and confirmados:
+                    self.jogos_confirmados[confirmados] += 1
+                    for _ in range(_poisson(rng, cfg.cartoes_por_jogo)):
+                        tipo = TipoCartao.VERMELHO if rng.random() < cfg.fracao_vermelho else TipoCartao.AMARELO
+                        self.cartoes.append((rng.choice(confirmados), jogo_id, tipo))
+
+    def _gerar_cartoes(self) -> Iterator[tuple]:
+        for cartao_id, (atleta_id, jogo_id, tipo) in enumerate(self.cartoes, start=1):
+            yield (cartao_id, atleta_id, jogo_id, tipo.name, "t")
+
+    def _gerar_pagamentos(self) -> Iterator[tuple]:
+        cfg = self.config
+        rng = self._rng("pagamentos")
+        refs = _referencias(cfg.referencia(), cfg.meses_mensalidade)
+        aprovado, pendente = StatusPagamento.APROVADO.name, StatusPagamento.PENDENTE.name
+        pagamento_id = 0
+        for atletas in self.atletas_por_racha:
+            for atleta_id in atletas:
+                for referencia, idade in refs:
+                    pagamento_id += 1
+                    pago = idade > 0 and rng.random() < cfg.taxa_adimplencia
+                    yield (
+                        pagamento_id, atleta_id, TipoPagamento.MENSALIDADE.name, cfg.valor_mensalidade,
+                        f"Mensalidade {referencia}", referencia, aprovado if pago else pendente,
+                    )
+        referencia_atual = refs[0][0] if refs else None
+        for atleta_id, _, tipo in self.cartoes:
+            pagamento_id += 1
+            multa = TipoPagamento.MULTA_VERMELHO if tipo == TipoCartao.VERMELHO else TipoPagamento.MULTA_AMARELO
+            valor = 2000 if tipo == TipoCartao.VERMELHO else 1000
+            status = aprovado if rng.random() < cfg.taxa_adimplencia else pendente
+            yield (pagamento_id, atleta_id, multa.name, valor, f"Multa cartão {tipo.value}", referencia_atual, status)
+
+    def _gerar_atleta_stats(self) -> Iterator[tuple]:
+        rng = np.random.default_rng([self.config.seed, 2])
+        posicoes = self.atleta_posicao[1:]
+        jogos = self.jogos_confirmados[1:]
+        gols = rng.poisson(np.array([GOLS_POR_JOGO[p] for p in posicoes]) * jogos)
+        assistencias = rng.poisson(np.array([ASSISTENCIAS_POR_JOGO[p] for p in posicoes]) * jogos)
+        atleta_id = 0
+        for racha_id, atletas in enumerate(self.atletas_por_racha, start=1):
+            for _ in atletas:
+                atleta_id += 1
+                yield (atleta_id, atleta_id, racha_id, int(gols[atleta_id - 1]), int(assistencias[atleta_id - 1]))
+
+
+def _poisson(rng: random.Random, media: float) -> int:
+    # Knuth; as médias usadas aqui são pequenas.
+    limite, k, p = pow(2.718281828459045, -media), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limite:
+            return k
+        k += 1
+
+
+def _copy(raw_connection, tabela: str, colunas: tuple[str, ...], arquivo) -> None:
+    sql = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)"
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(sql, arquivo)
+
+
+def _preparar_banco(engine, truncate: bool) -> None:
+    Base.metadata.create_all(bind=engine)
+    ensure_schema_compatibility(engine)
+    with engine.begin() as conn:
+        if truncate:
+            conn.execute(text(f"TRUNCATE {', '.join(TABELAS)}, saldos_atletas RESTART IDENTITY CASCADE"))
+            return
+        ocupadas = [t for t in TABELAS if conn.execute(text(f"SELECT 1 FROM {t} LIMIT 1")).first()]
+        if ocupadas:
+            raise SystemExit(f"Tabelas com dados: {', '.join(ocupadas)}. Use --truncate num banco descartável.")
+
+
+def _finalizar_banco(engine) -> None:
+    with engine.begin() as conn:
+        for tabela in TABELAS:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), COALESCE((SELECT max(id) FROM {tabela}), 0) + 1, false)"
+            ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def _carregar(engine, fontes: Iterator[tuple[str, object]]) -> dict:
+    """Faz o COPY de cada ``(tabela, arquivo)`` numa única transação."""
+    contagens = {}
+    raw = engine.raw_connection()
+    try:
+        for tabela, arquivo in fontes:
+            inicio = time.perf_counter()
+            _copy(raw, tabela, TABELAS[tabela], arquivo)
+            contagens[tabela] = getattr(arquivo, "total", None)
+            print(f"{tabela}: {time.perf_counter() - inicio:.1f}s", flush=True)
+        raw.commit()
+    except BaseException:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return contagens
+
+
+def _gravar_dump(diretorio: str, tabela: str, linhas: Iterable[tuple]) -> int:
+    total = 0
+    # mtime=0 e o nome fixo no cabeçalho gzip: a mesma seed gera os mesmos bytes.
+    with open(os.path.join(diretorio, f"{tabela}.csv.gz"), "wb") as bruto, \
+            gzip.GzipFile(filename=f"{tabela}.csv", mode="wb", compresslevel=1, fileobj=bruto, mtime=0) as comprimido, \
+            io.TextIOWrapper(comprimido, encoding="utf-8", newline="") as arquivo:
+        writer = csv.writer(arquivo, lineterminator="\n")
+        for bloco in iter(lambda: list(itertools.islice(linhas, 5000)), []):
+            writer.writerows(bloco)
+            total += len(bloco)
+    return total
+
+
+def gerar(config: Config, *, engine=None, dump: Optional[str] = None, truncate: bool = False) -> dict:
+    gerador = Gerador(config)
+    contagens: dict[str, int] = {}
+    inicio = time.perf_counter()
+
+    if dump:
+        os.makedirs(dump, exist_ok=True)
+        for tabela in TABELAS:
+            contagens[tabela] = _gravar_dump(dump, tabela, gerador.linhas(tabela))
+            print(f"{tabela}: {contagens[tabela]} linhas", flush=True)
+        with open(os.path.join(dump, "manifest.json"), "w", encoding="utf-8") as arquivo:
+            json.dump({"config": asdict(config), "data_referencia": config.referencia().isoformat(), "rows": contagens}, arquivo, indent=2)
+        if engine is not None:
+            carregar(engine, dump, truncate=truncate)
+    elif engine is not None:
+        _preparar_banco(engine, truncate)
+        contagens = _carregar(engine, ((tabela, _CsvStream(gerador.linhas(tabela))) for tabela in TABELAS))
+        _finalizar_banco(engine)
+
+    return {"rows": contagens, "total_rows": sum(contagens.values()), "seconds": round(time.perf_counter() - inicio, 1)}
+
+
+def carregar(engine, dump: str, *, truncate: bool = False) -> dict:
+    """Carrega um dump gerado por ``gerar --dump``."""
+    _preparar_banco(engine, truncate)
+
+    def fontes():
+        for tabela in TABELAS:
+            with gzip.open(os.path.join(dump, f"{tabela}.csv.gz"), "rt", encoding="utf-8", newline="") as arquivo:
+                yield tabela, arquivo
+
+    inicio = time.perf_counter()
+    _carregar(engine, fontes())
+    _finalizar_banco(engine)
+    with open(os.path.join(dump, "manifest.json"), encoding="utf-8") as arquivo:
+        manifest = json.load(arquivo)
+    return {"rows": manifest["rows"], "seconds": round(time.perf_counter() - inicio, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_gerar = sub.add_parser("gerar", help="gera os dados (e carrega no DATABASE_URL)")
+    padrao = Config()
+    for campo in fields(Config):
+        p_gerar.add_argument(f"--{campo.name.replace('_', '-')}", type=type(getattr(padrao, campo.name)), default=getattr(padrao, campo.name))
+    p_gerar.add_argument("--dump", help="diretório onde gravar o dump (CSV gzip + manifest.json)")
+    p_gerar.add_argument("--sem-banco", action="store_true", help="só grava o dump")
+    p_gerar.add_argument("--truncate", action="store_true", help="esvazia as tabelas antes de carregar")
+
+    p_carregar = sub.add_parser("carregar", help="carrega um dump no DATABASE_URL")
+    p_carregar.add_argument("dump")
+    p_carregar.add_argument("--truncate", action="store_true")
+
+    args = parser.parse_args()
+    if args.comando == "gerar" and args.sem_banco and not args.dump:
+        parser.error("--sem-banco exige --dump")
+
+    engine = None
+    if not (args.comando == "gerar" and args.sem_banco):
+        engine = create_engine(get_settings().database_url)
+    try:
+        if args.comando == "gerar":
+            config = Config(**{campo.name: getattr(args, campo.name) for campo in fields(Config)})
+            resultado = gerar(config, engine=engine, dump=args.dump, truncate=args.truncate)
+        else:
+            resultado = carregar(engine, args.dump, truncate=args.truncate)
+    finally:
+        if engine is not None:
+            engine.dispose()
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Popula um Postgres local com volumes realistas para o ``load_test``.
+
+Tudo é gerado no servidor com ``INSERT ... SELECT`` sobre ``generate_series``,
+de forma determinística (a mesma configuração gera os mesmos dados):
+
+* ``--rachas`` rachas (marcados com ``descricao = 'benchmark'``);
+* ``--atletas-por-racha`` usuários/atletas por racha; o primeiro de cada racha
+  é o admin. O usuário ``n`` entra com ``bench-<n>@bench.local`` e a senha
+  ``--senha``;
+* ``--jogos-por-racha`` jogos semanais, os 4 últimos no futuro, com a lista de
+  presença completa (status variados);
+* ``--meses`` mensalidades por atleta, as antigas aprovadas.
+
+Os padrões (5.000 rachas x 30 atletas x 14 jogos) dão 150 mil atletas e 2,1
+milhões de presenças. Os triggers de contadores e saldos do ``schema_compat``
+rodam normalmente. Use num banco descartável; se já houver dados de benchmark,
+nada é inserido.
+
+Uso (a partir de ``backend/``, com DATABASE_URL apontando para o banco):
+
+    python -m benchmarks.load_seed --rachas 5000 --atletas-por-racha 30
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+from app.database import Base
+from app.models import Posicao, StatusPagamento, StatusPresenca, TipoPagamento, TipoRacha, UserRole
+from app.schema_compat import ensure_schema_compatibility
+from app.services.auth import hash_password
+
+MARCADOR = "benchmark"
+SENHA_PADRAO = "benchmark"
+JOGOS_FUTUROS = 4
+
+
+def email_bench(n: int) -> str:
+    return f"bench-{n}@bench.local"
+
+
+def _tipo_enum(conn, tabela: str, coluna: str) -> tuple[str, tuple[str, ...]]:
+    """Nome do tipo enum da coluna e seus rótulos (bancos antigos usam valores, não nomes)."""
+    udt = conn.execute(
+        text("SELECT udt_name FROM information_schema.columns WHERE table_name = :t AND column_name = :c"),
+        {"t": tabela, "c": coluna},
+    ).scalar_one()
+    rotulos = conn.execute(
+        text("SELECT e.enumlabel FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid WHERE t.typname = :t"),
+        {"t": udt},
+    ).scalars().all()
+    return udt, tuple(rotulos)
+
+
+def _enum(conn, tabela: str, coluna: str):
+    udt, rotulos = _tipo_enum(conn, tabela, coluna)
+
+    def rotulo(membro) -> str:
+        valor = membro.name if membro.name in rotulos else membro.value
+        return f"CAST('{valor}' AS \"{udt}\")"
+
+    return rotulo
+
+
+def _executar(conn, descricao: str, sql: str, **params) -> int:
+    inicio = time.perf_counter()
+    linhas = conn.execute(text(sql), params).rowcount
+    print(f"{descricao}: {linhas} linhas em {time.perf_counter() - inicio:.1f}s", flush=True)
+    return linhas
+
+
+def _referencias(meses: int) -> list[str]:
+    hoje = date.today()
+    refs = []
+    ano, mes = hoje.year, hoje.month
+    for _ in range(meses):
+        refs.append(f"{mes:02d}/{ano}")
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+    return refs
+
+
+def seed(engine, *, rachas: int, atletas_por_racha: int, jogos_por_racha: int, meses: int, senha: str) -> dict:
+    Base.metadata.create_all(bind=engine)
+    ensure_schema_compatibility(engine)
+    total_atletas = rachas * atletas_por_racha
+    senha_hash = hash_password(senha)
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM rachas WHERE descricao = :m LIMIT 1"), {"m": MARCADOR}).first():
+            print("Dados de benchmark já presentes; nada a fazer.")
+            return {"seeded": False}
+
+        role = _enum(conn, "users", "role")
+        tipo = _enum(conn, "rachas", "tipo")
+        posicao = _enum(conn, "atletas", "posicao")
+        presenca = _enum(conn, "presencas", "status")
+        pag_tipo = _enum(conn, "pagamentos", "tipo")
+        pag_status = _enum(conn, "pagamentos", "status")
+        posicoes = list(Posicao)
+
+        contagens = {}
+        contagens["users"] = _executar(conn, "users", f"""
+            INSERT INTO users (nome, email, senha_hash, role, ativo, subscription_status)
+            SELECT 'Bench ' || g, 'bench-' || g || '@bench.local', :senha_hash,
+                   CASE WHEN (g - 1) % :apr = 0 THEN {role(UserRole.ADMIN)} ELSE {role(UserRole.ATLETA)} END,
+                   TRUE, CASE WHEN (g - 1) % :apr = 0 THEN 'active' END
+            FROM generate_series(1, :n) AS g
+        """, senha_hash=senha_hash, apr=atletas_por_racha, n=total_atletas)
+
+        contagens["rachas"] = _executar(conn, "rachas", f"""
+            INSERT INTO rachas (nome, tipo, descricao, max_atletas, valor_mensalidade,
+                                valor_cartao_amarelo, valor_cartao_vermelho, escalacao_size, ativo)
+            SELECT 'Bench ' || r, {tipo(TipoRacha.SOCIETY)}, :marcador, :apr + 10, 5000, 1000, 2000, 6, TRUE
+            FROM generate_series(1, :rachas) AS r
+        """, marcador=MARCADOR, apr=atletas_por_racha, rachas=rachas)
+
+        contagens["racha_admins"] = _executar(conn, "racha_admins", """
+            INSERT INTO racha_admins (racha_id, user_id, is_owner, ativo)
+            SELECT r.id, u.id, TRUE, TRUE
+            FROM rachas r
+            JOIN users u ON u.email = 'bench-' || ((substr(r.nome, 7)::int - 1) * :apr + 1) || '@bench.local'
+            WHERE r.descricao = :marcador
+        """, apr=atletas_por_racha, marcador=MARCADOR)
+
+        posicao_case = " ".join(
+            f"WHEN {i} THEN {posicao(p)}" for i, p in enumerate(posicoes)
+        )
+        contagens["atletas"] = _executar(conn, "atletas", f"""
+            INSERT INTO atletas (user_id, racha_id, nome, apelido, posicao, numero_camisa, ativo)
+            SELECT u.id, r.id, 'Atleta ' || g, 'A' || g,
+                   CASE ((g - 1) % :apr) % {len(posicoes)} {posicao_case} END,
+                   (g - 1) % :apr + 1, TRUE
+            FROM generate_series(1, :n) AS g
+            JOIN users u ON u.email = 'bench-' || g || '@bench.local'
+            JOIN rachas r ON r.descricao = :marcador AND r.nome = 'Bench ' || ((g - 1) / :apr + 1)
+        """, apr=atletas_por_racha, n=total_atletas, marcador=MARCADOR)
+
+        contagens["jogos"] = _executar(conn, "jogos", """
+            INSERT INTO jogos (racha_id, data_hora, local, valor_campo, finalizado, cancelado)
+            SELECT r.id,
+                   date_trunc('week', now()::timestamp) + interval '3 days 20 hours'
+                       + (k - :passados) * interval '7 days',
+                   'Campo ' || (r.id % 50), 20000, k < :passados, FALSE
+            FROM rachas r
+            CROSS JOIN generate_series(0, :jogos - 1) AS k
+            WHERE r.descricao = :marcador
+        """, passados=max(0, jogos_por_racha - JOGOS_FUTUROS), jogos=jogos_por_racha, marcador=MARCADOR)
+
+        contagens["presencas"] = _executar(conn, "presencas", f"""
+            INSERT INTO presencas (jogo_id, atleta_id, status)
+            SELECT j.id, a.id,
+                   CASE
+                       WHEN (a.id * 7 + j.id * 13) % 10 < CASE WHEN j.finalizado THEN 6 ELSE 4 END
+                           THEN {presenca(StatusPresenca.CONFIRMADO)}
+                       WHEN (a.id * 7 + j.id * 13) % 10 < CASE WHEN j.finalizado THEN 8 ELSE 6 END
+                           THEN {presenca(StatusPresenca.RECUSADO)}
+                       ELSE {presenca(StatusPresenca.PENDENTE)}
+                   END
+            FROM jogos j
+            JOIN rachas r ON r.id = j.racha_id AND r.descricao = :marcador
+            JOIN atletas a ON a.racha_id = j.racha_id
+        """, marcador=MARCADOR)
+
+        contagens["pagamentos"] = _executar(conn, "pagamentos", f"""
+            INSERT INTO pagamentos (atleta_id, tipo, valor, descricao, referencia, status)
+            SELECT a.id, {pag_tipo(TipoPagamento.MENSALIDADE)}, 5000, 'Mensalidade ' || ref.referencia,
+                   ref.referencia,
+                   CASE WHEN ref.ordem > 1 AND (a.id + ref.ordem) % 5 <> 0
+                        THEN {pag_status(StatusPagamento.APROVADO)}
+                        ELSE {pag_status(StatusPagamento.PENDENTE)} END
+            FROM atletas a
+            JOIN rachas r ON r.id = a.racha_id AND r.descricao = :marcador
+            CROSS JOIN unnest(CAST(:refs AS text[])) WITH ORDINALITY AS ref(referencia, ordem)
+        """, marcador=MARCADOR, refs=_referencias(meses))
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    return {"seeded": True, **contagens}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rachas", type=int, default=5000)
+    parser.add_argument("--atletas-por-racha", type=int, default=30)
+    parser.add_argument("--jogos-por-racha", type=int, default=14)
+    parser.add_argument("--meses", type=int, default=3)
+    parser.add_argument("--senha", default=SENHA_PADRAO)
+    args = parser.parse_args()
+
+    engine = create_engine(get_settings().database_url)
+    try:
+        resultado = seed(
+            engine,
+            rachas=args.rachas,
+            atletas_por_racha=args.atletas_por_racha,
+            jogos_por_racha=args.jogos_por_racha,
+            meses=args.meses,
+            senha=args.senha,
+        )
+    finally:
+        engine.dispose()
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Teste de carga ponta a ponta com o tráfego de um dia de jogo.
+
+Dispara, contra uma API em execução, uma mistura ponderada das rotas mais
+usadas no dia do jogo, com ``--concurrency`` usuários virtuais durante
+``--duration`` segundos:
+
+    login, listar_rachas, listar_jogos, obter_lista_presenca,
+    confirmar_presenca, listar_pagamentos
+
+Cada usuário virtual é um atleta criado pelo ``benchmarks.load_seed`` ou pelo
+``benchmarks.datagen`` (``bench-<n>@bench.local``), escolhido de forma
+determinística por ``--seed``.
+Antes da medição cada um faz login e descobre seu racha, seus jogos futuros e
+seu ``atleta_id``; os primeiros ``--warmup`` segundos não entram no resultado.
+
+O relatório (vazão e p50/p95/p99 por rota) vai para ``--output`` em JSON, com
+o commit atual. ``--compare base.json`` compara com uma rodada anterior e sai
+com código 1 se o p95 de alguma rota piorar mais que ``--max-regression`` %.
+
+Uso (a partir de ``backend/``, com a API no ar e o banco populado):
+
+    python -m benchmarks.load_seed
+    uvicorn app.main:app --workers 4 &
+    python -m benchmarks.load_test --base-url http://localhost:8000 \\
+        --concurrency 100 --duration 60 --output resultados/atual.json --compare resultados/base.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from benchmarks.load_seed import SENHA_PADRAO, email_bench
+from benchmarks.stats import summarize_ms
+
+API = "/api/v1"
+
+MIX_PADRAO = {
+    "login": 5,
+    "listar_rachas": 20,
+    "listar_jogos": 20,
+    "obter_lista_presenca": 35,
+    "confirmar_presenca": 10,
+    "listar_pagamentos": 10,
+}
+
+
+@dataclass
+class UsuarioVirtual:
+    email: str
+    token: Optional[str] = None
+    user_id: Optional[int] = None
+    racha_id: Optional[int] = None
+    atleta_id: Optional[int] = None
+    jogo_ids: list[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class Medicoes:
+    latencias: dict[str, list[float]] = field(default_factory=dict)
+    erros: dict[str, int] = field(default_factory=dict)
+    status: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def registrar(self, rota: str, segundos: float, status: str, ok: bool) -> None:
+        self.latencias.setdefault(rota, []).append(segundos)
+        por_status = self.status.setdefault(rota, {})
+        por_status[status] = por_status.get(status, 0) + 1
+        if not ok:
+            self.erros[rota] = self.erros.get(rota, 0) + 1
+
+
+def parse_mix(texto: Optional[str]) -> dict[str, int]:
+    if not texto:
+        return dict(MIX_PADRAO)
+    mix = {}
+    for parte in texto.split(","):
+        rota, _, peso = parte.partition("=")
+        rota = rota.strip()
+        if rota not in MIX_PADRAO:
+            raise SystemExit(f"Rota desconhecida no --mix: {rota}")
+        mix[rota] = int(peso)
+    return mix
+
+
+async def _login(client: httpx.AsyncClient, usuario: UsuarioVirtual, senha: str) -> httpx.Response:
+    response = await client.post(f"{API}/auth/login", json={"identificador": usuario.email, "senha": senha})
+    if response.status_code == 200:
+        corpo = response.json()
+        usuario.token = corpo["access_token"]
+        usuario.user_id = corpo["user"]["id"]
+    return response
+
+
+async def preparar(client: httpx.AsyncClient, usuario: UsuarioVirtual, senha: str) -> bool:
+    """Login e descoberta de racha, jogos futuros e ``atleta_id`` do usuário."""
+    if (await _login(client, usuario, senha)).status_code != 200:
+        return False
+    rachas = (await client.get(f"{API}/rachas/", headers=usuario.headers)).json()
+    if not rachas:
+        return False
+    usuario.racha_id = rachas[0]["id"]
+    jogos = (await client.get(f"{API}/jogos/", params={"racha_id": usuario.racha_id}, headers=usuario.headers)).json()
+    usuario.jogo_ids = [jogo["id"] for jogo in jogos]
+    if usuario.jogo_ids:
+        lista = (await client.get(f"{API}/jogos/{usuario.jogo_ids[0]}/lista", headers=usuario.headers)).json()
+        for grupo in ("confirmados", "pendentes", "recusados"):
+            for item in lista.get(grupo, []):
+                if item.get("user_id") == usuario.user_id:
+                    usuario.atleta_id = item["atleta_id"]
+    return bool(usuario.jogo_ids) and usuario.atleta_id is not None
+
+
+async def executar(client: httpx.AsyncClient, rota: str, usuario: UsuarioVirtual, rng: random.Random, senha: str) -> httpx.Response:
+    if rota == "login":
+        return await _login(client, usuario, senha)
+    if rota == "listar_rachas":
+        return await client.get(f"{API}/rachas/", headers=usuario.headers)
+    if rota == "listar_jogos":
+        return await client.get(f"{API}/jogos/", params={"racha_id": usuario.racha_id}, headers=usuario.headers)
+    jogo_id = rng.choice(usuario.jogo_ids)
+    if rota == "obter_lista_presenca":
+        return await client.get(f"{API}/jogos/{jogo_id}/lista", headers=usuario.headers)
+    if rota == "confirmar_presenca":
+        return await client.post(f"{API}/presencas/confirmar/{jogo_id}/{usuario.atleta_id}", headers=usuario.headers)
+    if rota == "listar_pagamentos":
+        return await client.get(f"{API}/pagamentos/", params={"racha_id": usuario.racha_id}, headers=usuario.headers)
+    raise ValueError(rota)
+
+
+async def rodar(args) -> dict:
+    mix = parse_mix(args.mix)
+    rotas, pesos = list(mix), list(mix.values())
+    rng_usuarios = random.Random(args.seed)
+    numeros = rng_usuarios.sample(range(1, args.total_usuarios + 1), min(args.concurrency, args.total_usuarios))
+    usuarios = [UsuarioVirtual(email=email_bench(n)) for n in numeros]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        preparados = await asyncio.gather(*(preparar(client, u, args.senha) for u in usuarios))
+        usuarios = [u for u, ok in zip(usuarios, preparados) if ok]
+        if not usuarios:
+            raise SystemExit("Nenhum usuário virtual pôde ser preparado; rode benchmarks.load_seed antes.")
+        print(f"{len(usuarios)} usuários virtuais prontos", file=sys.stderr)
+
+        medicoes = Medicoes()
+        inicio = time.perf_counter()
+        inicio_medicao = inicio + args.warmup
+        fim = inicio_medicao + args.duration
+
+        async def usuario_virtual(indice: int, usuario: UsuarioVirtual):
+            rng = random.Random(args.seed * 1_000_003 + indice)
+            while (agora := time.perf_counter()) < fim:
+                rota = rng.choices(rotas, pesos)[0]
+                t0 = time.perf_counter()
+                try:
+                    response = await executar(client, rota, usuario, rng, args.senha)
+                    status, ok = str(response.status_code), response.status_code < 400
+                except httpx.HTTPError as exc:
+                    status, ok = type(exc).__name__, False
+                if agora >= inicio_medicao:
+                    medicoes.registrar(rota, time.perf_counter() - t0, status, ok)
+
+        await asyncio.gather(*(usuario_virtual(i, u) for i, u in enumerate(usuarios)))
+        duracao = min(time.perf_counter(), fim) - inicio_medicao
+
+    return relatorio(args, mix, medicoes, duracao, len(usuarios))
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def relatorio(args, mix: dict, medicoes: Medicoes, duracao: float, usuarios: int) -> dict:
+    rotas = {}
+    for rota, latencias in sorted(medicoes.latencias.items()):
+        rotas[rota] = {
+            "requests": len(latencias),
+            "errors": medicoes.erros.get(rota, 0),
+            "throughput_rps": round(len(latencias) / duracao, 2) if duracao > 0 else 0.0,
+            "status": medicoes.status.get(rota, {}),
+            **summarize_ms(latencias),
+        }
+    todas = [lat for latencias in medicoes.latencias.values() for lat in latencias]
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "virtual_users": usuarios,
+            "duration_s": round(duracao, 2),
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+        },
+        "total": {
+            "requests": len(todas),
+            "errors": sum(medicoes.erros.values()),
+            "throughput_rps": round(len(todas) / duracao, 2) if duracao > 0 else 0.0,
+            **summarize_ms(todas),
+        },
+        "routes": rotas,
+    }
+
+
+def comparar(atual: dict, base: dict, max_regressao: float) -> tuple[list[dict], bool]:
+    """Variação de p95 e vazão por rota; ``regrediu`` se algum p95 piorou além do limite."""
+    linhas, regrediu = [], False
+    for rota, dados in atual["routes"].items():
+        anterior = base.get("routes", {}).get(rota)
+        if not anterior or not anterior.get("p95"):
+            continue
+        delta_p95 = (dados["p95"] - anterior["p95"]) / anterior["p95"] * 100
+        delta_rps = (
+            (dados["throughput_rps"] - anterior["throughput_rps"]) / anterior["throughput_rps"] * 100
+            if anterior.get("throughput_rps") else 0.0
+        )
+        piorou = delta_p95 > max_regressao
+        regrediu = regrediu or piorou
+        linhas.append({
+            "route": rota,
+            "p95_base": anterior["p95"],
+            "p95": dados["p95"],
+            "p95_change_pct": round(delta_p95, 1),
+            "throughput_change_pct": round(delta_rps, 1),
+            "regression": piorou,
+        })
+    return linhas, regrediu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5.0, help="segundos iniciais descartados")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--mix", help="pesos por rota, ex.: obter_lista_presenca=50,listar_jogos=30,login=20")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--total-usuarios", type=int, default=150_000, help="usuários criados pelo load_seed")
+    parser.add_argument("--senha", default=SENHA_PADRAO)
+    parser.add_argument("--output", help="arquivo JSON com o relatório")
+    parser.add_argument("--compare", help="relatório JSON de uma rodada anterior")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="piora máxima aceita no p95, em %%")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(rodar(args))
+    saida = json.dumps(resultado, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida + "\n")
+    print(saida)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        linhas, regrediu = comparar(resultado, base, args.max_regression)
+        print(json.dumps({"base_commit": base.get("meta", {}).get("commit"), "comparison": linhas}, indent=2))
+        if regrediu:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Latência por chamada à Asaas: cliente novo por chamada x cliente compartilhado.
+
+Sobe um servidor stub local (HTTP/1.1 com keep-alive, TLS opcional) que
+responde como ``POST /customers`` da Asaas e mede ``--calls`` chamadas em dois
+modos:
+
+* ``per_call``: um ``httpx.AsyncClient`` por chamada, como o código antigo
+  (TCP + TLS a cada chamada);
+* ``shared``: ``asaas._request`` usando o cliente de ``app.http_clients``.
+
+``--rtt-ms`` simula a distância até a Asaas: cada resposta espera 1 RTT e cada
+conexão nova espera mais 1 RTT (TCP) ou 2 (TCP + TLS). O resultado traz as
+latências de cada modo e ``saved_ms_per_call`` (diferença de p50 e média).
+
+Uso (a partir de ``backend/``; não precisa de banco):
+
+    python -m benchmarks.outbound_http --calls 500 --rtt-ms 20 --tls
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.stats import summarize_ms
+
+RESPOSTA = json.dumps({"object": "customer", "id": "cus_000000000001"}).encode()
+
+
+class StubServer:
+    def __init__(self, rtt: float, tls_dir: str = "") -> None:
+        self.rtt = rtt
+        self.tls_dir = tls_dir
+        self.connections = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if self.tls_dir else "http"
+        port = self._server.sockets[0].getsockname()[1]
+        return f"{scheme}://127.0.0.1:{port}/v3"
+
+    def _ssl_context(self):
+        if not self.tls_dir:
+            return None
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(os.path.join(self.tls_dir, "cert.pem"), os.path.join(self.tls_dir, "key.pem"))
+        return context
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=self._ssl_context())
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.rtt * (2 if self.tls_dir else 1))
+        try:
+            while True:
+                cabecalho = await reader.readuntil(b"\r\n\r\n")
+                tamanho = 0
+                for linha in cabecalho.split(b"\r\n"):
+                    nome, _, valor = linha.partition(b":")
+                    if nome.strip().lower() == b"content-length":
+                        tamanho = int(valor)
+                if tamanho:
+                    await reader.readexactly(tamanho)
+                await asyncio.sleep(self.rtt)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(RESPOSTA)).encode() + b"\r\nConnection: keep-alive\r\n\r\n" + RESPOSTA
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _gerar_certificado(diretorio: str) -> None:
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", os.path.join(diretorio, "key.pem"), "-out", os.path.join(diretorio, "cert.pem"),
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+async def _medir(chamada, calls: int, concurrency: int) -> list[float]:
+    latencias: list[float] = []
+    fila = iter(range(calls))
+
+    async def worker():
+        for _ in fila:
+            inicio = time.perf_counter()
+            await chamada()
+            latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencias
+
+
+async def main_async(args) -> dict:
+    tls_dir = tempfile.mkdtemp() if args.tls else ""
+    if tls_dir:
+        _gerar_certificado(tls_dir)
+        # httpx lê SSL_CERT_FILE ao montar o contexto TLS (trust_env).
+        os.environ["SSL_CERT_FILE"] = os.path.join(tls_dir, "cert.pem")
+    servidor = StubServer(args.rtt_ms / 1000, tls_dir)
+    await servidor.start()
+
+    os.environ["ASAAS_BASE_URL"] = servidor.url
+    os.environ["ASAAS_API_KEY"] = "benchmark"
+    # Importados depois do ambiente: get_settings() é cacheado.
+    from app.config import get_settings
+    from app.http_clients import http_clients
+    from app.metrics import outbound_transport
+    from app.services import asaas
+
+    get_settings.cache_clear()
+    payload = {"name": "Benchmark", "cpfCnpj": "00000000000"}
+
+    async def per_call():
+        async with httpx.AsyncClient(timeout=20.0, transport=outbound_transport("asaas")) as client:
+            response = await client.post(f"{servidor.url}/customers", json=payload, headers={"access_token": "benchmark"})
+            response.json()
+
+    async def shared():
+        await asaas._request("POST", "/customers", json=payload)
+
+    resultados = {"calls": args.calls, "concurrency": args.concurrency, "rtt_ms": args.rtt_ms, "tls": args.tls}
+    latencias = {}
+    for nome, chamada in (("per_call", per_call), ("shared", shared)):
+        await _medir(chamada, args.concurrency, args.concurrency)  # aquecimento
+        conexoes_antes = servidor.connections
+        latencias[nome] = await _medir(chamada, args.calls, args.concurrency)
+        resultados[nome] = {**summarize_ms(latencias[nome]), "connections": servidor.connections - conexoes_antes}
+
+    resultados["saved_ms_per_call"] = {
+        "p50": round(resultados["per_call"]["p50"] - resultados["shared"]["p50"], 3),
+        "mean": round(resultados["per_call"]["mean"] - resultados["shared"]["mean"], 3),
+    }
+    await http_clients.aclose()
+    await servidor.stop()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="latência de rede simulada por ida e volta")
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS com um certificado autoassinado")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
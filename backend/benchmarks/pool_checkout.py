@@ -0,0 +1,90 @@
+"""Teste de carga do pool de conexões: latência de checkout com N requisições simultâneas.
+
+Simula o padrão de uma requisição da API (pega conexão, roda uma query curta,
+devolve) com ``--concurrency`` threads, usando o mesmo ``engine_options`` da app.
+
+Uso (a partir de ``backend/``, com um Postgres acessível em DATABASE_URL):
+
+    python -m benchmarks.pool_checkout --concurrency 200 --requests 4000
+    python -m benchmarks.pool_checkout --pool-size 20 --max-overflow 0 --hold-ms 10
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+from app.db_pool import engine_options, pool_status, sync_pool_metrics
+from benchmarks.stats import summarize_ms
+
+
+def run(concurrency: int, total_requests: int, hold_ms: float, overrides: dict) -> dict:
+    settings = get_settings().model_copy(update=overrides)
+    engine = create_engine(settings.database_url, **engine_options(settings))
+    sync_pool_metrics.reset()
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    hold_seconds = hold_ms / 1000
+
+    def one_request(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                checkout = time.perf_counter() - start
+                connection.execute(text("SELECT pg_sleep(:s)"), {"s": hold_seconds})
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(checkout)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+
+    result = {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "hold_ms": hold_ms,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "checkout_ms": summarize_ms(latencies),
+        "pool": pool_status(engine),
+    }
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hold-ms", type=float, default=5.0, help="tempo que cada requisição segura a conexão")
+    parser.add_argument("--pool-size", type=int)
+    parser.add_argument("--max-overflow", type=int)
+    parser.add_argument("--pool-timeout", type=float)
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.pool_size is not None:
+        overrides["db_pool_size"] = args.pool_size
+    if args.max_overflow is not None:
+        overrides["db_max_overflow"] = args.max_overflow
+    if args.pool_timeout is not None:
+        overrides["db_pool_timeout"] = args.pool_timeout
+
+    print(json.dumps(run(args.concurrency, args.requests, args.hold_ms, overrides), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compara a criação de jogos com lista de presença: caminho antigo (ORM) x em lote.
+
+Cria um racha descartável com ``--atletas`` atletas ativos e agenda
+``--semanas`` jogos semanais de duas formas:
+
+* ``legacy``: como o ``criar_jogo`` antigo — commit do jogo, SELECT dos atletas
+  e um ``db.add(Presenca)`` por atleta, com um segundo commit, jogo a jogo;
+* ``bulk``: um ``INSERT ... RETURNING`` com todos os jogos e um único
+  ``INSERT ... SELECT`` das presenças (``criar_jogos_recorrentes``).
+
+Os dados criados são apagados ao fim de cada rodada.
+
+Uso (a partir de ``backend/``, com um Postgres acessível em DATABASE_URL):
+
+    python -m benchmarks.roster_materialization --atletas 40 --semanas 52 --repeat 5
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, event, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.models import Atleta, Jogo, Presenca, Racha, StatusPresenca, TipoRacha
+from app.routers.jogos import _materializar_lista
+from benchmarks.stats import summarize_ms
+
+
+def _criar_racha(Session, atletas: int) -> int:
+    with Session() as db:
+        racha = Racha(nome="benchmark roster", tipo=TipoRacha.CAMPO)
+        db.add(racha)
+        db.flush()
+        db.execute(insert(Atleta), [{"racha_id": racha.id, "nome": f"Atleta {i}", "ativo": True} for i in range(atletas)])
+        db.commit()
+        return racha.id
+
+
+def _limpar(Session, racha_id: int, apagar_racha: bool = False) -> None:
+    with Session() as db:
+        jogo_ids = db.scalars(select(Jogo.id).where(Jogo.racha_id == racha_id)).all()
+        if jogo_ids:
+            db.execute(delete(Presenca).where(Presenca.jogo_id.in_(jogo_ids)))
+            db.execute(delete(Jogo).where(Jogo.id.in_(jogo_ids)))
+        if apagar_racha:
+            db.execute(delete(Atleta).where(Atleta.racha_id == racha_id))
+            db.execute(delete(Racha).where(Racha.id == racha_id))
+        db.commit()
+
+
+def legacy(Session, racha_id: int, semanas: int) -> None:
+    inicio = datetime.now() + timedelta(days=1)
+    for semana in range(semanas):
+        with Session() as db:
+            jogo = Jogo(racha_id=racha_id, data_hora=inicio + timedelta(weeks=semana))
+            db.add(jogo)
+            db.commit()
+            db.refresh(jogo)
+            atletas = db.query(Atleta).filter(Atleta.racha_id == racha_id, Atleta.ativo == True).all()  # noqa: E712
+            for atleta in atletas:
+                db.add(Presenca(jogo_id=jogo.id, atleta_id=atleta.id, status=StatusPresenca.PENDENTE))
+            db.commit()
+
+
+def bulk(Session, racha_id: int, semanas: int) -> None:
+    inicio = datetime.now() + timedelta(days=1)
+    rows = [
+        {"racha_id": racha_id, "data_hora": inicio + timedelta(weeks=semana), "finalizado": False, "cancelado": False}
+        for semana in range(semanas)
+    ]
+    with Session() as db:
+        jogo_ids = db.scalars(insert(Jogo).returning(Jogo.id), rows).all()
+        _materializar_lista(db, jogo_ids)
+        db.commit()
+
+
+def run(database_url: str, atletas: int, semanas: int, repeat: int) -> dict:
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _contar(*_):
+        nonlocal statements
+        statements += 1
+
+    racha_id = _criar_racha(Session, atletas)
+    result = {"atletas": atletas, "semanas": semanas, "repeat": repeat}
+    try:
+        for nome, fn in (("legacy", legacy), ("bulk", bulk)):
+            tempos: list[float] = []
+            for _ in range(repeat):
+                statements = 0
+                start = time.perf_counter()
+                fn(Session, racha_id, semanas)
+                tempos.append(time.perf_counter() - start)
+                executados = statements
+                _limpar(Session, racha_id)
+            result[nome] = {"statements": executados, "ms": summarize_ms(tempos)}
+    finally:
+        _limpar(Session, racha_id, apagar_racha=True)
+        engine.dispose()
+
+    if result["bulk"]["ms"]["mean"]:
+        result["speedup"] = round(result["legacy"]["ms"]["mean"] / result["bulk"]["ms"]["mean"], 1)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="padrão: DATABASE_URL das configurações")
+    parser.add_argument("--atletas", type=int, default=40)
+    parser.add_argument("--semanas", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = args.database_url or get_settings().database_url
+    print(json.dumps(run(database_url, args.atletas, args.semanas, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
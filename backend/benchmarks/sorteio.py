@@ -0,0 +1,63 @@
+"""Tempo do sorteio de times (``app.services.sorteio.sortear_times``).
+
+Gera ``--jogadores`` jogadores sintéticos (com ``--goleiros`` goleiros) e mede
+``--repeat`` sorteios em ``--times`` times, com seeds diferentes. Não usa banco.
+O alvo é ficar bem abaixo de 50 ms por sorteio com 40 jogadores e 4 times.
+
+Uso (a partir de ``backend/``):
+
+    python -m benchmarks.sorteio --jogadores 40 --times 4 --repeat 200
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app.models import Posicao
+from app.services.sorteio import Jogador, sortear_times
+from benchmarks.stats import summarize_ms
+
+LINHA = [p for p in Posicao if p is not Posicao.GOLEIRO]
+
+
+def _jogadores(total: int, goleiros: int, seed: int) -> list[Jogador]:
+    rng = random.Random(seed)
+    return [
+        Jogador(
+            atleta_id=i,
+            posicao=Posicao.GOLEIRO if i < goleiros else rng.choice(LINHA),
+            gols=rng.randint(0, 40),
+            assistencias=rng.randint(0, 25),
+        )
+        for i in range(total)
+    ]
+
+
+def run(jogadores: int, goleiros: int, times: int, escalacao_size: int, repeat: int) -> dict:
+    elenco = _jogadores(jogadores, goleiros, seed=7)
+    sortear_times(elenco, times, escalacao_size=escalacao_size)  # aquecimento (import do NumPy)
+    tempos: list[float] = []
+    for seed in range(repeat):
+        inicio = time.perf_counter()
+        sortear_times(elenco, times, escalacao_size=escalacao_size, seed=seed)
+        tempos.append(time.perf_counter() - inicio)
+    return {
+        "jogadores": jogadores, "times": times, "escalacao_size": escalacao_size, "repeat": repeat,
+        "ms": summarize_ms(tempos),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jogadores", type=int, default=40)
+    parser.add_argument("--goleiros", type=int, default=5)
+    parser.add_argument("--times", type=int, default=4)
+    parser.add_argument("--escalacao-size", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.jogadores, args.goleiros, args.times, args.escalacao_size, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
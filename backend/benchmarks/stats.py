@@ -0,0 +1,23 @@
+"""Helpers de estatística compartilhados pelos benchmarks."""
+
+import statistics
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (sem interpolação)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize_ms(latencies: list[float]) -> dict:
+    """Resumo de latências (em segundos) convertido para milissegundos."""
+    return {
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p95": round(percentile(latencies, 95) * 1000, 3),
+        "p99": round(percentile(latencies, 99) * 1000, 3),
+        "max": round(max(latencies, default=0.0) * 1000, 3),
+        "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+    }
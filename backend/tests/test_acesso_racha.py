@@ -0,0 +1,90 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.deps import verificar_acesso_racha, verificar_admin_racha
+from app.models import Atleta, Racha, RachaAdmin, TipoRacha, User, UserRole
+from app.services import acesso_racha
+
+
+class AcessoRachaTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(*args):
+            self.queries += 1
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=10, nome="Racha A", tipo=TipoRacha.SOCIETY),
+                Racha(id=20, nome="Racha B", tipo=TipoRacha.SOCIETY),
+            ])
+            db.flush()
+            db.add_all([
+                RachaAdmin(id=100, racha_id=10, user_id=1, ativo=True),
+                Atleta(id=200, racha_id=20, user_id=1, nome="Admin", ativo=True),
+            ])
+            db.commit()
+        acesso_racha._acessos_cache.clear()
+        self.queries = 0
+        self.user = SimpleNamespace(
+            id=1,
+            subscription_status="active",
+            created_at=datetime.now(timezone.utc),
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_all_roles_are_resolved_with_a_single_query(self):
+        with self.Session() as db:
+            admin = verificar_admin_racha(db, self.user, 10)
+            acesso = verificar_acesso_racha(db, self.user, 10)
+            atleta = verificar_acesso_racha(db, self.user, 20)
+
+        self.assertEqual(self.queries, 1)
+        self.assertEqual(admin.admin_id, 100)
+        self.assertIs(admin, acesso)
+        self.assertEqual(atleta.tipo, "atleta")
+        self.assertEqual(atleta.atleta_id, 200)
+
+    def test_later_requests_reuse_the_process_cache(self):
+        with self.Session() as db:
+            verificar_acesso_racha(db, self.user, 10)
+        with self.Session() as db:
+            verificar_acesso_racha(db, self.user, 20)
+
+        self.assertEqual(self.queries, 1)
+
+    def test_non_admin_and_unknown_racha_are_rejected(self):
+        with self.Session() as db:
+            with self.assertRaises(HTTPException) as ctx:
+                verificar_admin_racha(db, self.user, 20)
+            self.assertEqual(ctx.exception.status_code, 403)
+            with self.assertRaises(HTTPException):
+                verificar_acesso_racha(db, self.user, 30)
+
+    def test_deactivating_an_atleta_invalidates_the_cached_roles(self):
+        with self.Session() as db:
+            verificar_acesso_racha(db, self.user, 20)
+
+        with self.Session() as db:
+            atleta = db.get(Atleta, 200)
+            atleta.ativo = False
+            acesso_racha.invalidar_acessos(db, atleta.user_id)
+            db.commit()
+
+        with self.Session() as db:
+            with self.assertRaises(HTTPException):
+                verificar_acesso_racha(db, self.user, 20)
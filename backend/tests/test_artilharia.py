@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+
+from fastapi import Response
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, AtletaStat, Racha, RachaAdmin, TipoRacha, User, UserRole
+from app.routers.artilharia import listar_artilharia
+from app.services import acesso_racha
+
+
+class ListarArtilhariaTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.CAMPO),
+            ])
+            db.flush()
+            db.add(RachaAdmin(racha_id=1, user_id=1, ativo=True))
+            db.add_all([
+                Atleta(id=1, racha_id=1, nome="Bruno"),
+                Atleta(id=2, racha_id=1, nome="Ana"),
+                Atleta(id=3, racha_id=1, nome="Caio"),
+                Atleta(id=4, racha_id=1, nome="Davi"),
+                Atleta(id=5, racha_id=1, nome="Inativo", ativo=False),
+            ])
+            db.flush()
+            db.add_all([
+                AtletaStat(atleta_id=1, racha_id=1, gols=5, assistencias=1),
+                AtletaStat(atleta_id=3, racha_id=1, gols=5, assistencias=3),
+                AtletaStat(atleta_id=5, racha_id=1, gols=9, assistencias=9),
+            ])
+            db.commit()
+        acesso_racha._acessos_cache.clear()
+        self.user = SimpleNamespace(id=1)
+        self.statements.clear()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_ranks_in_sql_without_writing_missing_stats(self):
+        with self.Session() as db:
+            items = listar_artilharia(racha_id=1, response=Response(), limit=None, cursor=None, db=db, current_user=self.user)
+            stats = db.scalar(select(func.count(AtletaStat.id)))
+
+        self.assertEqual([i.nome for i in items], ["Caio", "Bruno", "Ana", "Davi"])
+        self.assertEqual((items[2].gols, items[2].assistencias), (0, 0))
+        self.assertEqual(stats, 3)
+        self.assertFalse([s for s in self.statements if s.startswith(("INSERT", "UPDATE"))])
+
+    def test_keyset_pages_follow_ranking(self):
+        nomes = []
+        cursor = None
+        with self.Session() as db:
+            while True:
+                response = Response()
+                page = listar_artilharia(racha_id=1, response=response, limit=3, cursor=cursor, db=db, current_user=self.user)
+                nomes.append([i.nome for i in page])
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+
+        self.assertEqual(nomes, [["Caio", "Bruno", "Ana"], ["Davi"]])
@@ -0,0 +1,142 @@
+import os
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.jobs.contadores_jogos import verificar_contadores
+from app.models import Atleta, Jogo, Presenca, Racha, StatusPresenca, TipoRacha
+
+# Postgres com o schema aplicado (``ensure_schema_compatibility`` cria os triggers).
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+
+
+class ContadoresJogosTests(unittest.TestCase):
+    def setUp(self):
+        # sqlite não tem o trigger de ``presencas``: os contadores ficam em zero
+        # e toda presença inserida aparece como divergência.
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        status = [StatusPresenca.CONFIRMADO] * 3 + [StatusPresenca.TALVEZ, StatusPresenca.PENDENTE, StatusPresenca.RECUSADO]
+        with self.Session() as db:
+            db.add_all([Racha(id=1, nome="A", tipo=TipoRacha.CAMPO), Racha(id=2, nome="B", tipo=TipoRacha.CAMPO)])
+            db.flush()
+            db.add_all([Atleta(id=i, racha_id=1, nome=f"Atleta {i}") for i in range(1, len(status) + 1)])
+            db.add_all([
+                Jogo(id=10, racha_id=1, data_hora=datetime(2026, 11, 4, 20)),
+                Jogo(id=11, racha_id=1, data_hora=datetime(2026, 11, 11, 20)),
+                Jogo(id=20, racha_id=2, data_hora=datetime(2026, 11, 4, 20)),
+            ])
+            db.flush()
+            db.add_all([Presenca(jogo_id=10, atleta_id=i, status=s) for i, s in enumerate(status, start=1)])
+            db.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_reports_drift_without_writing(self):
+        with self.Session() as db:
+            relatorio = verificar_contadores(db)
+
+            self.assertEqual(relatorio["verificados"], 3)
+            self.assertEqual(relatorio["divergentes"], 1)
+            self.assertEqual(relatorio["corrigidos"], 0)
+            self.assertEqual(relatorio["jogos"][0]["jogo_id"], 10)
+            self.assertEqual(
+                relatorio["jogos"][0]["real"],
+                {"total_confirmados": 3, "total_pendentes": 2, "total_recusados": 1},
+            )
+            self.assertEqual(db.get(Jogo, 10).total_confirmados, 0)
+
+    def test_repairs_counters_and_then_reports_clean(self):
+        with self.Session() as db:
+            self.assertEqual(verificar_contadores(db, racha_id=1, corrigir=True)["corrigidos"], 1)
+
+        with self.Session() as db:
+            jogo = db.get(Jogo, 10)
+            self.assertEqual((jogo.total_confirmados, jogo.total_pendentes, jogo.total_recusados), (3, 2, 1))
+            self.assertEqual(verificar_contadores(db)["divergentes"], 0)
+
+    def test_racha_filter_limits_scope(self):
+        with self.Session() as db:
+            relatorio = verificar_contadores(db, racha_id=2)
+
+        self.assertEqual(relatorio["verificados"], 1)
+        self.assertEqual(relatorio["divergentes"], 0)
+
+
+@unittest.skipUnless(BENCHMARK_DATABASE_URL, "BENCHMARK_DATABASE_URL não configurada")
+class PresencaTriggerTests(unittest.TestCase):
+    """Os triggers de ``presencas`` no Postgres; tudo roda numa transação desfeita no fim."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(BENCHMARK_DATABASE_URL)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def setUp(self):
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        self.db = Session(bind=self.connection, join_transaction_mode="create_savepoint")
+        racha = Racha(nome="teste contadores", tipo=TipoRacha.CAMPO)
+        self.db.add(racha)
+        self.db.flush()
+        self.atletas = [Atleta(racha_id=racha.id, nome=f"Atleta {i}") for i in range(5)]
+        self.jogos = [Jogo(racha_id=racha.id, data_hora=datetime(2026, 11, 4 + 7 * i, 20)) for i in range(2)]
+        self.db.add_all(self.atletas + self.jogos)
+        self.db.flush()
+        self.racha_id = racha.id
+
+    def tearDown(self):
+        self.db.close()
+        self.transaction.rollback()
+        self.connection.close()
+
+    def _contadores(self, jogo):
+        return tuple(self.db.execute(
+            select(Jogo.total_confirmados, Jogo.total_pendentes, Jogo.total_recusados).where(Jogo.id == jogo.id)
+        ).one())
+
+    def _assert_sem_divergencia(self):
+        self.assertEqual(verificar_contadores(self.db, racha_id=self.racha_id)["divergentes"], 0)
+
+    def test_insert_update_and_delete_keep_the_counters(self):
+        jogo, outro = self.jogos
+        status = [StatusPresenca.CONFIRMADO, StatusPresenca.CONFIRMADO, StatusPresenca.TALVEZ,
+                  StatusPresenca.PENDENTE, StatusPresenca.RECUSADO]
+        # Um único INSERT com várias linhas, como a materialização da lista.
+        self.db.execute(insert(Presenca), [
+            {"jogo_id": jogo.id, "atleta_id": atleta.id, "status": s} for atleta, s in zip(self.atletas, status)
+        ] + [{"jogo_id": outro.id, "atleta_id": self.atletas[0].id, "status": StatusPresenca.CONFIRMADO}])
+        self.assertEqual(self._contadores(jogo), (2, 2, 1))
+        self.assertEqual(self._contadores(outro), (1, 0, 0))
+        self._assert_sem_divergencia()
+
+        self.db.execute(
+            update(Presenca)
+            .where(Presenca.jogo_id == jogo.id, Presenca.atleta_id.in_([self.atletas[0].id, self.atletas[3].id]))
+            .values(status=StatusPresenca.RECUSADO)
+        )
+        self.assertEqual(self._contadores(jogo), (1, 1, 3))
+        self._assert_sem_divergencia()
+
+        # Presença movida de um jogo para outro: os dois contadores mudam.
+        self.db.execute(
+            update(Presenca)
+            .where(Presenca.jogo_id == jogo.id, Presenca.atleta_id == self.atletas[1].id)
+            .values(jogo_id=outro.id)
+        )
+        self.assertEqual(self._contadores(jogo), (0, 1, 3))
+        self.assertEqual(self._contadores(outro), (2, 0, 0))
+
+        self.db.execute(delete(Presenca).where(Presenca.jogo_id == jogo.id, Presenca.status == StatusPresenca.RECUSADO))
+        self.assertEqual(self._contadores(jogo), (0, 1, 0))
+        self._assert_sem_divergencia()
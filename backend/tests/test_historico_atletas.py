@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.jobs.saldos import reconstruir_saldos
+from app.models import (
+    Atleta, Cartao, Jogo, Pagamento, Presenca, Racha, StatusPagamento, StatusPresenca, TipoCartao,
+    TipoPagamento, TipoRacha,
+)
+from app.routers.atletas import _consultar_historicos
+
+
+class HistoricoAtletasTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        referencia = datetime.utcnow().strftime("%m/%Y")
+
+        with self.Session() as db:
+            db.add(Racha(id=1, nome="A", tipo=TipoRacha.CAMPO))
+            db.flush()
+            db.add_all([
+                Atleta(id=1, racha_id=1, nome="Bruno"),
+                Atleta(id=2, racha_id=1, nome="Ana"),
+                Atleta(id=3, racha_id=1, nome="Inativo", ativo=False),
+            ])
+            db.add_all([Jogo(id=i, racha_id=1, data_hora=datetime(2026, 10, i)) for i in (1, 2, 3, 4)])
+            db.flush()
+            db.add_all([
+                Presenca(jogo_id=1, atleta_id=1, status=StatusPresenca.CONFIRMADO),
+                Presenca(jogo_id=2, atleta_id=1, status=StatusPresenca.CONFIRMADO),
+                Presenca(jogo_id=3, atleta_id=1, status=StatusPresenca.RECUSADO),
+                Presenca(jogo_id=4, atleta_id=1, status=StatusPresenca.PENDENTE),
+                Cartao(atleta_id=1, jogo_id=1, tipo=TipoCartao.AMARELO),
+                Cartao(atleta_id=1, jogo_id=2, tipo=TipoCartao.VERMELHO),
+                Cartao(atleta_id=1, jogo_id=3, tipo=TipoCartao.AMARELO),
+                Pagamento(atleta_id=1, tipo=TipoPagamento.MENSALIDADE, valor=5000, referencia=referencia,
+                          status=StatusPagamento.APROVADO),
+                Pagamento(atleta_id=1, tipo=TipoPagamento.MULTA_AMARELO, valor=1000, status=StatusPagamento.PENDENTE),
+            ])
+            db.commit()
+            reconstruir_saldos(db)
+
+        self.selects = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, *args):
+            if statement.startswith("SELECT"):
+                self.selects += 1
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_single_athlete_history_in_one_query(self):
+        with self.Session() as db:
+            (historico,) = _consultar_historicos(db, atleta_id=1)
+
+        self.assertEqual(self.selects, 1)
+        self.assertEqual(historico["presencas"], {"total_jogos": 4, "confirmados": 2, "taxa_presenca": "50.0%"})
+        self.assertEqual(historico["financeiro"]["total_pago"], 5000)
+        self.assertEqual(historico["financeiro"]["total_pendente"], 1000)
+        self.assertTrue(historico["financeiro"]["pagamento_confirmado_mes_atual"])
+        self.assertEqual(historico["cartoes"], {"amarelos": 2, "vermelhos": 1})
+
+    def test_racha_batch_covers_active_athletes_in_one_query(self):
+        with self.Session() as db:
+            historicos = _consultar_historicos(db, racha_id=1)
+
+        self.assertEqual(self.selects, 1)
+        self.assertEqual([h["atleta_id"] for h in historicos], [2, 1])
+        vazio = historicos[0]
+        self.assertEqual(vazio["presencas"], {"total_jogos": 0, "confirmados": 0, "taxa_presenca": "0%"})
+        self.assertEqual(vazio["financeiro"]["total_pago"], 0)
+        self.assertFalse(vazio["financeiro"]["pagamento_confirmado_mes_atual"])
+        self.assertEqual(vazio["cartoes"], {"amarelos": 0, "vermelhos": 0})
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+import httpx
+
+from app.http_clients import HttpClients, Integration, build_client
+
+
+def _integration(**kwargs):
+    return Integration("retentativas", timeout=1.0, backoff_seconds=0.0, **kwargs)
+
+
+class RetryTransportTests(unittest.TestCase):
+    def _chamar(self, integration, respostas, method="GET"):
+        chamadas = []
+
+        def responder(request):
+            chamadas.append(request.method)
+            resposta = respostas[min(len(chamadas), len(respostas)) - 1]
+            if isinstance(resposta, Exception):
+                raise resposta
+            return httpx.Response(resposta)
+
+        async def rodar():
+            async with build_client(integration, httpx.MockTransport(responder)) as client:
+                return await client.request(method, "https://api.example.com/x")
+
+        return asyncio.run(rodar()), chamadas
+
+    def test_idempotent_requests_are_retried_on_503(self):
+        response, chamadas = self._chamar(_integration(), [503, 200])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(chamadas), 2)
+
+    def test_post_is_not_retried_after_the_server_answered(self):
+        response, chamadas = self._chamar(_integration(), [503, 200], method="POST")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_connection_errors_are_retried_even_for_post(self):
+        erro = httpx.ConnectError("recusada")
+        response, chamadas = self._chamar(_integration(), [erro, 201], method="POST")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(chamadas), 2)
+
+    def test_exhausted_budget_stops_retries(self):
+        erro = httpx.ConnectError("recusada")
+        with self.assertRaises(httpx.ConnectError):
+            self._chamar(_integration(retry_min=0, retry_ratio=0.0), [erro, 200])
+
+    def test_max_retries_bounds_attempts(self):
+        response, chamadas = self._chamar(_integration(max_retries=2), [503])
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(chamadas), 3)
+
+
+class HttpClientsTests(unittest.TestCase):
+    def test_client_is_shared_within_a_loop_and_recreated_for_a_new_one(self):
+        clients = HttpClients({"retentativas": _integration()})
+
+        async def pegar_dois():
+            return clients.get("retentativas"), clients.get("retentativas")
+
+        primeiro, mesmo = asyncio.run(pegar_dois())
+        self.assertIs(primeiro, mesmo)
+
+        async def pegar_e_fechar():
+            client = clients.get("retentativas")
+            await clients.aclose()
+            return client
+
+        outro = asyncio.run(pegar_e_fechar())
+        self.assertIsNot(outro, primeiro)
+        self.assertTrue(outro.is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, Presenca, Racha, RachaAdmin, StatusPresenca, TipoRacha, User, UserRole
+from app.routers.jogos import criar_jogo, criar_jogos_recorrentes
+from app.schemas.jogo import JogoCreate, JogoRecorrenteCreate
+from app.services import acesso_racha
+
+
+class CriarJogoBulkTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.CAMPO),
+            ])
+            db.flush()
+            db.add(RachaAdmin(racha_id=1, user_id=1, ativo=True))
+            db.add_all([Atleta(racha_id=1, nome=f"Atleta {i}", ativo=True) for i in range(40)])
+            db.add(Atleta(racha_id=1, nome="Inativo", ativo=False))
+            db.commit()
+        acesso_racha._acessos_cache.clear()
+        self.user = SimpleNamespace(id=1, subscription_status="active", created_at=datetime.now(timezone.utc))
+        self.statements.clear()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _presencas(self, db):
+        return db.scalar(select(func.count(Presenca.id)).where(Presenca.status == StatusPresenca.PENDENTE))
+
+    def test_criar_jogo_builds_roster_with_one_insert(self):
+        with self.Session() as db:
+            jogo = criar_jogo(JogoCreate(racha_id=1, data_hora=datetime(2026, 11, 4, 20)), db=db, current_user=self.user)
+
+            presenca_inserts = [s for s in self.statements if s.startswith("INSERT INTO presencas")]
+            self.assertEqual(len(presenca_inserts), 1)
+            self.assertEqual(jogo.total_confirmados, 0)
+            self.assertEqual(self._presencas(db), 40)
+
+    def test_recurring_jogos_are_scheduled_weekly_with_rosters(self):
+        inicio = datetime(2026, 11, 4, 20)
+        payload = JogoRecorrenteCreate(racha_id=1, data_hora=inicio, semanas=52)
+
+        with self.Session() as db:
+            jogos = criar_jogos_recorrentes(payload, db=db, current_user=self.user)
+
+            self.assertEqual(len(jogos), 52)
+            self.assertEqual(jogos[0].data_hora, inicio)
+            self.assertEqual(jogos[-1].data_hora, inicio + timedelta(weeks=51))
+            self.assertEqual(self._presencas(db), 52 * 40)
+            self.assertEqual(len([s for s in self.statements if s.startswith("INSERT INTO presencas")]), 1)
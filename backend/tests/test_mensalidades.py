@@ -0,0 +1,66 @@
+import unittest
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, Pagamento, Racha, StatusPagamento, TipoPagamento, TipoRacha
+from app.services.mensalidades import gerar_mensalidades
+
+
+class GerarMensalidadesTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.inserts = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, *args):
+            if statement.startswith("INSERT INTO pagamentos"):
+                self.inserts += 1
+
+        with self.Session() as db:
+            db.add_all([
+                Racha(id=1, nome="A", tipo=TipoRacha.CAMPO, valor_mensalidade=5000),
+                Racha(id=2, nome="B", tipo=TipoRacha.CAMPO, valor_mensalidade=3000),
+                Racha(id=3, nome="Sem mensalidade", tipo=TipoRacha.CAMPO, valor_mensalidade=0),
+            ])
+            db.flush()
+            db.add_all([
+                Atleta(id=1, racha_id=1, nome="A1"),
+                Atleta(id=2, racha_id=1, nome="A2"),
+                Atleta(id=3, racha_id=1, nome="Inativo", ativo=False),
+                Atleta(id=4, racha_id=2, nome="B1"),
+                Atleta(id=5, racha_id=3, nome="C1"),
+            ])
+            db.flush()
+            db.add(Pagamento(atleta_id=1, tipo=TipoPagamento.MENSALIDADE, valor=5000, referencia="11/2026",
+                             status=StatusPagamento.APROVADO))
+            db.commit()
+        self.inserts = 0
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_batch_run_skips_existing_and_reports_per_racha(self):
+        with self.Session() as db:
+            por_racha = gerar_mensalidades(db, ["11/2026", "12/2026"])
+            db.commit()
+
+        self.assertEqual(por_racha, {1: 3, 2: 2})
+        self.assertEqual(self.inserts, 1)
+        with self.Session() as db:
+            novo = db.scalars(select(Pagamento).where(Pagamento.atleta_id == 4, Pagamento.referencia == "12/2026")).one()
+            self.assertEqual((novo.tipo, novo.valor, novo.status), (TipoPagamento.MENSALIDADE, 3000, StatusPagamento.PENDENTE))
+            self.assertEqual(novo.descricao, "Mensalidade 12/2026")
+
+    def test_rerun_is_idempotent_and_racha_filter_applies(self):
+        with self.Session() as db:
+            self.assertEqual(gerar_mensalidades(db, ["12/2026"], racha_ids=[2]), {2: 1})
+            self.assertEqual(gerar_mensalidades(db, ["12/2026"], racha_ids=[2]), {})
+            db.commit()
+            total = db.scalar(select(func.count(Pagamento.id)))
+
+        self.assertEqual(total, 2)
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import MetricsMiddleware, MetricsRegistry, http_requests, outbound_request_duration, outbound_transport
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_renders_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        requisicoes = registry.counter("reqs_total", "Requisições.", ("route",))
+        latencia = registry.histogram("lat_seconds", "Latência.", buckets=(0.1, 1.0))
+        requisicoes.inc(route='/a"b')
+        requisicoes.inc(2, route='/a"b')
+        latencia.observe(0.05)
+        latencia.observe(0.5)
+
+        texto = registry.render()
+
+        self.assertIn("# TYPE reqs_total counter\n", texto)
+        self.assertIn('reqs_total{route="/a\\"b"} 3\n', texto)
+        self.assertIn('lat_seconds_bucket{le="0.1"} 1\n', texto)
+        self.assertIn('lat_seconds_bucket{le="1"} 2\n', texto)
+        self.assertIn('lat_seconds_bucket{le="+Inf"} 2\n', texto)
+        self.assertIn("lat_seconds_count 2\n", texto)
+
+    def test_labels_must_match_declaration(self):
+        registry = MetricsRegistry()
+        with self.assertRaises(ValueError):
+            registry.counter("x_total", "X.", ("a",)).inc(b="1")
+
+    def test_multiprocess_directory_sums_workers_and_drops_stale_gauges(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            registry = MetricsRegistry()
+            registry.configure_multiprocess(diretorio, flush_interval=5.0)
+            registry.counter("reqs_total", "Requisições.").inc(2)
+            registry.gauge("em_andamento", "Em andamento.").set(1)
+            outro_worker = registry.snapshot()
+            outro_worker["pid"] = -1
+            for nome, written_at in (("recente", time.time()), ("antigo", time.time() - 60)):
+                with open(os.path.join(diretorio, f"{nome}.json"), "w") as arquivo:
+                    json.dump({**outro_worker, "written_at": written_at}, arquivo)
+
+            texto = registry.render()
+            arquivos = sorted(os.listdir(diretorio))
+
+        self.assertIn("reqs_total 6\n", texto)
+        self.assertIn("em_andamento 2\n", texto)
+        # A coleta não grava o snapshot deste worker.
+        self.assertEqual(arquivos, ["antigo.json", "recente.json"])
+
+    def test_flusher_thread_writes_the_worker_snapshot(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            registry = MetricsRegistry()
+            registry.configure_multiprocess(diretorio, flush_interval=60.0)
+            registry.counter("reqs_total", "Requisições.").inc()
+            registry.start_flusher()
+            registry.stop_flusher()
+
+            with open(os.path.join(diretorio, f"{os.getpid()}.json"), encoding="utf-8") as arquivo:
+                snapshot = json.load(arquivo)
+
+        self.assertEqual(snapshot["metrics"]["reqs_total"]["values"], [[[], 1.0]])
+
+
+class MetricsMiddlewareTests(unittest.TestCase):
+    def test_records_route_template_and_status(self):
+        app = FastAPI()
+
+        @app.get("/jogos/{jogo_id}")
+        def obter(jogo_id: int):
+            return {"id": jogo_id}
+
+        registry = MetricsRegistry()
+        global_antes = http_requests.snapshot()["values"]
+        client = TestClient(MetricsMiddleware(app, metrics=registry))
+        client.get("/jogos/1")
+        client.get("/jogos/2")
+        client.get("/nao-existe")
+
+        contagens = {tuple(k): v for k, v in registry.counter("http_requests_total", "").snapshot()["values"]}
+        self.assertEqual(contagens, {("GET", "/jogos/{jogo_id}", "200"): 2, ("GET", "<unmatched>", "404"): 1})
+        # O registro injetado é o único que recebe as medições.
+        self.assertEqual(http_requests.snapshot()["values"], global_antes)
+
+
+class OutboundTransportTests(unittest.TestCase):
+    def test_observes_status_and_transport_errors(self):
+        def responder(request):
+            if request.url.path == "/falha":
+                raise httpx.ConnectError("down", request=request)
+            return httpx.Response(201)
+
+        async def chamar():
+            transport = outbound_transport("teste", httpx.MockTransport(responder))
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.post("https://api.example.com/ok")
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get("https://api.example.com/falha")
+
+        asyncio.run(chamar())
+
+        valores = {tuple(k): v for k, v in outbound_request_duration.snapshot()["values"]}
+        self.assertEqual(valores[("teste", "POST", "201")][2], 1)
+        self.assertEqual(valores[("teste", "GET", "error")][2], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, Pagamento, Racha, RachaAdmin, StatusPagamento, TipoPagamento, TipoRacha, User, UserRole
+from app.routers.pagamentos import listar_pagamentos
+from app.services import acesso_racha
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+class CursorTests(unittest.TestCase):
+    def test_datetimes_round_trip(self):
+        momento = datetime(2026, 10, 18, 21, 30, 15, 123456)
+        self.assertEqual(decode_cursor(encode_cursor([momento, 7]), (datetime, int)), [momento, 7])
+        self.assertEqual(decode_cursor(encode_cursor([None, 7]), (Optional[datetime], int)), [None, 7])
+
+    def test_values_of_the_wrong_type_are_a_bad_request(self):
+        for valores, tipos in (
+            (["x", "y"], (int, int, str, int)),
+            ([1, 2, "Ana"], (int, int, str, int)),
+            ([True, 2], (int, int)),
+            (["ontem", 1], (datetime, int)),
+            ([None, 1], (datetime, int)),
+            ({"id": 1}, (int,)),
+        ):
+            with self.subTest(valores=valores), self.assertRaises(HTTPException) as ctx:
+                decode_cursor(encode_cursor(valores), tipos)
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+class ListarPagamentosCursorTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        base = datetime(2026, 10, 1, 12, 0)
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.CAMPO),
+            ])
+            db.flush()
+            db.add_all([RachaAdmin(racha_id=1, user_id=1, ativo=True), Atleta(id=1, racha_id=1, nome="Atleta")])
+            db.flush()
+            # Vários pagamentos com o mesmo created_at: o id desempata.
+            db.add_all([
+                Pagamento(atleta_id=1, tipo=TipoPagamento.MULTA_AMARELO, valor=1000, status=StatusPagamento.PENDENTE,
+                          created_at=base + timedelta(minutes=i // 3))
+                for i in range(11)
+            ])
+            db.flush()
+            # Pagamentos antigos, de antes do server_default, não têm created_at.
+            db.execute(update(Pagamento).where(Pagamento.id.in_([3, 7, 10])).values(created_at=None))
+            db.commit()
+        self.user = SimpleNamespace(id=1)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _listar(self, **kwargs):
+        acesso_racha._acessos_cache.clear()
+        response = Response()
+        with self.Session() as db:
+            pagina = listar_pagamentos(racha_id=1, response=response, db=db, current_user=self.user, **kwargs)
+        return [p.id for p in pagina], response.headers.get("X-Next-Cursor")
+
+    def test_cursor_pages_match_offset_order(self):
+        todos, proximo = self._listar(skip=0, limit=100)
+        self.assertIsNone(proximo)
+        self.assertEqual(len(todos), 11)
+        self.assertEqual(todos[-3:], [10, 7, 3])
+
+        for limite in (1, 4):
+            vistos, cursor = [], None
+            while True:
+                pagina, cursor = self._listar(skip=0, limit=limite, cursor=cursor)
+                vistos.extend(pagina)
+                if cursor is None:
+                    break
+            self.assertEqual(vistos, todos)
+
+    def test_offset_mode_still_works_and_returns_a_cursor(self):
+        todos, _ = self._listar(skip=0, limit=100)
+        pagina, cursor = self._listar(skip=4, limit=4)
+        self.assertEqual(pagina, todos[4:8])
+        seguinte, _ = self._listar(skip=0, limit=4, cursor=cursor)
+        self.assertEqual(seguinte, todos[8:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+
+from fastapi import HTTPException
+
+from app.services.password_hashing import (
+    PasswordHasher,
+    _hash,
+    _verify_and_update,
+    unusable_password,
+    verify_and_update_password,
+)
+
+
+class PasswordHashingTests(unittest.TestCase):
+    def test_hash_with_a_different_cost_is_rehashed_on_verify(self):
+        antigo = _hash("segredo", 4)
+
+        self.assertEqual(_verify_and_update("segredo", antigo, 4), (True, None))
+        ok, novo = _verify_and_update("segredo", antigo, 5)
+        self.assertTrue(ok)
+        self.assertTrue(novo.startswith("$2b$05$"))
+        self.assertEqual(_verify_and_update("errada", antigo, 5), (False, None))
+
+    def test_unusable_password_never_matches(self):
+        marcador = unusable_password()
+
+        self.assertNotEqual(marcador, unusable_password())
+        self.assertEqual(verify_and_update_password("", marcador), (False, None))
+        self.assertEqual(verify_and_update_password(marcador, marcador), (False, None))
+
+    def test_process_pool_hashes_and_rejects_when_saturated(self):
+        hasher = PasswordHasher(workers=1, queue_size=0)
+        try:
+            self.assertTrue(_verify_and_update("segredo", hasher.run(_hash, "segredo", 4), 4)[0])
+
+            ocupado = threading.Thread(target=hasher.run, args=(time.sleep, 0.5))
+            ocupado.start()
+            while hasher.stats()["in_flight"] == 0:
+                time.sleep(0.01)
+            with self.assertRaises(HTTPException) as ctx:
+                hasher.run(_hash, "segredo", 4)
+            ocupado.join()
+
+            self.assertEqual(ctx.exception.status_code, 503)
+            self.assertEqual(ctx.exception.headers, {"Retry-After": "1"})
+            self.assertEqual(hasher.stats()["rejected"], 1)
+            self.assertEqual(hasher.stats()["in_flight"], 0)
+
+            # Erros no processo filho não contam como concluídos.
+            with self.assertRaises(ValueError):
+                hasher.run(_verify_and_update, "segredo", "nao-e-um-hash", 4)
+            self.assertEqual(hasher.stats()["completed"], 2)
+        finally:
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.services import presenca_eventos
+from app.services.presenca_eventos import RESYNC, InProcessBroker, publicar_apos_commit
+
+
+class InProcessBrokerTests(unittest.TestCase):
+    def test_delivers_only_to_subscribers_of_the_jogo(self):
+        async def scenario():
+            broker = InProcessBroker()
+            jogo_1 = broker.subscribe(1)
+            jogo_2 = broker.subscribe(2)
+            broker.publish(1, {"tipo": "delta", "jogo_id": 1})
+            recebido = await jogo_1.proximo(timeout=1)
+            nada = await jogo_2.proximo(timeout=0.05)
+            jogo_1.close()
+            jogo_2.close()
+            return recebido, nada, broker.stats()
+
+        recebido, nada, stats = asyncio.run(scenario())
+        self.assertEqual(recebido, {"tipo": "delta", "jogo_id": 1})
+        self.assertIsNone(nada)
+        self.assertEqual(stats, {"jogos": 0, "assinaturas": 0})
+
+    def test_publish_from_worker_thread_reaches_event_loop(self):
+        async def scenario():
+            broker = InProcessBroker()
+            assinatura = broker.subscribe(7)
+            thread = threading.Thread(target=broker.publish, args=(7, {"tipo": "delta"}))
+            thread.start()
+            thread.join()
+            return await assinatura.proximo(timeout=1)
+
+        self.assertEqual(asyncio.run(scenario()), {"tipo": "delta"})
+
+    def test_slow_subscriber_gets_resync(self):
+        async def scenario():
+            broker = InProcessBroker(maxsize=2)
+            assinatura = broker.subscribe(1)
+            for i in range(5):
+                broker.publish(1, {"tipo": "delta", "n": i})
+            await asyncio.sleep(0)
+            return [await assinatura.proximo(timeout=0.05) for _ in range(3)]
+
+        self.assertEqual(asyncio.run(scenario()), [{"tipo": "delta", "n": 1}, RESYNC, None])
+
+
+class PublicarAposCommitTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.publicados = []
+        self.broker_original = presenca_eventos.get_broker()
+        broker = InProcessBroker()
+        broker.publish = lambda jogo_id, evento: self.publicados.append((jogo_id, evento))
+        presenca_eventos.set_broker(broker)
+
+    def tearDown(self):
+        presenca_eventos.set_broker(self.broker_original)
+        self.engine.dispose()
+
+    def test_publishes_only_after_commit(self):
+        item = {"atleta_id": 3, "status": "confirmado"}
+        with self.Session() as db:
+            publicar_apos_commit(db, 10, [item])
+            self.assertEqual(self.publicados, [])
+            db.commit()
+
+        self.assertEqual(self.publicados, [(10, {"tipo": "delta", "jogo_id": 10, "presencas": [item]})])
+
+    def test_rollback_discards_pending_events(self):
+        with self.Session() as db:
+            db.execute(text("SELECT 1"))
+            publicar_apos_commit(db, 10, [{"atleta_id": 3, "status": "recusado"}])
+            db.rollback()
+            db.commit()
+
+        self.assertEqual(self.publicados, [])
@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, Jogo, Presenca, Racha, RachaAdmin, StatusPresenca, TipoRacha, User, UserRole
+from app.routers.presencas import atualizar_presencas_em_lote
+from app.schemas.presenca import PresencaBulkUpdate
+from app.services import acesso_racha, presenca_eventos
+from app.services.presenca_eventos import InProcessBroker
+
+
+def _usuario(user_id):
+    return SimpleNamespace(id=user_id, subscription_status="active", created_at=datetime.now(timezone.utc))
+
+
+class AtualizarPresencasEmLoteTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                User(id=2, nome="Atleta", email="atleta@example.com", senha_hash="x", role=UserRole.ATLETA, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.CAMPO),
+                Racha(id=2, nome="Outro", tipo=TipoRacha.CAMPO),
+            ])
+            db.flush()
+            db.add(RachaAdmin(racha_id=1, user_id=1, ativo=True))
+            db.add_all([Atleta(id=i, racha_id=1, nome=f"Atleta {i}", ativo=True) for i in (1, 2)])
+            db.add_all([
+                Atleta(id=3, racha_id=1, user_id=2, nome="Atleta 3", ativo=True),
+                Atleta(id=9, racha_id=2, nome="Visitante", ativo=True),
+            ])
+            # sqlite não tem o trigger de ``presencas``: os totais devolvidos
+            # são os da linha do jogo, recarregada depois do commit.
+            db.add(Jogo(id=10, racha_id=1, data_hora=datetime(2026, 11, 4, 20), total_confirmados=4, total_pendentes=5,
+                        total_recusados=6))
+            db.flush()
+            db.add(Presenca(jogo_id=10, atleta_id=1, status=StatusPresenca.PENDENTE))
+            db.commit()
+        acesso_racha._acessos_cache.clear()
+
+        self.publicados = []
+        self.broker_original = presenca_eventos.get_broker()
+        broker = InProcessBroker()
+        broker.publish = lambda jogo_id, evento: self.publicados.append((jogo_id, evento))
+        presenca_eventos.set_broker(broker)
+        self.statements.clear()
+
+    def tearDown(self):
+        presenca_eventos.set_broker(self.broker_original)
+        self.engine.dispose()
+
+    def _status(self, db):
+        return dict(db.execute(select(Presenca.atleta_id, Presenca.status).where(Presenca.jogo_id == 10)).all())
+
+    def test_upserts_all_presencas_with_one_statement(self):
+        payload = PresencaBulkUpdate(jogo_id=10, presencas=[
+            {"atleta_id": 1, "status": "recusado"},
+            {"atleta_id": 2, "status": "confirmado"},
+            {"atleta_id": 3, "status": "talvez"},
+            {"atleta_id": 2, "status": "recusado"},
+        ])
+
+        with self.Session() as db:
+            resposta = atualizar_presencas_em_lote(payload, db=db, current_user=_usuario(1))
+            status = self._status(db)
+
+        self.assertEqual(len([s for s in self.statements if s.startswith("INSERT INTO presencas")]), 1)
+        # O atleta 2 veio duas vezes: vale o último status.
+        self.assertEqual(status, {1: StatusPresenca.RECUSADO, 2: StatusPresenca.RECUSADO, 3: StatusPresenca.TALVEZ})
+        self.assertEqual(resposta.atualizadas, 3)
+        self.assertEqual((resposta.total_confirmados, resposta.total_pendentes, resposta.total_recusados), (4, 5, 6))
+
+        self.assertEqual(len(self.publicados), 1)
+        jogo_id, evento = self.publicados[0]
+        self.assertEqual(jogo_id, 10)
+        self.assertEqual(
+            sorted((item["atleta_id"], item["status"]) for item in evento["presencas"]),
+            [(1, "recusado"), (2, "recusado"), (3, "talvez")],
+        )
+
+    def test_atletas_from_another_racha_are_rejected_without_writing(self):
+        payload = PresencaBulkUpdate(jogo_id=10, presencas=[
+            {"atleta_id": 1, "status": "confirmado"},
+            {"atleta_id": 9, "status": "confirmado"},
+        ])
+
+        with self.Session() as db:
+            with self.assertRaises(HTTPException) as ctx:
+                atualizar_presencas_em_lote(payload, db=db, current_user=_usuario(1))
+            db.rollback()
+            self.assertEqual(self._status(db), {1: StatusPresenca.PENDENTE})
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIn("9", ctx.exception.detail)
+        self.assertEqual(self.publicados, [])
+
+    def test_only_racha_admins_can_update_in_bulk(self):
+        payload = PresencaBulkUpdate(jogo_id=10, presencas=[{"atleta_id": 1, "status": "recusado"}])
+
+        with self.Session() as db:
+            with self.assertRaises(HTTPException) as ctx:
+                atualizar_presencas_em_lote(payload, db=db, current_user=_usuario(2))
+            self.assertEqual(self._status(db), {1: StatusPresenca.PENDENTE})
+
+        self.assertEqual(ctx.exception.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
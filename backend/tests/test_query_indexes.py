@@ -0,0 +1,118 @@
+import os
+import unittest
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import Base
+from app.models import (
+    Atleta, Cartao, Jogo, Pagamento, Presenca, StatusPagamento, StatusPresenca, TeamMember, TipoCartao, TipoPagamento,
+)
+from app.schema_compat import CONCURRENT_INDEXES
+
+# Postgres já populado pelo ``benchmarks.load_seed`` ou ``benchmarks.datagen``.
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+
+
+class ConcurrentIndexDeclarationTests(unittest.TestCase):
+    def test_schema_compat_indexes_match_the_models(self):
+        declarados = {
+            index.name: f"{table.name} ({', '.join(column.name for column in index.columns)})"
+            for table in Base.metadata.tables.values()
+            for index in table.indexes
+        }
+        for nome, alvo in CONCURRENT_INDEXES:
+            self.assertEqual(declarados.get(nome), alvo, nome)
+
+
+def _indices_do_plano(plano: dict) -> set[str]:
+    nomes = {plano["Index Name"]} if "Index Name" in plano else set()
+    for filho in plano.get("Plans", []):
+        nomes |= _indices_do_plano(filho)
+    return nomes
+
+
+@unittest.skipUnless(BENCHMARK_DATABASE_URL, "BENCHMARK_DATABASE_URL não configurada")
+class HotQueryPlanTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(BENCHMARK_DATABASE_URL)
+        with cls.engine.connect() as conn:
+            cls.racha_id, cls.jogo_id = conn.execute(text("SELECT racha_id, id FROM jogos ORDER BY id LIMIT 1")).one()
+            cls.atleta_id, cls.user_id = conn.execute(
+                text("SELECT id, user_id FROM atletas WHERE racha_id = :r AND user_id IS NOT NULL ORDER BY id LIMIT 1"),
+                {"r": cls.racha_id},
+            ).one()
+            cls.team_id = conn.execute(text("SELECT min(team_id) FROM team_members")).scalar()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def assertUsaIndice(self, query, indice: str):
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        with self.engine.connect() as conn:
+            plano = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+        self.assertIn(indice, _indices_do_plano(plano), sql)
+
+    def test_lista_de_presenca_por_status(self):
+        self.assertUsaIndice(
+            select(func.count(Presenca.id)).where(
+                Presenca.jogo_id == self.jogo_id, Presenca.status == StatusPresenca.CONFIRMADO,
+            ),
+            "ix_presencas_jogo_status",
+        )
+
+    def test_historico_de_presencas_do_atleta(self):
+        self.assertUsaIndice(select(Presenca).where(Presenca.atleta_id == self.atleta_id), "ix_presencas_atleta_id")
+
+    def test_elenco_ativo_do_racha(self):
+        self.assertUsaIndice(
+            select(Atleta.id).where(Atleta.racha_id == self.racha_id, Atleta.ativo.is_(True)),
+            "ix_atletas_racha_ativo",
+        )
+
+    def test_atletas_do_usuario(self):
+        self.assertUsaIndice(
+            select(Atleta).where(Atleta.user_id == self.user_id, Atleta.ativo.is_(True)),
+            "ix_atletas_user_racha",
+        )
+
+    def test_agenda_do_racha(self):
+        self.assertUsaIndice(
+            select(Jogo).where(Jogo.racha_id == self.racha_id, Jogo.cancelado.is_(False))
+            .order_by(Jogo.data_hora).limit(50),
+            "ix_jogos_racha_cancelado_data",
+        )
+
+    def test_multas_do_atleta(self):
+        self.assertUsaIndice(
+            select(Pagamento).where(
+                Pagamento.atleta_id == self.atleta_id, Pagamento.tipo == TipoPagamento.MULTA_AMARELO,
+            ),
+            "ix_pagamentos_atleta_tipo_ref",
+        )
+
+    def test_fila_de_pagamentos_por_status(self):
+        self.assertUsaIndice(
+            select(Pagamento).where(Pagamento.status == StatusPagamento.REJEITADO)
+            .order_by(Pagamento.created_at.desc()).limit(100),
+            "ix_pagamentos_status_created",
+        )
+
+    def test_membros_ativos_do_time(self):
+        self.assertUsaIndice(
+            select(TeamMember).where(TeamMember.team_id == self.team_id, TeamMember.ativo.is_(True)),
+            "ix_team_members_team_ativo",
+        )
+
+    def test_ultimo_cartao_do_atleta(self):
+        self.assertUsaIndice(
+            select(Cartao).where(Cartao.atleta_id == self.atleta_id, Cartao.tipo == TipoCartao.AMARELO)
+            .order_by(Cartao.created_at.desc()).limit(1),
+            "ix_cartoes_atleta_tipo_created",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
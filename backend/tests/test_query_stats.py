@@ -0,0 +1,72 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.query_stats import QueryStatsMiddleware, install_query_hooks, statement_shape
+
+
+class StatementShapeTests(unittest.TestCase):
+    def test_literals_placeholders_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            statement_shape("SELECT * FROM atletas\n WHERE id = %(id_1)s AND nome = 'x' AND racha_id IN (?, ?, ?) LIMIT 10"),
+            "SELECT * FROM atletas WHERE id = ? AND nome = ? AND racha_id IN (?) LIMIT ?",
+        )
+
+    def test_casts_are_kept(self):
+        self.assertEqual(statement_shape("SELECT tipo::text FROM rachas WHERE id = :id"), "SELECT tipo::text FROM rachas WHERE id = ?")
+
+
+class QueryStatsMiddlewareTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        install_query_hooks(self.engine)
+        install_query_hooks(self.engine)  # idempotente
+
+        app = FastAPI()
+
+        @app.get("/loop")
+        def loop():
+            with self.engine.connect() as conn:
+                for i in range(6):
+                    conn.execute(text("SELECT :i"), {"i": i})
+            return {}
+
+        @app.get("/uma")
+        async def uma():
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return {}
+
+        self.app = app
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _client(self, debug: bool) -> TestClient:
+        return TestClient(QueryStatsMiddleware(self.app, debug=debug, n_plus_one_threshold=5))
+
+    def test_debug_mode_reports_totals_and_n_plus_one_in_headers(self):
+        with self.assertLogs("app.query_stats", level="WARNING") as logs:
+            response = self._client(debug=True).get("/loop")
+
+        self.assertEqual(response.headers["x-db-query-count"], "6")
+        self.assertEqual(response.headers["x-db-n-plus-one"], "1")
+        self.assertEqual(response.headers["x-db-slowest-statement"], "SELECT ?")
+        self.assertGreaterEqual(float(response.headers["x-db-time-ms"]), float(response.headers["x-db-slowest-ms"]))
+        self.assertIn("6 execuções de SELECT ?", logs.output[0])
+
+    def test_production_mode_logs_instead_of_headers(self):
+        with self.assertLogs("app.query_stats", level="INFO") as logs:
+            response = self._client(debug=False).get("/uma")
+
+        self.assertNotIn("x-db-query-count", response.headers)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('"db_queries": 1', logs.output[0])
+        self.assertIn('"n_plus_one": []', logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
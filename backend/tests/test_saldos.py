@@ -0,0 +1,142 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.jobs.saldos import reconstruir_saldos, verificar_saldos
+from app.models import (
+    Atleta, Jogo, Pagamento, Racha, RachaAdmin, StatusPagamento, TipoCartao, TipoPagamento, TipoRacha, User, UserRole,
+)
+from app.routers.atletas import CartaoCreatePayload, CartaoRemovePayload, adicionar_cartao, remover_cartao
+from app.services import acesso_racha
+from app.services.saldos import totais_financeiros
+
+# Postgres com o schema aplicado (``ensure_schema_compatibility`` cria os triggers).
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+
+
+class SaldosTests(unittest.TestCase):
+    def setUp(self):
+        # Sem o trigger de ``pagamentos`` (só existe no Postgres), o livro
+        # começa vazio e só é preenchido pela reconstrução.
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        with self.Session() as db:
+            db.add_all([Racha(id=1, nome="A", tipo=TipoRacha.CAMPO), Racha(id=2, nome="B", tipo=TipoRacha.CAMPO)])
+            db.flush()
+            db.add_all([Atleta(id=1, racha_id=1, nome="A1"), Atleta(id=2, racha_id=1, nome="A2"), Atleta(id=3, racha_id=2, nome="B1")])
+            db.flush()
+            db.add_all([
+                Pagamento(atleta_id=1, tipo=TipoPagamento.MENSALIDADE, valor=5000, status=StatusPagamento.APROVADO),
+                Pagamento(atleta_id=1, tipo=TipoPagamento.MULTA_AMARELO, valor=1000, status=StatusPagamento.PENDENTE),
+                Pagamento(atleta_id=2, tipo=TipoPagamento.MENSALIDADE, valor=5000, status=StatusPagamento.AGUARDANDO_APROVACAO),
+                Pagamento(atleta_id=2, tipo=TipoPagamento.MENSALIDADE, valor=5000, status=StatusPagamento.APROVADO),
+                Pagamento(atleta_id=3, tipo=TipoPagamento.RATEIO, valor=700, status=StatusPagamento.REJEITADO),
+            ])
+            db.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_checker_reports_missing_ledger_rows(self):
+        with self.Session() as db:
+            relatorio = verificar_saldos(db, racha_id=1)
+
+        self.assertEqual(relatorio["divergentes"], 4)
+        self.assertIn(
+            {"atleta_id": 1, "tipo": "mensalidade", "status": "aprovado",
+             "gravado": {"quantidade": 0, "valor_total": 0}, "real": {"quantidade": 1, "valor_total": 5000}},
+            relatorio["divergencias"],
+        )
+
+    def test_rebuild_makes_ledger_consistent(self):
+        with self.Session() as db:
+            self.assertEqual(reconstruir_saldos(db), 5)
+
+        with self.Session() as db:
+            self.assertEqual(verificar_saldos(db)["divergentes"], 0)
+            self.assertEqual(totais_financeiros(db, racha_id=1), (10000, 6000))
+            self.assertEqual(totais_financeiros(db, atleta_id=2), (5000, 5000))
+            self.assertEqual(totais_financeiros(db, racha_id=2), (0, 0))
+
+    def test_rebuild_of_one_racha_keeps_the_others(self):
+        with self.Session() as db:
+            reconstruir_saldos(db)
+            db.query(Pagamento).filter(Pagamento.atleta_id == 3).update({"valor": 900})
+            db.commit()
+            reconstruir_saldos(db, racha_id=1)
+
+            self.assertEqual(verificar_saldos(db, racha_id=1)["divergentes"], 0)
+            self.assertEqual(verificar_saldos(db, racha_id=2)["divergentes"], 1)
+
+
+@unittest.skipUnless(BENCHMARK_DATABASE_URL, "BENCHMARK_DATABASE_URL não configurada")
+class PagamentoTriggerTests(unittest.TestCase):
+    """Os triggers de ``pagamentos`` no Postgres; tudo roda numa transação desfeita no fim."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(BENCHMARK_DATABASE_URL)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def setUp(self):
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        # As rotas fazem commit; aqui cada commit só libera um savepoint.
+        self.db = Session(bind=self.connection, join_transaction_mode="create_savepoint")
+        user = User(nome="Admin", email=f"saldos-{uuid.uuid4().hex}@example.com", senha_hash="x",
+                    role=UserRole.ADMIN, ativo=True)
+        racha = Racha(nome="teste saldos", tipo=TipoRacha.CAMPO, valor_cartao_amarelo=1000)
+        self.db.add_all([user, racha])
+        self.db.flush()
+        self.atleta = Atleta(racha_id=racha.id, nome="Atleta")
+        self.db.add_all([
+            self.atleta,
+            RachaAdmin(racha_id=racha.id, user_id=user.id, ativo=True),
+            Jogo(racha_id=racha.id, data_hora=datetime(2026, 11, 4, 20)),
+        ])
+        self.db.flush()
+        self.racha_id = racha.id
+        self.user = SimpleNamespace(id=user.id, subscription_status="active", created_at=datetime.now(timezone.utc))
+        acesso_racha._acessos_cache.clear()
+
+    def tearDown(self):
+        self.db.close()
+        self.transaction.rollback()
+        self.connection.close()
+        acesso_racha._acessos_cache.clear()
+
+    def assertLivro(self, recebido: int, pendente: int):
+        self.assertEqual(totais_financeiros(self.db, racha_id=self.racha_id), (recebido, pendente))
+        self.assertEqual(verificar_saldos(self.db, racha_id=self.racha_id)["divergentes"], 0)
+
+    def test_payment_and_card_writes_keep_the_ledger(self):
+        mensalidade = Pagamento(atleta_id=self.atleta.id, tipo=TipoPagamento.MENSALIDADE, valor=5000,
+                                status=StatusPagamento.PENDENTE)
+        self.db.add(mensalidade)
+        self.db.commit()
+        self.assertLivro(0, 5000)
+
+        adicionar_cartao(self.atleta.id, CartaoCreatePayload(tipo=TipoCartao.AMARELO), db=self.db, current_user=self.user)
+        self.assertLivro(0, 6000)
+
+        self.db.execute(update(Pagamento).where(Pagamento.id == mensalidade.id).values(status=StatusPagamento.APROVADO))
+        self.assertLivro(5000, 1000)
+
+        # Remove o cartão e a multa pendente que ele gerou.
+        remover_cartao(self.atleta.id, CartaoRemovePayload(tipo=TipoCartao.AMARELO), db=self.db, current_user=self.user)
+        self.assertLivro(5000, 0)
+
+        self.db.execute(delete(Pagamento).where(Pagamento.atleta_id == self.atleta.id))
+        self.assertLivro(0, 0)
@@ -0,0 +1,58 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.schema_compat import bootstrap_schema, ensure_concurrent_indexes, pending_concurrent_indexes, schema_fingerprint
+import app.models  # noqa: F401
+
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+
+
+def _metadata(*extra_columns):
+    metadata = MetaData()
+    Table("exemplo", metadata, Column("id", Integer, primary_key=True), Column("nome", String(50), index=True), *extra_columns)
+    return metadata
+
+
+class SchemaFingerprintTests(unittest.TestCase):
+    def test_fingerprint_is_stable_for_the_same_models(self):
+        self.assertEqual(schema_fingerprint(Base.metadata), schema_fingerprint(Base.metadata))
+        self.assertEqual(schema_fingerprint(_metadata()), schema_fingerprint(_metadata()))
+
+    def test_fingerprint_changes_when_a_model_changes(self):
+        self.assertNotEqual(
+            schema_fingerprint(_metadata()),
+            schema_fingerprint(_metadata(Column("apelido", String(50)))),
+        )
+
+    def test_non_postgres_databases_only_run_create_all(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        self.assertFalse(bootstrap_schema(engine, _metadata()))
+        self.assertEqual(inspect(engine).get_table_names(), ["exemplo"])
+
+
+@unittest.skipUnless(BENCHMARK_DATABASE_URL, "BENCHMARK_DATABASE_URL não configurada")
+class ConcurrentIndexStartupTests(unittest.TestCase):
+    def test_missing_index_is_rebuilt_even_when_the_fingerprint_is_current(self):
+        engine = create_engine(BENCHMARK_DATABASE_URL)
+        self.addCleanup(engine.dispose)
+        with patch("app.schema_compat.start_concurrent_index_build"):
+            bootstrap_schema(engine, Base.metadata)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("DROP INDEX IF EXISTS ix_presencas_atleta_id"))
+
+        with patch("app.schema_compat.start_concurrent_index_build") as build:
+            self.assertFalse(bootstrap_schema(engine, Base.metadata))
+        build.assert_called_once_with(engine)
+
+        self.assertTrue(ensure_concurrent_indexes(engine))
+        with engine.connect() as connection:
+            self.assertEqual(pending_concurrent_indexes(connection), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from app.models import TipoRacha
+from app.routers.rachas import _resolve_tipo_db_label, _table_columns, _table_exists
+from app.schema_catalog import SchemaCatalog, schema_catalog
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        sql = str(statement)
+        if "information_schema.columns" in sql:
+            return FakeResult([
+                ("rachas", "id", "int4"),
+                ("rachas", "nome", "varchar"),
+                ("rachas", "tipo", "tiporacha"),
+                ("atletas", "racha_id", "int4"),
+            ])
+        return FakeResult([("tiporacha", "CAMPO"), ("tiporacha", "SOCIETY"), ("tiporacha", "FUTSAL")])
+
+
+class SchemaCatalogTests(unittest.TestCase):
+    def test_catalog_is_loaded_lazily_once(self):
+        catalog = SchemaCatalog()
+        db = FakeConnection()
+
+        self.assertTrue(catalog.table_exists(db, "rachas"))
+        self.assertFalse(catalog.table_exists(db, "racha_admins"))
+        self.assertEqual(catalog.table_columns(db, "rachas"), {"id", "nome", "tipo"})
+        self.assertEqual(catalog.enum_labels(db, "rachas", "tipo"), ("CAMPO", "SOCIETY", "FUTSAL"))
+        self.assertEqual(catalog.enum_labels(db, "rachas", "nome"), ())
+        self.assertEqual(db.queries, 2)
+
+    def test_router_helpers_read_from_the_shared_catalog(self):
+        schema_catalog.refresh(FakeConnection())
+        db = FakeConnection()
+        try:
+            self.assertTrue(_table_exists(db, "atletas"))
+            self.assertEqual(_table_columns(db, "atletas"), {"racha_id"})
+            self.assertEqual(_resolve_tipo_db_label(db, TipoRacha.CAMPO), "CAMPO")
+            self.assertEqual(db.queries, 0)
+        finally:
+            schema_catalog.invalidate()
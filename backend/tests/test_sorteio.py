@@ -0,0 +1,140 @@
+import random
+import unittest
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import (
+    Atleta, AtletaStat, Jogo, Posicao, Presenca, Racha, RachaAdmin, StatusPresenca,
+    Team, TeamMember, TipoRacha, User, UserRole,
+)
+from app.routers.teams import listar_times, sortear_times_do_jogo
+from app.schemas.team import SorteioRequest
+from app.services import acesso_racha
+from app.services.sorteio import SETORES, Jogador, sortear_times
+
+LINHA = [p for p in Posicao if p is not Posicao.GOLEIRO]
+
+
+def _jogadores(total: int, goleiros: int, seed: int = 7) -> list[Jogador]:
+    rng = random.Random(seed)
+    return [
+        Jogador(
+            atleta_id=i,
+            posicao=Posicao.GOLEIRO if i < goleiros else rng.choice(LINHA),
+            gols=rng.randint(0, 40),
+            assistencias=rng.randint(0, 25),
+        )
+        for i in range(total)
+    ]
+
+
+class SortearTimesTests(unittest.TestCase):
+    def test_forty_players_into_four_balanced_teams(self):
+        jogadores = _jogadores(40, goleiros=5)
+        times = sortear_times(jogadores, 4, escalacao_size=8, seed=1)
+
+        self.assertEqual(sorted(len(t.escalados) for t in times), [10, 10, 10, 10])
+        self.assertEqual(sorted(e.jogador.atleta_id for t in times for e in t.escalados), list(range(40)))
+        media = sum(j.forca for j in jogadores) / 4
+        for t in times:
+            self.assertLess(abs(t.forca - media), 0.05 * media)
+            self.assertEqual(t.escalados[0].jogador.posicao, Posicao.GOLEIRO)
+            self.assertEqual(sum(e.jogador.posicao is Posicao.GOLEIRO and e.is_titular for e in t.escalados), 1)
+            self.assertEqual([e.ordem_banco for e in t.escalados if not e.is_titular], [1, 2])
+
+    def test_sectors_are_spread_evenly(self):
+        jogadores = _jogadores(23, goleiros=3, seed=11)
+        times = sortear_times(jogadores, 3, seed=5)
+
+        for setor in set(SETORES.values()):
+            contagens = [
+                sum(SETORES[e.jogador.posicao] == setor for e in t.escalados) for t in times
+            ]
+            self.assertLessEqual(max(contagens) - min(contagens), 1)
+
+    def test_same_seed_reproduces_the_draw(self):
+        jogadores = _jogadores(18, goleiros=2)
+        primeiro = sortear_times(jogadores, 2, seed=42)
+        segundo = sortear_times(jogadores, 2, seed=42)
+        self.assertEqual(primeiro, segundo)
+
+    def test_rejects_fewer_players_than_teams(self):
+        with self.assertRaises(ValueError):
+            sortear_times(_jogadores(1, goleiros=0), 2)
+
+
+class SortearTimesDoJogoTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.SOCIETY, escalacao_size=5),
+            ])
+            db.flush()
+            db.add(RachaAdmin(racha_id=1, user_id=1, ativo=True))
+            db.add(Jogo(id=1, racha_id=1, data_hora=datetime(2026, 11, 4, 20)))
+            antigo = Team(racha_id=1, nome="Antigo", ativo=True)
+            db.add(antigo)
+            for jogador in _jogadores(12, goleiros=2):
+                atleta = Atleta(racha_id=1, nome=f"Atleta {jogador.atleta_id}", posicao=jogador.posicao, ativo=True)
+                db.add(atleta)
+                db.flush()
+                db.add(AtletaStat(racha_id=1, atleta_id=atleta.id, gols=jogador.gols, assistencias=jogador.assistencias))
+                status = StatusPresenca.RECUSADO if jogador.atleta_id == 11 else StatusPresenca.CONFIRMADO
+                db.add(Presenca(jogo_id=1, atleta_id=atleta.id, status=status))
+                db.add(TeamMember(team_id=antigo.id, atleta_id=atleta.id, ativo=True))
+            db.commit()
+        acesso_racha._acessos_cache.clear()
+        self.user = SimpleNamespace(id=1, subscription_status="active", created_at=datetime.now(timezone.utc))
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_preview_does_not_persist(self):
+        with self.Session() as db:
+            resposta = sortear_times_do_jogo(SorteioRequest(jogo_id=1, seed=3), db=db, current_user=self.user)
+            self.assertFalse(resposta["salvo"])
+            self.assertEqual(len(resposta["times"]), 2)
+            self.assertEqual(sum(len(t["membros"]) for t in resposta["times"]), 11)
+            self.assertEqual(db.scalar(select(Team.id).where(Team.nome == "Time 1")), None)
+
+    def test_salvar_persists_members_in_bulk(self):
+        with self.Session() as db:
+            resposta = sortear_times_do_jogo(SorteioRequest(jogo_id=1, seed=3, salvar=True), db=db, current_user=self.user)
+
+        with self.Session() as db:
+            team_ids = [t["team_id"] for t in resposta["times"]]
+            membros = db.scalars(select(TeamMember).where(TeamMember.team_id.in_(team_ids), TeamMember.ativo.is_(True))).all()
+            self.assertEqual(sorted(Counter(m.team_id for m in membros).values()), [5, 6])
+            self.assertEqual(sum(not m.is_titular for m in membros), 1)
+            jogo = db.get(Jogo, 1)
+            self.assertEqual([jogo.time_a_id, jogo.time_b_id], team_ids)
+            self.assertEqual([jogo.time_a_nome, jogo.time_b_nome], ["Time 1", "Time 2"])
+            # O recusado continua no time antigo; os demais foram transferidos.
+            self.assertEqual(db.scalar(select(TeamMember.atleta_id).where(TeamMember.team_id == 1, TeamMember.ativo.is_(True))), 12)
+
+    def test_redraw_deactivates_the_emptied_teams(self):
+        for seed in (3, 4):
+            with self.Session() as db:
+                sortear_times_do_jogo(SorteioRequest(jogo_id=1, seed=seed, salvar=True), db=db, current_user=self.user)
+
+        with self.Session() as db:
+            times = listar_times(racha_id=1, db=db, current_user=self.user)
+
+        # Os 2 times do último sorteio + o antigo, que ainda tem o recusado.
+        self.assertEqual(sorted(t["nome"] for t in times), ["Antigo", "Time 1", "Time 2"])
+        self.assertEqual(sum(len(t["membros"]) for t in times), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
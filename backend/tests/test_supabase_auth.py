@@ -0,0 +1,129 @@
+import asyncio
+import base64
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from jose import jwt
+
+from app.services import supabase_auth
+from app.services.supabase_auth import JwksCache, get_supabase_user, remote_fallbacks
+
+SEGREDO = "segredo-de-teste-com-32-bytes-ok!"
+JWKS = {"keys": [{"kty": "oct", "kid": "k1", "alg": "HS256",
+                  "k": base64.urlsafe_b64encode(SEGREDO.encode()).decode().rstrip("=")}]}
+
+
+def _token(kid="k1", exp_em=600, email="a@example.com"):
+    claims = {"sub": "u1", "email": email, "aud": "authenticated", "exp": int(time.time()) + exp_em}
+    return jwt.encode(claims, SEGREDO, algorithm="HS256", headers={"kid": kid})
+
+
+def _fallbacks(reason):
+    valores = {tuple(k): v for k, v in remote_fallbacks.snapshot()["values"]}
+    return valores.get((reason,), 0)
+
+
+class SupabaseTokenCacheTests(unittest.TestCase):
+    def setUp(self):
+        supabase_auth._token_cache.clear()
+        supabase_auth._unknown_kids.clear()
+        supabase_auth._jwks.clear()
+
+    def test_verified_token_is_served_from_cache(self):
+        token = _token()
+        with patch.object(supabase_auth, "_fetch_jwks", AsyncMock(return_value=JWKS)) as fetch, \
+                patch.object(supabase_auth, "_get_user_via_supabase_api", AsyncMock()) as remoto:
+            primeiro = asyncio.run(get_supabase_user(token))
+            segundo = asyncio.run(get_supabase_user(token))
+
+        self.assertEqual(primeiro["email"], "a@example.com")
+        self.assertEqual(segundo, primeiro)
+        self.assertEqual(fetch.await_count, 1)
+        remoto.assert_not_awaited()
+
+    def test_unknown_kid_refreshes_once_then_is_negatively_cached(self):
+        antes = _fallbacks("unknown_kid")
+        agora = [0.0]
+        remoto = AsyncMock(return_value={"email": "b@example.com"})
+        with patch.object(supabase_auth, "_fetch_jwks", AsyncMock(return_value=JWKS)) as fetch, \
+                patch.object(supabase_auth, "_get_user_via_supabase_api", remoto), \
+                patch.object(supabase_auth._jwks, "_clock", lambda: agora[0]):
+            asyncio.run(get_supabase_user(_token(kid="k1")))
+            agora[0] = 100.0
+            asyncio.run(get_supabase_user(_token(kid="nova", email="b@example.com")))
+            asyncio.run(get_supabase_user(_token(kid="nova", exp_em=601, email="b@example.com")))
+
+        # 1 busca inicial + 1 renovação forçada pelo kid desconhecido; a chamada
+        # seguinte já encontra o kid no cache negativo.
+        self.assertEqual(fetch.await_count, 2)
+        self.assertEqual(remoto.await_count, 2)
+        self.assertEqual(_fallbacks("unknown_kid") - antes, 2)
+
+
+class JwksCacheTests(unittest.TestCase):
+    def test_concurrent_misses_share_a_single_fetch(self):
+        async def lento():
+            await asyncio.sleep(0.01)
+            return JWKS
+
+        cache = JwksCache(ttl=60, stale=60)
+        with patch.object(supabase_auth, "_fetch_jwks", AsyncMock(side_effect=lento)) as fetch:
+            async def varios():
+                return await asyncio.gather(*(cache.get() for _ in range(10)))
+
+            resultados = asyncio.run(varios())
+
+        self.assertEqual(fetch.await_count, 1)
+        self.assertTrue(all(r is JWKS for r in resultados))
+
+    def test_stale_keys_are_served_while_refreshing_in_background(self):
+        agora = [0.0]
+        cache = JwksCache(ttl=60, stale=600, clock=lambda: agora[0])
+        novas = {"keys": []}
+        fetch = AsyncMock(side_effect=[JWKS, novas])
+
+        async def cenario():
+            primeira = await cache.get()
+            agora[0] = 120.0
+            vencida = await cache.get()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return primeira, vencida, await cache.get()
+
+        with patch.object(supabase_auth, "_fetch_jwks", fetch):
+            primeira, vencida, renovada = asyncio.run(cenario())
+
+        self.assertIs(primeira, JWKS)
+        self.assertIs(vencida, JWKS)
+        self.assertIs(renovada, novas)
+        self.assertEqual(fetch.await_count, 2)
+
+    def test_failed_background_refresh_backs_off(self):
+        agora = [0.0]
+        cache = JwksCache(ttl=60, stale=600, clock=lambda: agora[0])
+        fetch = AsyncMock(side_effect=[JWKS, httpx.ConnectError("fora do ar"), {"keys": []}])
+
+        async def cenario():
+            await cache.get()
+            agora[0] = 120.0
+            for _ in range(5):
+                self.assertIs(await cache.get(), JWKS)
+                await asyncio.sleep(0)
+            chamadas_na_espera = fetch.await_count
+            agora[0] = 151.0
+            await cache.get()
+            await asyncio.sleep(0)
+            return chamadas_na_espera
+
+        with patch.object(supabase_auth, "_fetch_jwks", fetch):
+            chamadas_na_espera = asyncio.run(cenario())
+
+        # 1 busca inicial + 1 falha; as chamadas seguintes esperam o backoff de 30 s.
+        self.assertEqual(chamadas_na_espera, 2)
+        self.assertEqual(fetch.await_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Atleta, Racha, RachaAdmin, Team, TeamMember, TipoRacha, User, UserRole
+from app.routers.teams import listar_times
+from app.services import acesso_racha
+
+
+class ListarTimesQueryCountTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(*args):
+            self.queries += 1
+
+        with self.Session() as db:
+            db.add_all([
+                User(id=1, nome="Admin", email="admin@example.com", senha_hash="x", role=UserRole.ADMIN, ativo=True),
+                Racha(id=1, nome="Racha", tipo=TipoRacha.CAMPO),
+            ])
+            db.flush()
+            db.add(RachaAdmin(racha_id=1, user_id=1, ativo=True))
+            db.commit()
+        self.user = SimpleNamespace(id=1)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _criar_times(self, quantidade: int, membros_por_time: int = 5):
+        with self.Session() as db:
+            for _ in range(quantidade):
+                team = Team(racha_id=1, nome="Time", ativo=True)
+                db.add(team)
+                db.flush()
+                for i in range(membros_por_time):
+                    atleta = Atleta(racha_id=1, nome=f"Atleta {team.id}-{i}")
+                    db.add(atleta)
+                    db.flush()
+                    db.add(TeamMember(team_id=team.id, atleta_id=atleta.id, ativo=True))
+            db.commit()
+
+    def _listar(self, **kwargs):
+        acesso_racha._acessos_cache.clear()
+        self.queries = 0
+        with self.Session() as db:
+            result = listar_times(racha_id=1, db=db, current_user=self.user, **kwargs)
+        return result, self.queries
+
+    def test_query_count_does_not_grow_with_teams(self):
+        self._criar_times(1)
+        (um_time, queries_um) = self._listar()
+        self._criar_times(9)
+        (dez_times, queries_dez) = self._listar()
+
+        self.assertEqual(len(um_time), 1)
+        self.assertEqual(len(dez_times), 10)
+        self.assertTrue(all(len(t["membros"]) == 5 for t in dez_times))
+        self.assertEqual(queries_um, queries_dez)
+        self.assertLessEqual(queries_dez, 3)
+
+    def test_include_empty_skips_members(self):
+        self._criar_times(3)
+        com_membros, queries_com = self._listar()
+        sem_membros, queries_sem = self._listar(include="")
+
+        self.assertEqual(queries_sem, queries_com - 1)
+        self.assertTrue(all(t["membros"] == [] for t in sem_membros))
+        self.assertEqual([t["id"] for t in sem_membros], [t["id"] for t in com_membros])
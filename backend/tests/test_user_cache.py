@@ -0,0 +1,117 @@
+import unittest
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.models import User, UserRole
+from app.services import user_cache
+from app.services.auth import create_access_token, get_current_user
+from app.utils.cache import TTLCache
+
+
+class FakeQuery:
+    def __init__(self, session):
+        self.session = session
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        self.session.queries += 1
+        return self.session.user
+
+
+class FakeSession:
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    def query(self, model):
+        return FakeQuery(self)
+
+
+def make_user(**overrides) -> User:
+    data = dict(
+        id=7,
+        nome="Fulano",
+        email="fulano@example.com",
+        role=UserRole.ADMIN,
+        ativo=True,
+        subscription_status="active",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    data.update(overrides)
+    return User(**data)
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        now = [100.0]
+        cache = TTLCache(maxsize=10, ttl=5, clock=lambda: now[0])
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        now[0] += 6
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+class CurrentUserCacheTests(unittest.TestCase):
+    def setUp(self):
+        user_cache._user_cache.clear()
+
+    def test_second_request_with_same_token_skips_the_query(self):
+        db = FakeSession(make_user())
+        token = create_access_token({"sub": "7"})
+
+        first = get_current_user(db=db, token=token)
+        second = get_current_user(db=db, token=token)
+
+        self.assertEqual(db.queries, 1)
+        self.assertIs(first, second)
+        self.assertEqual(first.email, "fulano@example.com")
+        with self.assertRaises(FrozenInstanceError):
+            first.nome = "outro"
+
+    def test_invalidate_user_forces_reload(self):
+        db = FakeSession(make_user())
+        token = create_access_token({"sub": "7"})
+        get_current_user(db=db, token=token)
+
+        user_cache.invalidate_user(7)
+        db.user = make_user(nome="Novo Nome")
+        refreshed = get_current_user(db=db, token=token)
+
+        self.assertEqual(db.queries, 2)
+        self.assertEqual(refreshed.nome, "Novo Nome")
+
+    def test_inactive_user_is_rejected_and_not_cached(self):
+        db = FakeSession(None)
+        token = create_access_token({"sub": "7"})
+
+        with self.assertRaises(HTTPException):
+            get_current_user(db=db, token=token)
+        self.assertIsNone(user_cache.get_cached_user(7, None))
+
+    def test_cache_can_be_disabled_with_zero_ttl(self):
+        with patch.object(user_cache, "_user_cache", TTLCache(maxsize=10, ttl=0)):
+            db = FakeSession(make_user())
+            token = create_access_token({"sub": "7"})
+            get_current_user(db=db, token=token)
+            get_current_user(db=db, token=token)
+
+        self.assertEqual(db.queries, 2)